@@ -0,0 +1,210 @@
+# Copyright (C) 2023  Andrea Patrizi (AndrePatri, andreapatrizi1b6e6@gmail.com)
+# 
+# This file is part of CoClusterBridge and distributed under the General Public License version 2 license.
+# 
+# CoClusterBridge is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 2 of the License, or
+# (at your option) any later version.
+# 
+# CoClusterBridge is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with CoClusterBridge.  If not, see <http://www.gnu.org/licenses/>.
+# 
+from control_cluster_bridge.controllers.rhc import RHController
+from control_cluster_bridge.cluster_client.control_cluster_client import ControlClusterClient
+
+from EigenIPC.PyEigenIPC import Journal, LogType
+
+import time
+
+import numpy as np
+
+from typing import List, Dict
+
+def sample_solve_time(rng: np.random.Generator,
+        dist: str,
+        mean: float,
+        std: float):
+    # fake solve time [s] (also used by the benchmarks to replay each controller's
+    # solve times from its seed, without any IPC)
+    if dist == "const":
+        return mean
+    if dist == "uniform":
+        half_width = np.sqrt(3.0) * std
+        return max(0.0, rng.uniform(mean - half_width, mean + half_width))
+    if dist == "normal":
+        return max(0.0, rng.normal(mean, std))
+    return rng.exponential(mean)
+
+class NoOpRhc(RHController):
+
+    # stand-in controller without any solver: the solution is constant and
+    # "solving" just takes a time sampled from a configurable distribution. 
+    # Used for benchmarking the cluster's triggering machinery
+
+    def __init__(self,
+            srdf_path: str,
+            n_nodes: int,
+            dt: float,
+            namespace: str,
+            jnt_names: List[str],
+            contact_names: List[str],
+            solve_time_dist: str = "const",
+            solve_time_mean: float = 0.0,
+            solve_time_std: float = 0.0,
+            busy_wait: bool = True,
+            seed: int = None,
+            **kwargs):
+        
+        # set before the parent's init, which calls _init_problem
+        self._jnt_names = jnt_names
+        self._contact_names = contact_names
+
+        self._solve_time_dist = solve_time_dist # "const", "uniform", "normal" or "exp"
+        self._solve_time_mean = solve_time_mean # [s]
+        self._solve_time_std = solve_time_std # [s] (not used by "const" and "exp")
+        self._busy_wait = busy_wait # if True, the solve spins on the CPU (like a real solver would), 
+        # otherwise it sleeps
+        self._rng = np.random.default_rng(seed)
+
+        if self._solve_time_dist not in ["const", "uniform", "normal", "exp"]:
+            Journal.log(self.__class__.__name__,
+                "__init__",
+                f"Unknown solve time distribution {self._solve_time_dist}! Allowed: const, uniform, normal, exp",
+                LogType.EXCEP,
+                throw_when_excep = True)
+            
+        super().__init__(srdf_path=srdf_path,
+            n_nodes=n_nodes,
+            dt=dt,
+            namespace=namespace,
+            **kwargs)
+    
+    def _sample_solve_time(self):
+        return sample_solve_time(self._rng, 
+                    dist=self._solve_time_dist,
+                    mean=self._solve_time_mean,
+                    std=self._solve_time_std)
+    
+    def _solve(self) -> bool:
+        solve_time = self._sample_solve_time()
+        if solve_time > 0.0:
+            if self._busy_wait:
+                end = time.perf_counter() + solve_time
+                while time.perf_counter() < end:
+                    pass
+            else:
+                time.sleep(solve_time)
+        return True
+    
+    def _init_problem(self):
+        self._assign_controller_side_jnt_names(jnt_names=self._jnt_names)
+        n_jnts = len(self._jnt_names)
+        self._jnts_sol = np.zeros((1, n_jnts), dtype=self._dtype)
+        self._root_q_sol = np.zeros((1, 7), dtype=self._dtype)
+        self._root_q_sol[0, 6] = 1.0 # identity quaternion (ijkw)
+        self._root_v_sol = np.zeros((1, 6), dtype=self._dtype)
+    
+    def _post_problem_init(self):
+        pass
+
+    def _init_rhc_task_cmds(self):
+        return self.NoRefs()
+    
+    class NoRefs:
+        # no task refs are used
+        def reset(self):
+            pass
+    
+    def _reset(self):
+        pass
+
+    def _update_open_loop(self):
+        pass
+
+    def _update_closed_loop(self):
+        pass
+
+    def _get_robot_jnt_names(self):
+        return self._jnt_names
+    
+    def _get_contact_names(self):
+        return self._contact_names
+    
+    def _get_ndofs(self):
+        return len(self._jnt_names)
+    
+    def _get_robot_mass(self):
+        return 1.0
+    
+    def _get_jnt_q_from_sol(self, node_idx=1) -> np.ndarray:
+        return self._jnts_sol
+
+    def _get_jnt_v_from_sol(self, node_idx=1) -> np.ndarray:
+        return self._jnts_sol
+    
+    def _get_jnt_a_from_sol(self, node_idx=0) -> np.ndarray:
+        return self._jnts_sol
+
+    def _get_jnt_eff_from_sol(self, node_idx=0) -> np.ndarray:
+        return self._jnts_sol
+    
+    def _get_root_full_q_from_sol(self, node_idx=1) -> np.ndarray:
+        return self._root_q_sol
+    
+    def _get_full_q_from_sol(self, node_idx=1) -> np.ndarray:
+        return np.concatenate((self._root_q_sol, self._jnts_sol), axis=1)
+
+    def _get_root_twist_from_sol(self, node_idx=1) -> np.ndarray:
+        return self._root_v_sol
+    
+    def _get_root_a_from_sol(self, node_idx=0) -> np.ndarray:
+        return self._root_v_sol
+
+class NoOpCluster(ControlClusterClient):
+
+    # cluster of NoOpRhc controllers
+
+    def __init__(self,
+            namespace: str,
+            cluster_size: int,
+            srdf_path: str,
+            cluster_dt: float,
+            n_nodes: int,
+            jnt_names: List[str],
+            contact_names: List[str],
+            rhc_opts: Dict = {},
+            **kwargs):
+        
+        self._srdf_path = srdf_path
+        self._cluster_dt = cluster_dt
+        self._n_nodes = n_nodes
+        self._jnt_names = jnt_names
+        self._contact_names = contact_names
+        self._rhc_opts = rhc_opts # forwarded to each NoOpRhc (e.g. solve time distribution). 
+        # If a seed is given, controller idx uses seed + idx
+
+        super().__init__(namespace=namespace,
+            cluster_size=cluster_size,
+            processes_basename="NoOpRhc",
+            **kwargs)
+    
+    def _generate_controller(self,
+                        idx: int):
+        
+        rhc_opts = dict(self._rhc_opts)
+        if rhc_opts.get("seed") is not None:
+            rhc_opts["seed"] = rhc_opts["seed"] + idx
+        return NoOpRhc(srdf_path=self._srdf_path,
+                n_nodes=self._n_nodes,
+                dt=self._cluster_dt,
+                namespace=self._namespace,
+                jnt_names=self._jnt_names,
+                contact_names=self._contact_names,
+                controller_index=idx,
+                **rhc_opts)
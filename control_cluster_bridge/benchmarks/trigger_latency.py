@@ -0,0 +1,269 @@
+# Copyright (C) 2023  Andrea Patrizi (AndrePatri, andreapatrizi1b6e6@gmail.com)
+# 
+# This file is part of CoClusterBridge and distributed under the General Public License version 2 license.
+# 
+# CoClusterBridge is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 2 of the License, or
+# (at your option) any later version.
+# 
+# CoClusterBridge is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with CoClusterBridge.  If not, see <http://www.gnu.org/licenses/>.
+# 
+# Round-trip latency benchmark of the cluster triggering machinery
+# (trigger -> controllers' solve loop -> acks) using NoOpRhc stand-in controllers.
+# Runs on any Linux machine, e.g.:
+# python -m control_cluster_bridge.benchmarks.trigger_latency --cluster_sizes 1 4 16 --affinity none physical_first
+from control_cluster_bridge.benchmarks.noop_rhc import NoOpCluster, sample_solve_time
+from control_cluster_bridge.cluster_server.control_cluster_server import ControlClusterServer
+
+from EigenIPC.PyEigenIPC import VLevel, Journal, LogType
+
+import os
+import signal
+import time
+import tempfile
+import shutil
+
+import numpy as np
+
+import multiprocess as mp
+
+from typing import List, Dict
+
+def _write_srdf(path: str, 
+        jnt_names: List[str]):
+    # minimal SRDF with a zero homing for all joints
+    jnts = "\n".join([f'        <joint name="{name}" value="0.0"/>' for name in jnt_names])
+    srdf = '<?xml version="1.0"?>\n<robot name="noop_robot">\n' + \
+        '    <group_state name="home" group="base">\n' + jnts + '\n    </group_state>\n</robot>\n'
+    with open(path, "w") as file:
+        file.write(srdf)
+
+def _run_cluster(cluster_kwargs: Dict):
+    # runs in a separate process (the client spawns the controllers)
+    cluster = NoOpCluster(**cluster_kwargs)
+    cluster.run()
+
+def _percentiles(samples: np.ndarray):
+    return {"p50": float(np.percentile(samples, 50)),
+        "p99": float(np.percentile(samples, 99)),
+        "max": float(np.max(samples))}
+
+def run_trigger_benchmark(cluster_size: int = 4,
+        n_jnts: int = 12,
+        n_contacts: int = 4,
+        affinity: str = "none",
+        isolated_cores_only: bool = False,
+        controllers_per_process: int = 1,
+        packed_state: bool = False,
+        solve_time_dist: str = "const",
+        solve_time_mean: float = 0.0,
+        solve_time_std: float = 0.0,
+        busy_wait: bool = True,
+        seed: int = 0,
+        cluster_dt: float = 0.03,
+        n_nodes: int = 31,
+        n_steps: int = 1000,
+        n_warmup: int = 50,
+        startup_timeout: float = 180.0,
+        namespace: str = None,
+        verbose: bool = False):
+    
+    # affinity: "none" (no affinity is set), "round_robin" or "physical_first" (see ControlClusterClient)
+    # Returns p50/p99/max of the cluster solution time (trigger -> all acks received) and of the 
+    # IPC overhead (cluster solution time minus the slowest controller's fake solve time) [s].
+    # Controllers run without debug, so that no profiling data is written in their loop: the fake
+    # solve times are instead replayed locally from the controllers' seeds
+    if affinity not in ["none", "round_robin", "physical_first"]:
+        Journal.log("run_trigger_benchmark",
+            "run_trigger_benchmark",
+            f"Unknown affinity mode {affinity}! Allowed: none, round_robin, physical_first",
+            LogType.EXCEP,
+            throw_when_excep = True)
+    if namespace is None:
+        namespace = f"TriggerBenchmark{os.getpid()}"
+
+    jnt_names = [f"jnt_{i}" for i in range(n_jnts)]
+    contact_names = [f"contact_{i}" for i in range(n_contacts)]
+    tmp_dir = tempfile.mkdtemp(prefix="trigger_benchmark")
+    srdf_path = os.path.join(tmp_dir, "noop_robot.srdf")
+    _write_srdf(srdf_path, jnt_names)
+
+    server = ControlClusterServer(namespace=namespace,
+                    cluster_size=cluster_size,
+                    control_dt=cluster_dt,
+                    cluster_dt=cluster_dt,
+                    jnt_names=jnt_names,
+                    n_contacts=n_contacts,
+                    contact_linknames=contact_names,
+                    use_gpu=False,
+                    verbose=verbose,
+                    vlevel=VLevel.V1,
+                    debug=False,
+                    force_reconnection=True,
+                    packed_state=packed_state)
+    server.run()
+
+    cluster_kwargs = {"namespace": namespace,
+        "cluster_size": cluster_size,
+        "srdf_path": srdf_path,
+        "cluster_dt": cluster_dt,
+        "n_nodes": n_nodes,
+        "jnt_names": jnt_names,
+        "contact_names": contact_names,
+        "rhc_opts": {"solve_time_dist": solve_time_dist,
+                    "solve_time_mean": solve_time_mean,
+                    "solve_time_std": solve_time_std,
+                    "busy_wait": busy_wait,
+                    "seed": seed, # controller i uses seed + i
+                    "debug": False,
+                    "verbose": verbose},
+        "set_affinity": affinity != "none",
+        "placement_policy": "round_robin" if affinity == "none" else affinity,
+        "isolated_cores_only": isolated_cores_only,
+        "controllers_per_process": controllers_per_process,
+        "verbose": verbose}
+    cluster_process = mp.get_context("fork").Process(target=_run_cluster, 
+                                    name="NoOpCluster",
+                                    args=(cluster_kwargs,))
+    cluster_process.start()
+
+    try:
+        # wait for all controllers to register
+        start = time.perf_counter()
+        while True:
+            server.pre_trigger()
+            registered = server.get_registered_controllers()
+            if registered is not None and registered.shape[0] == cluster_size:
+                break
+            if time.perf_counter() - start > startup_timeout:
+                Journal.log("run_trigger_benchmark",
+                    "run_trigger_benchmark",
+                    f"Not all controllers registered within {startup_timeout} s!",
+                    LogType.EXCEP,
+                    throw_when_excep = True)
+            time.sleep(0.1)
+        server.activate_controllers(idxs=registered)
+
+        # same generators as the controllers (one fake solve per trigger, warmup included)
+        rngs = [np.random.default_rng(seed + i) for i in range(cluster_size)]
+        sol_times = np.zeros(n_steps)
+        ipc_overheads = np.zeros(n_steps)
+        for step in range(n_warmup + n_steps):
+            server.pre_trigger()
+            server.write_robot_state()
+            start = time.perf_counter()
+            server.trigger_solution()
+            server.wait_for_solution()
+            sol_time = time.perf_counter() - start
+            solve_time = max([sample_solve_time(rng, 
+                                dist=solve_time_dist,
+                                mean=solve_time_mean,
+                                std=solve_time_std) for rng in rngs])
+            if step >= n_warmup:
+                sol_times[step - n_warmup] = sol_time
+                ipc_overheads[step - n_warmup] = sol_time - solve_time
+    finally:
+        # termination is requested to the cluster, while triggering 
+        # the controllers so that they wake up and see it
+        os.kill(cluster_process.pid, signal.SIGINT)
+        start = time.perf_counter()
+        while cluster_process.is_alive() and time.perf_counter() - start < startup_timeout:
+            server.pre_trigger()
+            server.trigger_solution()
+            cluster_process.join(0.1)
+        if cluster_process.is_alive():
+            cluster_process.terminate()
+        server.close()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    
+    return {"cluster_size": cluster_size,
+        "n_jnts": n_jnts,
+        "n_contacts": n_contacts,
+        "affinity": affinity,
+        "controllers_per_process": controllers_per_process,
+        "packed_state": packed_state,
+        "solve_time_dist": solve_time_dist,
+        "solve_time_mean": solve_time_mean,
+        "cluster_sol_time": _percentiles(sol_times),
+        "ipc_overhead": _percentiles(ipc_overheads)}
+
+def sweep(cluster_sizes: List[int] = [1, 2, 4, 8],
+        affinity_modes: List[str] = ["none"],
+        payloads: List = [(12, 4)],
+        **kwargs):
+    
+    # runs run_trigger_benchmark over all combinations of cluster sizes,
+    # affinity modes and payloads ((n_jnts, n_contacts) tuples)
+    results = []
+    run_idx = 0
+    for cluster_size in cluster_sizes:
+        for affinity in affinity_modes:
+            for n_jnts, n_contacts in payloads:
+                result = run_trigger_benchmark(cluster_size=cluster_size,
+                                n_jnts=n_jnts,
+                                n_contacts=n_contacts,
+                                affinity=affinity,
+                                namespace=f"TriggerBenchmark{os.getpid()}_{run_idx}",
+                                **kwargs)
+                print_result(result)
+                results.append(result)
+                run_idx += 1
+    return results
+
+def print_result(result: Dict):
+    sol = result["cluster_sol_time"]
+    ipc = result["ipc_overhead"]
+    print(f"size {result['cluster_size']:4d} | affinity {result['affinity']:14s} | " + \
+        f"jnts {result['n_jnts']:3d} contacts {result['n_contacts']:2d} | " + \
+        f"sol time [us] p50 {sol['p50']*1e6:9.1f} p99 {sol['p99']*1e6:9.1f} max {sol['max']*1e6:9.1f} | " + \
+        f"ipc overhead [us] p50 {ipc['p50']*1e6:9.1f} p99 {ipc['p99']*1e6:9.1f} max {ipc['max']*1e6:9.1f}")
+
+if __name__ == "__main__":
+
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Trigger/ack round-trip latency benchmark")
+    parser.add_argument("--cluster_sizes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--affinity", type=str, nargs="+", default=["none"], 
+                    choices=["none", "round_robin", "physical_first"])
+    parser.add_argument("--n_jnts", type=int, nargs="+", default=[12])
+    parser.add_argument("--n_contacts", type=int, nargs="+", default=[4])
+    parser.add_argument("--controllers_per_process", type=int, default=1)
+    parser.add_argument("--packed_state", action="store_true")
+    parser.add_argument("--isolated_cores_only", action="store_true")
+    parser.add_argument("--solve_time_dist", type=str, default="const", 
+                    choices=["const", "uniform", "normal", "exp"])
+    parser.add_argument("--solve_time_mean", type=float, default=0.0, help="[s]")
+    parser.add_argument("--solve_time_std", type=float, default=0.0, help="[s]")
+    parser.add_argument("--sleep", action="store_true", help="sleep instead of spinning during fake solves")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--n_steps", type=int, default=1000)
+    parser.add_argument("--n_warmup", type=int, default=50)
+    parser.add_argument("--out", type=str, default=None, help="json file where results are dumped")
+    args = parser.parse_args()
+
+    results = sweep(cluster_sizes=args.cluster_sizes,
+                affinity_modes=args.affinity,
+                payloads=[(n_jnts, n_contacts) for n_jnts in args.n_jnts for n_contacts in args.n_contacts],
+                controllers_per_process=args.controllers_per_process,
+                packed_state=args.packed_state,
+                isolated_cores_only=args.isolated_cores_only,
+                solve_time_dist=args.solve_time_dist,
+                solve_time_mean=args.solve_time_mean,
+                solve_time_std=args.solve_time_std,
+                busy_wait=not args.sleep,
+                seed=args.seed,
+                n_steps=args.n_steps,
+                n_warmup=args.n_warmup)
+    
+    if args.out is not None:
+        with open(args.out, "w") as file:
+            json.dump(results, file, indent=2)
@@ -45,7 +45,15 @@ class ControlClusterClient(ABC):
             core_ids_override_list: List[int] = None,
             verbose: bool = False,
             debug: bool = False,
-            custom_opts: Dict = {}):
+            custom_opts: Dict = {},
+            controllers_per_process: int = 1,
+            threaded_workers: bool = False,
+            use_prototype: bool = False,
+            placement_policy: str = "round_robin",
+            numa_node: int = None,
+            max_respawns: int = 0,
+            elastic: bool = False,
+            initial_processes: int = None):
 
         # ciao :D
         #        CR 
@@ -65,6 +73,18 @@ class ControlClusterClient(ABC):
         # in a isolated core, if they fit
         self.core_ids_override_list = core_ids_override_list
 
+        self._placement_policy = placement_policy # "round_robin": processes are assigned to cores in order;
+        # "physical_first": one process per physical core first (SMT siblings last), preferring cores 
+        # close to numa_node (if None, the NUMA node on which the server process runs; if < 0, no preference)
+        self._numa_node = numa_node
+        self._core_map = {} # chosen process -> core map (published through SharedClusterInfo)
+        if self._placement_policy not in ["round_robin", "physical_first"]:
+            Journal.log(self.__class__.__name__,
+                "__init__",
+                f"Unknown placement policy {self._placement_policy}! Allowed: round_robin, physical_first",
+                LogType.EXCEP,
+                throw_when_excep = True)
+
         from control_cluster_bridge.utilities.cpu_utils.core_utils import get_isolated_cores
         self.isolated_cores = get_isolated_cores()[1] # available isolated
         # cores 
@@ -77,12 +97,38 @@ class ControlClusterClient(ABC):
 
         self.cluster_size = cluster_size
 
+        self._controllers_per_process = max(1, controllers_per_process) # each worker process 
+        # hosts this many controllers (the last one might host less)
+        self._threaded_workers = threaded_workers # if True, controllers in a worker run each 
+        # in their own thread (only beneficial if the solver releases the GIL), otherwise 
+        # they are stepped round-robin by the worker's main thread
+        self._n_workers = -(-self.cluster_size // self._controllers_per_process) # ceil
+
+        self._use_prototype = use_prototype # if True, a prototype controller (see _generate_controller_prototype)
+        # is built once in the parent before forking: children inherit it copy-on-write and just attach it to the cluster
+        self._prototype = None
+        self._prototype_mem = 0.0 # [GB] RSS increase in the parent due to the prototype
+
         self._device = "cpu"
 
         self._controllers = [] # list of controllers
 
-        self._processes = [] 
+        self._processes = [] # indexed as _process_specs (None if not spawned yet, see initial_processes)
         self._child_alive = [] 
+        self._process_specs = [] # (target, name, args) used to (re)spawn each process
+        self._ctx = None
+
+        self._max_respawns = max_respawns # max n. of times each process is respawned after
+        # dying unexpectedly (its cluster slots are cleaned up and reclaimed by the new process)
+        self._n_respawns = []
+        self._rhc_status = None # used for cleaning up slots of dead controllers
+
+        self._elastic = elastic # if True, processes whose controllers have all acked a park request of the 
+        # server (see ControlClusterServer.set_active_size()) are stopped (SIGSTOP) and resumed upon unparking
+        self._initial_processes = initial_processes # if not None (and elastic), only this many processes
+        # are spawned at startup: the others are spawned lazily when the server unparks more slots
+        self._stopped = []
+        self._elastic_check_dt = 0.1 # [s] period at which park requests are checked (if elastic)
 
         self._is_cluster_ready = False
                  
@@ -160,7 +206,6 @@ class ControlClusterClient(ABC):
         #                 controller_idx=idx)
 
         from EigenIPC.PyEigenIPC import StringTensorClient
-        from perf_sleep.pyperfsleep import PerfSleep
         shared_rhc_files = StringTensorClient(
             basename="SharedRhcFilesDropDir", 
             name_space=self._namespace,
@@ -168,17 +213,11 @@ class ControlClusterClient(ABC):
             vlevel=VLevel.V2)
         shared_rhc_files.run()
         
-        controller = self._generate_controller(idx=idx)
+        controller = self._get_controller(idx=idx)
 
-        this_controller_paths=controller.this_paths()
-        combined_paths = ", ".join(this_controller_paths) # we want a string for each controller
-        while True: # no failure in writing allowed
-            if not shared_rhc_files.write_vec([combined_paths], idx):
-                ns=1000000000
-                PerfSleep.thread_sleep(ns)
-                continue
-            else:
-                break
+        self._write_controller_paths(shared_rhc_files=shared_rhc_files,
+                        controller=controller,
+                        idx=idx)
 
         shared_rhc_files.close()
 
@@ -193,21 +232,327 @@ class ControlClusterClient(ABC):
                 LogType.STAT,
                 throw_when_excep = True)
 
+    def _spawn_worker(self,
+                    worker_idx: int,
+                    idxs: List[int],
+                    available_cores: List[int]):
+        
+        start_mem_usage=get_memory_usage(db_print=False)
+
+        # this runs in a child process hosting multiple controllers
+        if self.set_affinity:
+            # round-robin workers run on a single core, threaded ones on one core per controller
+            self._set_affinity(core_idxs=self._compute_worker_affinity(worker_idx, idxs, core_ids=available_cores),
+                        controller_idx=idxs[0])
+
+        from EigenIPC.PyEigenIPC import StringTensorClient
+        shared_rhc_files = StringTensorClient(
+            basename="SharedRhcFilesDropDir", 
+            name_space=self._namespace,
+            verbose=self._verbose, 
+            vlevel=VLevel.V2)
+        shared_rhc_files.run()
+        
+        controllers = []
+        for idx in idxs:
+            controller = self._get_controller(idx=idx)
+            self._write_controller_paths(shared_rhc_files=shared_rhc_files,
+                        controller=controller,
+                        idx=idx)
+            controllers.append(controller)
+
+        shared_rhc_files.close()
+
+        self._set_worker_sigint_handler(controllers=controllers)
+
+        if self._threaded_workers:
+            import threading
+            threads = []
+            for i in range(len(controllers)):
+                thread = threading.Thread(target=controllers[i].solve,
+                                name=self.processes_basename + str(idxs[i]),
+                                daemon=True)
+                threads.append(thread)
+                thread.start()
+            for thread in threads:
+                thread.join()
+        else:
+            self._solve_round_robin(controllers=controllers)
+
+        # before exiting read some memory db info
+        end_mem_usage=get_memory_usage(db_print=False)
+        meminfo = f"Memory usage for worker n.{worker_idx} (controllers {idxs})-> start {start_mem_usage} GB, end {end_mem_usage} GB, diff {end_mem_usage-start_mem_usage} GB"
+        Journal.log(self.__class__.__name__,
+                "_spawn_processes",
+                meminfo,
+                LogType.STAT,
+                throw_when_excep = True)
+    
+    def _set_worker_sigint_handler(self,
+                    controllers: List):
+        
+        # each controller installs its own SIGINT handler upon attaching, so only the last one 
+        # would be notified: a single handler for the whole worker notifies all of them 
+        # (their solve loops then close them)
+        def _handle_sigint(signum, frame):
+            for controller in controllers:
+                controller._handle_sigint(signum, frame)
+        signal.signal(signal.SIGINT, _handle_sigint)
+
+    def _get_controller(self,
+                    idx: int):
+        
+        # runs in the child process
+        if self._prototype is None:
+            # controllers claim the slot of their spawn index (lock-free, and the 
+            # same slot after a respawn) unless given an explicit controller_index
+            from control_cluster_bridge.controllers.rhc import RHController
+            RHController._spawn_index = idx
+            try:
+                return self._generate_controller(idx=idx)
+            finally:
+                RHController._spawn_index = None
+        
+        # the prototype inherited from the parent is used (once per process) 
+        start_mem_usage=get_memory_usage(db_print=False)
+        controller = self._prototype
+        self._prototype = None # other controllers in this process are generated normally
+        controller._controller_index_req = idx # the prototype was built without an index
+        controller.attach()
+        end_mem_usage=get_memory_usage(db_print=False)
+        meminfo = f"Controller n.{idx} attached from prototype -> RSS before attach {start_mem_usage} GB, after {end_mem_usage} GB " + \
+            f"(prototype building in parent took {self._prototype_mem} GB)"
+        Journal.log(self.__class__.__name__,
+                "_get_controller",
+                meminfo,
+                LogType.STAT,
+                throw_when_excep = True)
+        return controller
+
+    def _build_prototype(self):
+
+        if not self._fork_ctx_name == "fork":
+            Journal.log(self.__class__.__name__,
+                "_build_prototype",
+                f"Prototype controllers are only supported with fork context (got {self._fork_ctx_name}). Will not use it.",
+                LogType.WARN,
+                throw_when_excep = True)
+            return
+        start_mem_usage=get_memory_usage(db_print=False)
+        self._prototype = self._generate_controller_prototype()
+        if self._prototype is None:
+            Journal.log(self.__class__.__name__,
+                "_build_prototype",
+                "_generate_controller_prototype() not implemented. Controllers will be generated from scratch.",
+                LogType.WARN,
+                throw_when_excep = True)
+            return
+        import gc
+        gc.collect()
+        gc.freeze() # objects surviving until here are ignored by the GC in the children
+        # (GC passes would otherwise touch, and so copy, their pages)
+        self._prototype_mem = get_memory_usage(db_print=False) - start_mem_usage
+        Journal.log(self.__class__.__name__,
+                "_build_prototype",
+                f"Prototype controller built ({self._prototype_mem} GB)",
+                LogType.STAT,
+                throw_when_excep = True)
+        
+    def _solve_round_robin(self, 
+                    controllers: List):
+
+        # the worker's thread serves all its controllers in turn. Triggers are 
+        # broadcasted, so it's enough to wait on one of them
+        running = controllers
+        while len(running) > 0:
+            if not running[0].wait_for_trigger():
+                break
+            if all(controller.park_requested() for controller in running):
+                running[0].park(running) # blocks until any of them is unparked
+            running = [controller for controller in running if controller.process_requests()]
+            if len(running) > 0:
+                running[0].flush_io_stats() # accounting is process-wide
+        for controller in controllers:
+            controller.close()
+        
+    def _write_controller_paths(self,
+                    shared_rhc_files,
+                    controller,
+                    idx: int):
+        
+        from perf_sleep.pyperfsleep import PerfSleep
+        this_controller_paths=controller.this_paths()
+        combined_paths = ", ".join(this_controller_paths) # we want a string for each controller
+        while True: # no failure in writing allowed
+            if not shared_rhc_files.write_vec([combined_paths], idx):
+                ns=1000000000
+                PerfSleep.thread_sleep(ns)
+                continue
+            else:
+                break
+
     def _check_child_ps_status(self):
-        for i in range(0, self.cluster_size):
+        for i in range(0, len(self._processes)):
             child_p = self._processes[i]
+            if child_p is None:
+                continue # not spawned yet
             if not child_p.is_alive():
                 self._child_alive[i] = False
             else:
                 self._child_alive[i] = True
                 
+    def _start_process(self, 
+                    process_idx: int):
+        
+        target, name, args = self._process_specs[process_idx]
+        process = self._ctx.Process(target=target, 
+                        name=name,
+                        args=args)
+        while len(self._processes) <= process_idx: # lazy spawning can skip some processes
+            self._processes.append(None)
+            self._child_alive.append(False)
+            self._n_respawns.append(0)
+            self._stopped.append(False)
+        self._processes[process_idx] = process # also respawns
+        self._child_alive[process_idx] = True
+        process.start()
+
+    def _is_spawned(self, 
+                process_idx: int):
+        return process_idx < len(self._processes) and self._processes[process_idx] is not None
+    
+    def _process_slots(self, 
+                process_idx: int):
+        # cluster slots hosted by a process (controllers claim the slot of their spawn index)
+        if self._controllers_per_process == 1:
+            return [process_idx]
+        return self._worker_idxs(process_idx)
+    
+    def _processes_to_spawn(self, 
+                slots: List[int]):
+        # processes hosting the given slots which were not spawned yet
+        return [i for i in range(len(self._process_specs)) if not self._is_spawned(i) and \
+            any(slot in slots for slot in self._process_slots(i))]
+
+    def _respawn_dead_childs(self):
+        
+        self._check_child_ps_status()
+        if self._remote_term is not None and \
+            self._remote_term.read_retry(row_index=0, col_index=0)[0]:
+            return # termination was requested -> children are supposed to exit
+        for i in range(len(self._processes)):
+            process = self._processes[i]
+            if process is None or self._child_alive[i] or process.exitcode == 0:
+                continue # not spawned, alive or exited cleanly
+            if self._n_respawns[i] >= self._max_respawns:
+                continue
+            process.join()
+            cleaned_slots = self._cleanup_slots(pid=process.pid)
+            self._n_respawns[i] += 1
+            Journal.log(self.__class__.__name__,
+                "_respawn_dead_childs",
+                f"Child process {process.name} (pid {process.pid}) died with exit code {process.exitcode}. " + \
+                    f"Cleaned up slots {cleaned_slots}, respawning ({self._n_respawns[i]}/{self._max_respawns})...",
+                LogType.WARN,
+                throw_when_excep = True)
+            self._start_process(i)
+
+    def _cleanup_slots(self, 
+                    pid: int):
+
+        # resets the cluster slots held by controllers of a dead process, 
+        # so that they can be claimed again 
+        status = self._get_rhc_status()
+        status.pids.synch_all(read=True, retry=True)
+        status.registration.synch_all(read=True, retry=True)
+        slots = [i for i in range(status.cluster_size) if status.pids.get_numpy_mirror()[i, 0] == pid]
+        for slot in slots:
+            was_registered = bool(status.registration.get_numpy_mirror()[slot, 0])
+            for view in [status.registration, status.activation_state, 
+                    status.trigger, status.resets, status.slot_claims]:
+                view.write_retry(False, row_index=slot, col_index=0)
+            status.pids.write_retry(0, row_index=slot, col_index=0)
+            if was_registered:
+                status.controllers_counter.data_sem_acquire()
+                status.controllers_counter.synch_all(retry=True, read=True)
+                status.controllers_counter.get_numpy_mirror()[0, 0] -= 1
+                status.controllers_counter.synch_all(retry=True, read=False)
+                status.controllers_counter.data_sem_release()
+        return slots
+    
+    def _get_rhc_status(self):
+        
+        if self._rhc_status is None:
+            from control_cluster_bridge.utilities.shared_data.rhc_data import RhcStatus
+            self._rhc_status = RhcStatus(is_server=False,
+                namespace=self._namespace, 
+                verbose=self._verbose, 
+                vlevel=VLevel.V2,
+                with_torch_view=False, 
+                with_gpu_mirror=False,
+                optimize_mem=False)
+            self._rhc_status.run()
+        return self._rhc_status
+    
+    def _update_parking(self):
+
+        # follows the park requests of the server: a process is stopped once all its controllers
+        # have acked the park request (PARKED, see RHController.park()). Acks are written under the park 
+        # state's semaphore and parked controllers do not take any lock until they are unparked, so 
+        # holding the semaphore here guarantees that a stopped process does not hold any lock
+        import os
+        status = self._get_rhc_status()
+        park_state = status.park_state
+        status.pids.synch_all(read=True, retry=True)
+        pids = status.pids.get_numpy_mirror()[:, 0]
+
+        self._check_child_ps_status()
+        park_state.data_sem_acquire()
+        try:
+            park_state.synch_all(read=True, retry=True)
+            states = park_state.get_numpy_mirror()[:, 0].copy()
+            for i in range(len(self._processes)):
+                if not self._child_alive[i]:
+                    continue
+                pid = self._processes[i].pid
+                slots = [slot for slot in range(status.cluster_size) if pids[slot] == pid]
+                if len(slots) == 0:
+                    continue # not registered yet
+                if not self._stopped[i] and \
+                    all(states[slot] == park_state.PARKED for slot in slots):
+                    os.kill(pid, signal.SIGSTOP)
+                    self._stopped[i] = True
+                elif self._stopped[i] and \
+                    any(states[slot] == park_state.UNPARK_REQ for slot in slots):
+                    os.kill(pid, signal.SIGCONT) # the controller itself sets RUNNING
+                    self._stopped[i] = False
+        finally:
+            park_state.data_sem_release()
+        
+        # lazy spawning: exactly the processes hosting the unparked slots
+        unparked = [slot for slot in range(status.cluster_size) if states[slot] == park_state.UNPARK_REQ]
+        for i in self._processes_to_spawn(unparked):
+            Journal.log(self.__class__.__name__,
+                "_update_parking",
+                f"Slots {self._process_slots(i)} were unparked -> spawning {self._process_specs[i][1]}",
+                LogType.STAT,
+                throw_when_excep = True)
+            self._start_process(i)
+
+    def _resume_stopped(self):
+        import os
+        for i in range(len(self._processes)):
+            if self._stopped[i] and self._processes[i].is_alive():
+                os.kill(self._processes[i].pid, signal.SIGCONT) # parked controllers then see the termination
+                self._stopped[i] = False
+
     def _childs_all_dead(self):
         self._check_child_ps_status()
         return not any(self._child_alive) 
     
     def _childs_all_alive(self):
         self._check_child_ps_status()
-        return all(self._child_alive) 
+        return all(self._child_alive[i] for i in range(len(self._processes)) if self._is_spawned(i)) 
 
     def _wait_for_child_ps(self):
 
@@ -239,7 +584,6 @@ class ControlClusterClient(ABC):
         
         # let's make the paths to the controllers files available on shared memory for db
         from EigenIPC.PyEigenIPC import StringTensorServer
-        from perf_sleep.pyperfsleep import PerfSleep
 
         shared_rhc_files = StringTensorServer(length=self.cluster_size, 
             basename="SharedRhcFilesDropDir", 
@@ -286,19 +630,28 @@ class ControlClusterClient(ABC):
                                     val=self._is_cluster_ready)
 
 
+        cluster_params = dict(self._custom_opts)
+        cluster_params.update(self._core_map)
         self.cluster_data = SharedClusterInfo(namespace=self._namespace,
             is_server=True, 
-            params_dict=self._custom_opts,
+            params_dict=cluster_params,
             verbose=True,
             vlevel=VLevel.V2,
             force_reconnection=True)
         self.cluster_data.run()
 
+        from multiprocess.connection import wait
         while not self._terminated:
-            nsecs =  1000000000 # 1 sec
-            PerfSleep.thread_sleep(nsecs) # we just keep it alive
-            shared_rhc_files_val=[""]*shared_rhc_files.length()
-            shared_rhc_files.read_vec(shared_rhc_files_val, 0)
+            if self._childs_all_dead():
+                Journal.log(self.__class__.__name__,
+                            "run",
+                            "no child process is alive -> will terminate",
+                            LogType.WARN)
+                break
+            # blocks until a child exits (its sentinel becomes ready) or, if periodic
+            # checks are needed, until the supervisor period elapses
+            sentinels = [self._processes[i].sentinel for i in range(len(self._processes)) if self._child_alive[i]]
+            wait(sentinels, timeout=self._supervisor_dt())
             if self._debug:
                 self._system_run, self._system_avail=get_system_memory(label="run()", prev=self._system_start, db_print=False)
                 meminfo=f"System Memory: Used = {self._system_run} GB, Available = {self._system_avail} GB,differece {self._system_run-self._system_start}"
@@ -306,14 +659,10 @@ class ControlClusterClient(ABC):
                             "run",
                             meminfo,
                             LogType.INFO)
-            if self._childs_all_dead():
-                Journal.log(self.__class__.__name__,
-                            "run",
-                            "no child process is alive -> will terminate",
-                            LogType.WARN)
-                break
-            else:
-                continue
+            if self._max_respawns > 0:
+                self._respawn_dead_childs()
+            if self._elastic and not self._terminated:
+                self._update_parking()
 
         self._close_process() 
         shared_rhc_files.close()
@@ -333,6 +682,8 @@ class ControlClusterClient(ABC):
     def _close_process(self):
         if not self._proc_closed:
             for process in self._processes:
+                if process is None:
+                    continue # never spawned
                 process.join() # wait for processes to terminate
                 exicode=process.exitcode
                 if exicode==0:
@@ -373,6 +724,7 @@ class ControlClusterClient(ABC):
         self._remote_term.write_retry(True, 
                                         row_index=0,
                                         col_index=0) # send termination to controllers
+        self._resume_stopped() # stopped processes could not see the termination request
         self._close_process()
     
     def _close_shared_mem(self):
@@ -382,6 +734,8 @@ class ControlClusterClient(ABC):
             self.cluster_data.close()
         if self._remote_term is not None:
             self._remote_term.close()
+        if self._rhc_status is not None:
+            self._rhc_status.close()
 
     def _get_cores(self):
 
@@ -424,10 +778,10 @@ class ControlClusterClient(ABC):
                             warning,
                             LogType.WARN,
                             throw_when_excep = True)
-        if len(self.isolated_cores) < self.cluster_size and self.isolated_cores_only:
+        if len(self.isolated_cores) < self._n_workers and self.isolated_cores_only:
             # we distribute the controllers over the available ones
             warning = "Not enough isolated cores available to distribute the controllers " + \
-                f"on them. N. available isolated cores: {len(self.isolated_cores)}, n. controllers {self.cluster_size}. "+ \
+                f"on them. N. available isolated cores: {len(self.isolated_cores)}, n. processes {self._n_workers}. "+ \
                 "Processes will be distributed among the available ones."
             Journal.log(self.__class__.__name__,
                         "_debug_prints",
@@ -435,6 +789,36 @@ class ControlClusterClient(ABC):
                         LogType.WARN,
                         throw_when_excep = True)
             
+    def _get_target_numa_node(self):
+
+        if self._numa_node is not None:
+            return self._numa_node if self._numa_node >= 0 else None
+        
+        # NUMA node of the server process (published by the server)
+        from control_cluster_bridge.utilities.shared_data.cluster_profiling import RhcProfiling
+        from control_cluster_bridge.utilities.cpu_utils.core_utils import get_numa_node_of_process
+        server_stats = RhcProfiling(is_server=False, 
+            name=self._namespace,
+            verbose=self._verbose,
+            vlevel=VLevel.V2,
+            safe=True,
+            optimize_mem=True,
+            cluster_size=1)
+        server_stats.run()
+        server_stats.synch_info()
+        server_pid = server_stats.get_info(info_name="server_pid")
+        server_stats.close()
+        try:
+            numa_node = get_numa_node_of_process(int(server_pid))
+        except Exception as e:
+            Journal.log(self.__class__.__name__,
+                "_get_target_numa_node",
+                f"Could not retrieve NUMA node of server process ({e}). No NUMA preference will be used.",
+                LogType.WARN,
+                throw_when_excep = True)
+            return None
+        return numa_node
+    
     def _compute_process_affinity(self, 
                         process_index: int, 
                         core_ids: List[int]):
@@ -444,6 +828,29 @@ class ControlClusterClient(ABC):
         num_cores = len(core_ids)
         return core_ids[process_index % num_cores]
     
+    def _compute_worker_affinity(self,
+                        worker_index: int,
+                        idxs: List[int],
+                        core_ids: List[int]):
+        
+        # cores of a worker hosting the controllers in idxs. Threaded workers get the 
+        # cores their controllers would have as separate processes (one per thread)
+        if not self._threaded_workers:
+            return [self._compute_process_affinity(worker_index, core_ids=core_ids)]
+        cores = []
+        for idx in idxs:
+            core = self._compute_process_affinity(idx, core_ids=core_ids)
+            if core not in cores:
+                cores.append(core)
+        return cores
+
+    def _worker_idxs(self,
+                worker_index: int):
+        
+        # controllers hosted by a worker
+        return list(range(worker_index * self._controllers_per_process, 
+                    min((worker_index + 1) * self._controllers_per_process, self.cluster_size)))
+    
     def _import_aux_libs(self):
         # to be overriden by child (to reduce mem. footprint)
         import time 
@@ -464,6 +871,7 @@ class ControlClusterClient(ABC):
 
         ctx = mp.get_context(self._fork_ctx_name)
         ctx_name=self._fork_ctx_name
+        self._ctx = ctx
         
         # here import the main necessary libraries with higher mem footprint
         # (this way, if using fork, the child will not need to
@@ -472,6 +880,9 @@ class ControlClusterClient(ABC):
         self._import_aux_libs() # can be used by child classes to dynamically import lbraries
         # before any child proc is spawned
 
+        if self._use_prototype:
+            self._build_prototype()
+
         Journal.log(self.__class__.__name__,
                         "_spawn_processes",
                         f"spawning processes (using context {ctx_name})-->",
@@ -486,23 +897,60 @@ class ControlClusterClient(ABC):
         else:
             # ini case user wants to set core ids manually
             core_ids = self.core_ids_override_list
-
-        for i in range(0, self.cluster_size):
-            info = f"Spawning process for controller n.{i}."
+        
+        if self._placement_policy == "physical_first":
+            from control_cluster_bridge.utilities.cpu_utils.core_utils import order_cores
+            core_ids = order_cores(cores=core_ids, 
+                            smt_last=True,
+                            numa_node=self._get_target_numa_node())
+        if self.set_affinity:
+            n_processes = self.cluster_size if self._controllers_per_process == 1 else self._n_workers
+            for i in range(n_processes):
+                self._core_map[f"core_map_{i}"] = self._compute_process_affinity(i, core_ids=core_ids) if \
+                    self._controllers_per_process == 1 else \
+                    self._compute_worker_affinity(i, self._worker_idxs(i), core_ids=core_ids)[0] # first core 
+                # of multi-core (threaded) workers
             Journal.log(self.__class__.__name__,
-                    "_spawn_processes",
-                    info,
-                    LogType.STAT,
-                    throw_when_excep = True)
-            process = ctx.Process(target=self._spawn_controller, 
-                            name=self.processes_basename + str(i),
-                            args=(i, core_ids))
-            self._processes.append(process)
-            self._child_alive.append(True)
-            self._processes[i].start()
+                "_spawn_processes",
+                f"Process -> core map ({self._placement_policy}): {list(self._core_map.values())}",
+                LogType.STAT,
+                throw_when_excep = True)
+
+        if self._controllers_per_process == 1:
+            for i in range(0, self.cluster_size):
+                info = f"Spawning process for controller n.{i}."
+                Journal.log(self.__class__.__name__,
+                        "_spawn_processes",
+                        info,
+                        LogType.STAT,
+                        throw_when_excep = True)
+                self._process_specs.append((self._spawn_controller, 
+                                self.processes_basename + str(i),
+                                (i, core_ids)))
+                if self._spawn_at_startup(i):
+                    self._start_process(i)
+        else:
+            for i in range(0, self._n_workers):
+                idxs = self._worker_idxs(i)
+                info = f"Spawning worker process n.{i} for controllers {idxs}."
+                Journal.log(self.__class__.__name__,
+                        "_spawn_processes",
+                        info,
+                        LogType.STAT,
+                        throw_when_excep = True)
+                self._process_specs.append((self._spawn_worker, 
+                                self.processes_basename + "Worker" + str(i),
+                                (i, idxs, core_ids)))
+                if self._spawn_at_startup(i):
+                    self._start_process(i)
         
         self._wait_for_child_ps() # blocking: waits that all child ps are alive
 
+        if self._prototype is not None:
+            import gc
+            gc.unfreeze() # children have inherited the frozen objects: the parent's GC can track them again 
+            # (processes spawned later, e.g. respawns, still inherit the prototype, just not frozen)
+
         self._is_cluster_ready = True
 
         Journal.log(self.__class__.__name__,
@@ -511,8 +959,27 @@ class ControlClusterClient(ABC):
                     LogType.STAT,
                     throw_when_excep = True)
 
+    def _supervisor_dt(self):
+        # child deaths wake up the supervisor immediately: periodic wakeups 
+        # are only needed for following park requests and for debug prints
+        if self._elastic:
+            return self._elastic_check_dt
+        if self._debug:
+            return 1.0
+        return None
+
+    def _spawn_at_startup(self, 
+                    process_idx: int):
+        return (not self._elastic) or self._initial_processes is None or \
+            process_idx < self._initial_processes
+    
     @abstractmethod
     def _generate_controller(self,
                         idx: int):
         # to be overridden
         return None
+    
+    def _generate_controller_prototype(self):
+        # to be overridden if use_prototype is True: should return a controller 
+        # created with attach=False (index-independent)
+        return None
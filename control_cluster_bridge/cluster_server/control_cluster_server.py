@@ -22,12 +22,15 @@ from control_cluster_bridge.utilities.shared_data.rhc_data import RobotState
 from control_cluster_bridge.utilities.shared_data.rhc_data import RhcCmds, RhcPred, RhcPredDelta
 from control_cluster_bridge.utilities.shared_data.rhc_data import RhcStatus
 from control_cluster_bridge.utilities.shared_data.rhc_data import RhcRefs
-from control_cluster_bridge.utilities.shared_data.cluster_profiling import RhcProfiling
+from control_cluster_bridge.utilities.shared_data.state_encoding import row_runs
+from control_cluster_bridge.utilities.shared_data.cluster_profiling import RhcProfiling, RhcTrace, RhcLatencyHist
+from control_cluster_bridge.utilities.shared_data.cluster_profiling import IoStats
 from control_cluster_bridge.utilities.remote_triggering import RemoteTriggererSrvr
 
 from EigenIPC.PyEigenIPC import VLevel, Journal, LogType
 
 import time
+import os
 
 import numpy as np
 import torch
@@ -49,7 +52,23 @@ class ControlClusterServer(ABC):
             vlevel: VLevel = VLevel.V1,
             debug = False, 
             force_reconnection: bool = False,
-            timeout_ms: int = 60000):
+            timeout_ms: int = 60000,
+            selective_trigger: bool = False,
+            packed_state: bool = False,
+            packed_sol: bool = False,
+            double_buffered_state: bool = False,
+            pipelined: bool = False,
+            sol_deadline_ms: float = None,
+            active_size: int = None,
+            staged_state_synch: bool = False,
+            trace_len: int = 0,
+            latency_hist: bool = False,
+            hist_min_val: float = 1e-5,
+            hist_n_octaves: int = 16,
+            hist_sub_buckets: int = 8,
+            io_stats: bool = False,
+            io_stats_dt: float = 1.0,
+            partial_read_max_runs: int = 4):
         
         self._verbose = verbose
         self._vlevel = vlevel
@@ -80,10 +99,66 @@ class ControlClusterServer(ABC):
         self._rhc_refs = None
         self._rhc_status = None
         self._cluster_stats = None 
+        self._cluster_info_slots = None # pre-resolved slots of the runtime info written at each solution
         self._remote_triggerer = None
         self._remote_triggerer_ack_timeout = timeout_ms # [ns]
+        self._ack_check_dt_ms = min(1000, timeout_ms) # [ms] period at which pending controllers are
+        # checked for having died while waiting for their acks
         self._n_controllers_connected = 0
 
+        self._selective_trigger = selective_trigger # if True, only active controllers have their trigger 
+        # flag set (and are waited for). The trigger itself is broadcast, so inactive ones still wake up, 
+        # find their flag unset and go back to waiting
+        self._n_triggered = 0 # number of controllers triggered in the last trigger_solution()
+        self._triggered_idxs = None # idxs of the controllers triggered in the last trigger_solution() 
+        # (None -> all)
+
+        self._packed_state = packed_state # robot state, cmds and predictions are each laid out 
+        # on a single shared tensor (controllers discover this automatically). On CPU, the simulator can write 
+        # directly into get_state().block_tensor(), which write_robot_state() then publishes 
+        # with a single memcpy (EigenIPC does not expose the mapped segment, so this is the minimum copy path)
+        self._double_buffered_state = double_buffered_state # robot state is double buffered: controllers 
+        # never block on the server while reading it (implies a packed robot state)
+        self._packed_sol = packed_sol or self._packed_state # cmds, predictions and solution info are each 
+        # laid out on a single shared tensor, so that each controller commits its outputs with one transaction 
+        # per tensor (controllers discover this automatically)
+        self._trace_len = trace_len # if > 0, each controller records the timestamps of each phase of its
+        # last trace_len solve cycles on a shared ring buffer (see RhcTrace)
+        self._rhc_trace = None
+        self._latency_hist = latency_hist # if True, controllers' solve loop times and cluster solution times
+        # are accumulated on shared log-linear histograms (see RhcLatencyHist and get_latency_stats())
+        self._hist_min_val = hist_min_val # [s]
+        self._hist_n_octaves = hist_n_octaves
+        self._hist_sub_buckets = hist_sub_buckets
+        self._rhc_latency_hist = None
+        self._trigger_time = np.nan
+        self._io_stats = io_stats # if True, shared memory IO of all processes of the cluster is accounted
+        # and published every io_stats_dt seconds (see utilities/io_stats.py)
+        self._io_stats_dt = io_stats_dt # [s]
+        self._io_stats_srvr = None
+
+        self._staged_state_synch = staged_state_synch # robot state is copied to CPU through a pinned 
+        # staging buffer with a single copy on a dedicated stream (see stage_robot_state())
+
+        self._pipelined = pipelined # if True, the solution triggered at cycle k is collected at cycle k+1 
+        # (one step of latency), so that the controllers solve while the simulator steps
+        self._in_flight = False # whether a triggered cycle still has to be collected (pipelined only)
+        self._state_stamp = -1 # stamp of the last robot state written (incremented by write_robot_state)
+        self._in_flight_stamp = -1 # stamp of the state used by the last triggered cycle
+        self._sol_stamp = -1 # stamp of the state from which the current cmds were computed
+
+        self._sol_deadline_ms = sol_deadline_ms # if not None, wait_for_solution returns after at most
+        # this time budget: controllers which did not finish are marked as stale (and are not triggered
+        # until they complete), while their previous cmds are kept. If None, all acks are waited for 
+        # (and an exception is thrown after timeout_ms)
+        self._sol_idxs = None # idxs of the controllers whose solution is read after a wait (None -> all)
+        self._partial_read_max_runs = partial_read_max_runs # partial solution readbacks use one transaction 
+        # per contiguous run of rows: above this many runs, the whole cmds are read at once instead
+
+        self._active_size = active_size # if not None, only the first active_size slots are initially 
+        # unparked. Parked slots are neither triggered nor waited for: the client stops (or does not spawn) 
+        # the processes hosting them. The active size can be changed at runtime with set_active_size()
+
         # flags
         self._was_running = False
         self._is_running = False
@@ -93,6 +168,11 @@ class ControlClusterServer(ABC):
         self._registered = torch.full(fill_value=False, size=(self.cluster_size, 1), dtype=torch.bool, device="cpu")
         self._prev_active_controllers = torch.full(fill_value=False, size=(self.cluster_size, 1), dtype=torch.bool, device="cpu")
         self._failed = torch.full(fill_value=False, size=(self.cluster_size, 1), dtype=torch.bool, device="cpu")
+        self._triggered_mask = torch.full(fill_value=False, size=(self.cluster_size, 1), dtype=torch.bool, device="cpu")
+        self._stale = torch.full(fill_value=False, size=(self.cluster_size, 1), dtype=torch.bool, device="cpu")
+        self._stale_since = torch.full(fill_value=np.nan, size=(self.cluster_size, 1), dtype=torch.float64, device="cpu")
+        self._parked = torch.full(fill_value=False, size=(self.cluster_size, 1), dtype=torch.bool, device="cpu")
+        self._pending_resets = torch.full(fill_value=False, size=(self.cluster_size, 1), dtype=torch.bool, device="cpu")
 
         # other data
         self._n_contacts = n_contacts
@@ -169,7 +249,9 @@ class ControlClusterServer(ABC):
                                 force_reconnection=self._force_reconnection,
                                 verbose=True,
                                 vlevel=self._vlevel,
-                                safe=False)
+                                safe=False,
+                                packed=self._packed_state,
+                                double_buffered=self._double_buffered_state)
         self._rhc_cmds = RhcCmds(namespace=self._namespace,
                                 is_server=True,
                                 n_robots=self.cluster_size,
@@ -182,7 +264,8 @@ class ControlClusterServer(ABC):
                                 force_reconnection=self._force_reconnection,
                                 verbose=True,
                                 vlevel=self._vlevel,
-                                safe=False)
+                                safe=False,
+                                packed=self._packed_sol)
         self._rhc_pred = RhcPred(namespace=self._namespace,
                                 is_server=True,
                                 n_robots=self.cluster_size,
@@ -195,7 +278,8 @@ class ControlClusterServer(ABC):
                                 force_reconnection=self._force_reconnection,
                                 verbose=True,
                                 vlevel=self._vlevel,
-                                safe=False)
+                                safe=False,
+                                packed=self._packed_sol)
         self._rhc_pred_delta=RhcPredDelta(namespace=self._namespace,
                                 is_server=True,
                                 n_robots=self.cluster_size,
@@ -208,7 +292,8 @@ class ControlClusterServer(ABC):
                                 force_reconnection=self._force_reconnection,
                                 verbose=True,
                                 vlevel=self._vlevel,
-                                safe=False)
+                                safe=False,
+                                packed=self._packed_sol)
 
         self._rhc_refs = RhcRefs(namespace=self._namespace,
                             is_server=True,
@@ -233,11 +318,18 @@ class ControlClusterServer(ABC):
             vlevel=self._vlevel,
             force_reconnection=self._force_reconnection,
             with_gpu_mirror=False,
-            with_torch_view=True)
+            with_torch_view=True,
+            packed_sol_info=self._packed_sol)
         cluster_info_dict = {}
         cluster_info_dict["cluster_size"] = self.cluster_size
         cluster_info_dict["cluster_dt"] = self._cluster_dt
         cluster_info_dict["low_level_control_dt"] = self._low_level_control_dt
+        cluster_info_dict["server_pid"] = os.getpid() # used, e.g., by clients for NUMA-aware placement
+        cluster_info_dict["trace_len"] = self._trace_len # controllers trace their cycles only if > 0
+        cluster_info_dict["hist_n_octaves"] = self._hist_n_octaves if self._latency_hist else 0 # 0 -> no histograms
+        cluster_info_dict["hist_sub_buckets"] = self._hist_sub_buckets
+        cluster_info_dict["hist_min_val"] = self._hist_min_val
+        cluster_info_dict["io_stats_dt"] = self._io_stats_dt if self._io_stats else 0 # 0 -> no IO accounting
         self._cluster_stats = RhcProfiling(cluster_size=self.cluster_size,
                                     param_dict=cluster_info_dict,
                                     is_server=True, 
@@ -246,6 +338,18 @@ class ControlClusterServer(ABC):
                                     vlevel=self._vlevel, 
                                     safe=True,
                                     force_reconnection=self._force_reconnection)
+        if self._io_stats: # created first, so that the IO of all other views is accounted
+            self._io_stats_srvr = IoStats(is_server=True,
+                                name=self._namespace,
+                                verbose=self._verbose,
+                                vlevel=self._vlevel,
+                                force_reconnection=self._force_reconnection)
+            self._io_stats_srvr.run()
+            from control_cluster_bridge.utilities.io_stats import enable_io_stats
+            enable_io_stats(namespace=self._namespace, 
+                publish_dt=self._io_stats_dt,
+                verbose=self._verbose,
+                vlevel=self._vlevel)
         self._remote_triggerer = RemoteTriggererSrvr(namespace=self._namespace,
                                             verbose=self._verbose,
                                             vlevel=self._vlevel,
@@ -257,7 +361,35 @@ class ControlClusterServer(ABC):
         self._rhc_pred_delta.run()
         self._rhc_refs.run()
         self._rhc_status.run()
-        self._cluster_stats.run()          
+        self._cluster_stats.run()
+        self._cluster_info_slots = self._cluster_stats.get_slots(["cluster_sol_time", 
+                                        "cluster_rt_factor",
+                                        "cluster_ready"])
+        if self._trace_len > 0:
+            self._rhc_trace = RhcTrace(cluster_size=self.cluster_size,
+                                trace_len=self._trace_len,
+                                is_server=True,
+                                name=self._namespace,
+                                verbose=self._verbose,
+                                vlevel=self._vlevel,
+                                force_reconnection=self._force_reconnection)
+            self._rhc_trace.run()
+        if self._latency_hist:
+            self._rhc_latency_hist = RhcLatencyHist(cluster_size=self.cluster_size,
+                                min_val=self._hist_min_val,
+                                n_octaves=self._hist_n_octaves,
+                                sub_buckets=self._hist_sub_buckets,
+                                is_server=True,
+                                name=self._namespace,
+                                verbose=self._verbose,
+                                vlevel=self._vlevel,
+                                force_reconnection=self._force_reconnection)
+            self._rhc_latency_hist.run()
+            self._rhc_latency_hist.init_writer(row=self.cluster_size) # last row -> cluster solution time
+        if self._active_size is not None:
+            park_state = self._rhc_status.park_state.get_torch_mirror()
+            park_state[self._active_size:, :] = self._rhc_status.park_state.PARKED # not spawned yet
+            self._rhc_status.park_state.synch_all(read=False, retry=True)          
     
     def close(self):
         # close all shared memory
@@ -277,8 +409,16 @@ class ControlClusterServer(ABC):
                 self._rhc_status.close()
             if self._cluster_stats is not None:
                 self._cluster_stats.close()
+            if self._rhc_trace is not None:
+                self._rhc_trace.close()
+            if self._rhc_latency_hist is not None:
+                self._rhc_latency_hist.close()
             if self._remote_triggerer is not None:
                 self._remote_triggerer.close()
+            if self._io_stats_srvr is not None:
+                from control_cluster_bridge.utilities.io_stats import disable_io_stats
+                disable_io_stats()
+                self._io_stats_srvr.close()
 
     def n_controllers(self):
         return self._n_controllers_connected
@@ -298,6 +438,27 @@ class ControlClusterServer(ABC):
     def trigger_counter(self):
         return self._trigger_counter
     
+    def pipelined(self):
+        return self._pipelined
+    
+    def state_stamp(self):
+        # stamp of the last robot state written to shared mem
+        return self._state_stamp
+    
+    def solution_stamp(self):
+        # stamp of the robot state the current cmds were computed from
+        # (in pipelined mode this lags behind state_stamp() by one cycle)
+        return self._sol_stamp
+    
+    def collect_solution(self):
+        # pipelined mode: blocks until the solution of the cycle in flight (if any)
+        # is available and reads it (e.g. before resetting or closing)
+        if self._in_flight:
+            self._wait_for_solution()
+            self._get_rhc_sol(idxs=self._sol_idxs)
+            self._sol_stamp = self._in_flight_stamp
+            self._in_flight = False
+    
     def pre_trigger(self):
         # first retrieve current controllers status (this is a 
         # separate method wrt trigger_solution to allow higher level code
@@ -314,6 +475,7 @@ class ControlClusterServer(ABC):
         self._now_active[:, :] = self._rhc_status.activation_state.get_torch_mirror(gpu=False) & \
                             self._rhc_status.registration.get_torch_mirror(gpu=False) # controllers have to be registered
                             # to be considered active
+        self._update_parked()
         self._pre_triggered=True
 
     def trigger_solution(self):
@@ -326,8 +488,15 @@ class ControlClusterServer(ABC):
             self._require_pretrigger() # we force sequentiality between pretriggering and
             # solution triggering
 
+        if self._pipelined:
+            self.collect_solution() # previous cycle has to be completed before triggering a new one
+
+        if self._latency_hist:
+            self._trigger_time = time.perf_counter()
         self._trigger_solution() # triggers solution of all controllers in the cluster 
         # which are ACTIVE using the latest available state
+        self._in_flight_stamp = self._state_stamp
+        self._in_flight = self._pipelined
         if self._debug:
             self._post_trigger_logs() # debug info
 
@@ -336,30 +505,74 @@ class ControlClusterServer(ABC):
         self._got_fresh_sol=False
     
     def _trigger_solution(self):
-        # trigger all
         trigger = self._rhc_status.trigger.get_torch_mirror()
-        trigger[:, :] = True
-        self._rhc_status.trigger.synch_all(read=False, retry=True)
-        self._remote_triggerer.trigger() # signal to listening controllers to process
-        # request
+        if not self._pre_triggered: # registration flags are otherwise updated by pre_trigger()
+            self._rhc_status.registration.synch_all(read=True, retry=True)
+            self._registered[:, :] = self._rhc_status.registration.get_torch_mirror(gpu=False)
+        if self._selective_trigger:
+            # trigger only active controllers
+            self._triggered_mask[:, :] = self._now_active
+        else:
+            # trigger all
+            self._triggered_mask[:, :] = True
+        self._triggered_mask[:, :] = self._triggered_mask & ~self._parked & self._registered # parked 
+        # controllers might be stopped (or not spawned at all), unregistered slots (e.g. of a crashed 
+        # controller being respawned, see pre_trigger()) would never ack
+        if self._pending_resets.any():
+            self._apply_pending_resets()
+        if self._sol_deadline_ms is not None:
+            # stale controllers are still solving -> they are not triggered (their trigger 
+            # flag is still set and will be cleared by them upon completion)
+            self._triggered_mask[:, :] = self._triggered_mask & ~self._stale
+            trigger[:, :] = trigger | self._triggered_mask
+        else:
+            trigger[:, :] = self._triggered_mask
+        if not bool(self._triggered_mask.all()):
+            self._triggered_idxs = torch.nonzero(self._triggered_mask.squeeze(dim=1)).squeeze(dim=1)
+            self._n_triggered = self._triggered_idxs.shape[0]
+        else:
+            self._triggered_idxs = None
+            self._n_triggered = self.cluster_size
+        self._sol_idxs = self._triggered_idxs
+        if self._sol_deadline_ms is not None:
+            # only the newly triggered rows are written: stale controllers concurrently clear
+            # their own row upon completion, which writing back the whole (possibly outdated) 
+            # mirror would undo (re-triggering them)
+            idxs = self._triggered_idxs if self._triggered_idxs is not None else torch.arange(self.cluster_size)
+            for start, n_rows in row_runs(idxs):
+                self._rhc_status.trigger.synch_retry(row_index=start, col_index=0,
+                                row_index_view=start,
+                                n_rows=n_rows, n_cols=1,
+                                read=False)
+        else:
+            self._rhc_status.trigger.synch_all(read=False, retry=True)
+        if self._n_triggered > 0:
+            self._remote_triggerer.trigger() # signal to listening controllers to process
+            # request
 
     def wait_for_solution(self):
         if self._debug:
             self._check_running()
             self._require_trigger() # we force sequentiality between triggering and
             # solution retrieval
-        self._wait_for_solution() # we wait for controllers to finish processing the trigger request
-        self._get_rhc_sol() # not super efficient, but safe: in theory we should read solution only from 
-        # controllers which where triggered (i.e. ACTIVE ones)
+        if not self._pipelined:
+            self._wait_for_solution() # we wait for controllers to finish processing the trigger request
+            self._get_rhc_sol(idxs=self._sol_idxs) # we only read solutions from 
+            # controllers which were triggered (and completed)
+            self._sol_stamp = self._in_flight_stamp
+        # else: cmds hold the solution of the previous cycle (already collected, see solution_stamp()), 
+        # while the one just triggered is left in flight and collected at the next cycle
         if self._debug:
             self._solution_time = time.perf_counter() - self._start_time # we profile the whole solution pipeline
             # and update some shared debug info
-            self._cluster_stats.write_info(dyn_info_name=["cluster_sol_time", 
-                                        "cluster_rt_factor",
-                                        "cluster_ready"],
+            self._cluster_stats.write_slots(slots=self._cluster_info_slots,
                         val=[self._solution_time,
                             self._cluster_dt/self._solution_time,
-                            self.is_running()])
+                            self.is_running()]) # single transaction
+
+        if self._io_stats_srvr is not None:
+            from control_cluster_bridge.utilities.io_stats import maybe_flush_io_stats
+            maybe_flush_io_stats()
 
         self._was_running = self._is_running
         self._solution_counter += 1
@@ -368,22 +581,97 @@ class ControlClusterServer(ABC):
     
     def _wait_for_solution(self):
 
-        if not self._remote_triggerer.wait_ack_from(self.cluster_size, 
-                                self._remote_triggerer_ack_timeout):
-            Journal.log(self.__class__.__name__,
-                "_wait_for_solution",
-                f"Didn't receive any or all acks from controllers (expected {self.cluster_size})!",
-                LogType.EXCEP,
-                throw_when_excep = True)
+        if self._sol_deadline_ms is not None:
+            self._wait_for_solution_deadline()
+        # only triggered controllers send an ack (controllers with nothing
+        # to process go back to waiting without acking)
+        elif self._n_triggered > 0:
+            self._wait_for_acks()
+        
+        if self._rhc_latency_hist is not None and self._n_triggered > 0:
+            self._rhc_latency_hist.record(time.perf_counter() - self._trigger_time)
         
         # update flags (written by controllers upon solution request)
         self._rhc_status.fails.synch_all(read=True,
                                     retry=True)
         self._failed[:,:] = self._rhc_status.fails.get_torch_mirror(gpu=False)
 
+    def _wait_for_acks(self):
+
+        # acks are waited for in chunks of at most _ack_check_dt_ms: a controller which died 
+        # while solving never acks, but its slot is unregistered by the client (see ControlClusterClient's 
+        # max_respawns), and is not waited for (nor its solution read) anymore. A controller clears its 
+        # trigger flag before acking -> we wait both for the acks still owed (so that none is received 
+        # in the next cycle) and, after these are received, for the triggered slots still pending
+        n_expected = self._n_triggered
+        n_received = 0
+        n_acks = n_expected
+        waited_ms = 0
+        trigger = self._rhc_status.trigger.get_torch_mirror()
+        while True:
+            if self._remote_triggerer.wait_ack_from(n_acks, self._ack_check_dt_ms):
+                n_received += n_acks
+            else:
+                waited_ms += self._ack_check_dt_ms
+                self._rhc_status.registration.synch_all(read=True, retry=True)
+                self._registered[:, :] = self._rhc_status.registration.get_torch_mirror(gpu=False)
+                if (self._triggered_mask & ~self._registered).any():
+                    self._triggered_mask[:, :] = self._triggered_mask & self._registered
+                    self._sol_idxs = torch.nonzero(self._triggered_mask.squeeze(dim=1)).squeeze(dim=1)
+                    n_expected = int(self._triggered_mask.sum().item())
+            self._rhc_status.trigger.synch_all(read=True, retry=True)
+            n_pending = int((trigger & self._triggered_mask).sum().item())
+            n_acks = max(n_expected - n_received, n_pending)
+            if n_acks == 0:
+                break
+            if waited_ms >= self._remote_triggerer_ack_timeout:
+                Journal.log(self.__class__.__name__,
+                    "_wait_for_acks",
+                    f"Didn't receive any or all acks from controllers (still pending: {n_acks})!",
+                    LogType.EXCEP,
+                    throw_when_excep = True)
+
+    def _wait_for_solution_deadline(self):
+        
+        # waits for the triggered controllers for at most sol_deadline_ms. 
+        # The trigger flags (cleared by each controller after solving) tell which ones 
+        # completed, independently of the acks count. Acks from stale controllers completing late
+        # are received in later cycles and might make wait_ack_from return early: in that case 
+        # we keep waiting for the ones still pending within the remaining budget
+        deadline = time.perf_counter() + self._sol_deadline_ms * 1e-3
+        n_acks = self._n_triggered
+        trigger = self._rhc_status.trigger.get_torch_mirror()
+        while True:
+            budget_ms = (deadline - time.perf_counter()) * 1e3
+            if n_acks > 0 and budget_ms > 0:
+                self._remote_triggerer.wait_ack_from(n_acks, int(budget_ms))
+            self._rhc_status.trigger.synch_all(read=True, retry=True)
+            n_acks = int((trigger & self._triggered_mask).sum().item()) # still pending
+            if n_acks == 0 or time.perf_counter() >= deadline:
+                break
+        
+        pending = trigger & (self._triggered_mask | self._stale)
+        completed = ~pending & (self._triggered_mask | self._stale) # also stale ones which completed late
+        now = time.perf_counter()
+        self._stale_since[completed] = np.nan
+        self._stale_since[pending & ~self._stale] = now
+        self._stale[:, :] = pending
+        self._rhc_status.stale.get_torch_mirror()[:, :] = self._stale # published for clients/env
+        self._rhc_status.stale.synch_all(read=False, retry=True)
+        self._sol_idxs = torch.nonzero(completed.squeeze(dim=1)).squeeze(dim=1) # others keep their previous cmds
+
+        if (now - self._stale_since[pending] > self._remote_triggerer_ack_timeout * 1e-3).any():
+            Journal.log(self.__class__.__name__,
+                "_wait_for_solution_deadline",
+                f"Some controllers have been stale for more than {self._remote_triggerer_ack_timeout} ms!",
+                LogType.EXCEP,
+                throw_when_excep = True)
+
     def reset_controllers(self,
                     idxs: torch.Tensor = None):
         
+        self.collect_solution() # acks from a cycle in flight would be mixed with the reset ones
+
         # set reset request
         resets = self._rhc_status.resets.get_torch_mirror()
         if idxs is not None:
@@ -394,22 +682,134 @@ class ControlClusterServer(ABC):
             # resets all controllers
             resets[:, :] = True
             self._rhc_status.resets.synch_all(read=False, retry=True)
+        self._update_parked()
+        if self._parked.any():
+            self._pending_resets[:, :] = self._pending_resets | (resets & self._parked)
+            resets[:, :] = resets & ~self._parked # parked controllers cannot ack (they are
+            # reset together with their first solution after being unparked, see _apply_pending_resets())
+            self._rhc_status.resets.synch_all(read=False, retry=True)
+        self._pending_resets[:, :] = self._pending_resets & ~resets # reset now
+        n_resets = int(resets.sum().item()) # only controllers with a pending reset will ack
         # send signal to listening controllers to process request
         self._remote_triggerer.trigger() 
-        if not self._remote_triggerer.wait_ack_from(self.cluster_size, 
+        if self._sol_deadline_ms is not None:
+            self._wait_for_resets(reset_mask=resets.clone(), 
+                        n_resets=n_resets)
+        elif not self._remote_triggerer.wait_ack_from(n_resets, 
                             self._remote_triggerer_ack_timeout):
             Journal.log(self.__class__.__name__,
                 "reset_controllers",
-                f"Didn't receive any or all acks from controllers (expected {self.cluster_size})!",
+                f"Didn't receive any or all acks from controllers (expected {n_resets})!",
                 LogType.EXCEP,
                 throw_when_excep = True)
         
-        self._get_rhc_sol() # not super efficient, but safe: in theory we should only update the 
-        # sol of the controllers which where reset 
+        self._get_rhc_sol(idxs=idxs) # only update the sol of the controllers which where reset 
 
         self._rhc_status.resets.synch_all(read=True, retry=True) # update reset flags (controllers
         # reset flags upon successful reset)
 
+    def _apply_pending_resets(self):
+
+        # reset requests received while parked are set along with the first trigger after being
+        # unparked: the controller then resets and solves upon the same wake up (and acks once)
+        apply = self._pending_resets & self._triggered_mask
+        if not bool(apply.any()):
+            return
+        idxs = torch.nonzero(apply.squeeze(dim=1)).squeeze(dim=1)
+        resets = self._rhc_status.resets.get_torch_mirror()
+        resets[idxs, :] = True
+        for start, n_rows in row_runs(idxs): # other rows might be concurrently cleared by controllers
+            self._rhc_status.resets.synch_retry(row_index=start, col_index=0,
+                            row_index_view=start,
+                            n_rows=n_rows, n_cols=1,
+                            read=False)
+        self._pending_resets[:, :] = self._pending_resets & ~apply
+
+    def _wait_for_resets(self,
+                    reset_mask: torch.Tensor,
+                    n_resets: int):
+        
+        # with stale controllers, late acks of their solutions might be counted as reset acks
+        # (making wait_ack_from return early) and a stale controller might miss the reset broadcast
+        # (it is not waiting while solving). Pending resets are therefore checked on the reset flags 
+        # (cleared by each controller upon reset) and the broadcast is repeated while some are pending
+        resets = self._rhc_status.resets.get_torch_mirror()
+        deadline = time.perf_counter() + self._remote_triggerer_ack_timeout * 1e-3
+        n_acks = n_resets
+        while n_acks > 0:
+            budget_ms = (deadline - time.perf_counter()) * 1e3
+            if budget_ms <= 0:
+                Journal.log(self.__class__.__name__,
+                    "_wait_for_resets",
+                    f"Didn't receive any or all acks from controllers (still pending: {n_acks})!",
+                    LogType.EXCEP,
+                    throw_when_excep = True)
+            self._remote_triggerer.wait_ack_from(n_acks, int(min(budget_ms, self._ack_check_dt_ms)))
+            self._rhc_status.resets.synch_all(read=True, retry=True)
+            n_acks = int((resets & reset_mask).sum().item()) # still pending
+            if n_acks > 0:
+                self._remote_triggerer.trigger()
+
+    def park_controllers(self,
+                    idxs: torch.Tensor):
+        
+        # parked controllers are not triggered anymore and the client 
+        # stops the processes hosting them (until they are unparked)
+        self._set_park_state(idxs=idxs, 
+                        from_states=[self._rhc_status.park_state.RUNNING,
+                                self._rhc_status.park_state.UNPARK_REQ],
+                        to_state=self._rhc_status.park_state.PARK_REQ)
+
+    def unpark_controllers(self,
+                    idxs: torch.Tensor):
+        
+        # controllers are triggered again only after the client has 
+        # resumed (or spawned) them (see get_parked_controllers())
+        self._set_park_state(idxs=idxs, 
+                        from_states=[self._rhc_status.park_state.PARK_REQ,
+                                self._rhc_status.park_state.PARKED],
+                        to_state=self._rhc_status.park_state.UNPARK_REQ)
+
+    def set_active_size(self,
+                    n: int):
+        
+        if n < 0 or n > self.cluster_size:
+            Journal.log(self.__class__.__name__,
+                "set_active_size",
+                f"Active size should be in [0, {self.cluster_size}], got {n}!",
+                LogType.EXCEP,
+                throw_when_excep = True)
+        idxs = torch.arange(self.cluster_size)
+        self.unpark_controllers(idxs=idxs[:n])
+        self.park_controllers(idxs=idxs[n:])
+        self._active_size = n
+    
+    def active_size(self):
+        return self._active_size if self._active_size is not None else self.cluster_size
+    
+    def _set_park_state(self,
+                    idxs: torch.Tensor,
+                    from_states: List[int],
+                    to_state: int):
+        
+        self.collect_solution() # a cycle in flight would be waiting for the parked controllers
+        park_state = self._rhc_status.park_state
+        # written row by row under the park state's semaphore, since controllers 
+        # concurrently ack their own rows
+        park_state.data_sem_acquire()
+        try:
+            for idx in idxs.tolist():
+                if park_state.read_retry(row_index=idx, col_index=0)[0] in from_states:
+                    park_state.write_retry(to_state, row_index=idx, col_index=0)
+        finally:
+            park_state.data_sem_release()
+        self._update_parked()
+
+    def _update_parked(self):
+        self._rhc_status.park_state.synch_all(read=True, retry=True)
+        self._parked[:, :] = self._rhc_status.park_state.get_torch_mirror(gpu=False) != \
+                                    self._rhc_status.park_state.RUNNING
+        
     def activate_controllers(self,
                     idxs: torch.Tensor = None):
         if idxs is not None:
@@ -425,6 +825,25 @@ class ControlClusterServer(ABC):
 
         return self._robot_states
     
+    def get_latency_stats(self,
+                    percentiles: List[float] = [50, 95, 99]):
+        
+        # p50/p95/p99/max [s] of the controllers' solve loop times (per controller and pooled)
+        # and of the cluster solution time (None if latency_hist is not enabled)
+        if self._rhc_latency_hist is None:
+            return None
+        return self._rhc_latency_hist.get_stats(percentiles=percentiles)
+    
+    def get_io_stats(self):
+
+        # cumulative shared memory IO counters of the whole cluster (names and an array with
+        # columns IoStats.BYTES, TRANSACTIONS, IO_TIME, SEM_WAIT). None if io_stats is not enabled
+        if self._io_stats_srvr is None:
+            return None
+        from control_cluster_bridge.utilities.io_stats import flush_io_stats
+        flush_io_stats()
+        return self._io_stats_srvr.read()
+    
     def get_refs(self):
 
         return self._rhc_refs
@@ -518,6 +937,34 @@ class ControlClusterServer(ABC):
             # no controller active
             return None
     
+    def get_stale_controllers(self,
+                    gpu=False):
+
+        # controllers which did not complete within the deadline 
+        # (their cmds are the ones from their last completed solution)
+        stale = torch.nonzero(self._stale.squeeze(dim=1)).squeeze(dim=1)
+        if not stale.shape[0] == 0:
+            if gpu:
+                return stale.cuda() # n_envs x 8 bits of CPU -> GPU (RX)
+            else:
+                return stale
+        else:
+            # no controller stale
+            return None
+    
+    def get_parked_controllers(self,
+                    gpu=False):
+
+        parked = torch.nonzero(self._parked.squeeze(dim=1)).squeeze(dim=1)
+        if not parked.shape[0] == 0:
+            if gpu:
+                return parked.cuda() # n_envs x 8 bits of CPU -> GPU (RX)
+            else:
+                return parked
+        else:
+            # no controller parked
+            return None
+    
     def get_registered_controllers(self,
                     gpu=False):
 
@@ -545,9 +992,26 @@ class ControlClusterServer(ABC):
     def triggered(self):
         return self._triggered
     
+    def stage_robot_state(self):
+
+        # starts copying the robot state to CPU without blocking (only with staged_state_synch). 
+        # The returned event can be waited on; write_robot_state() completes the synch. Allows 
+        # overlapping the copy with other work on the default stream
+        if not self._staged_state_synch:
+            return None
+        return self._robot_states.stage_mirror()
+    
     def write_robot_state(self):
 
-        if self._using_gpu:
+        if self._pipelined:
+            self.collect_solution() # controllers might still be reading the previous state
+
+        self._state_stamp += 1
+        if self._staged_state_synch:
+            if not self._robot_states.staged():
+                self._robot_states.stage_mirror()
+            self._robot_states.publish_staged()
+        elif self._using_gpu:
             # updates shared tensor on CPU with latest data from states on GPU
             # and writes to shared mem (GPU -> CPU copy here)
             # the total size of the data copied is
@@ -561,8 +1025,22 @@ class ControlClusterServer(ABC):
             # only write to shared mem (gpu mirror is not used)
             self._robot_states.synch_to_shared_mem()
         
-    def _get_rhc_sol(self):
+    def _get_rhc_sol(self,
+            idxs: torch.Tensor = None):
 
+        if idxs is not None:
+            # partial readback (only rows in idxs)
+            if idxs.shape[0] == 0:
+                return
+            if self._using_gpu:
+                self._rhc_cmds.synch_mirror_rows(robot_idxs=idxs,
+                    non_blocking=True,
+                    max_runs=self._partial_read_max_runs) # only the rows which were read are copied to GPU
+            else:
+                self._rhc_cmds.synch_rows_from_shared_mem(robot_idxs=idxs,
+                    max_runs=self._partial_read_max_runs) # might fall back to a full read
+            return
+        
         if self._using_gpu:
             self._rhc_cmds.synch_mirror(from_gpu=False,
                 non_blocking=True) # read from shared mem and then copy to GPU
@@ -27,12 +27,13 @@ from control_cluster_bridge.utilities.shared_data.rhc_data import RobotState
 from control_cluster_bridge.utilities.shared_data.rhc_data import RhcCmds, RhcPred, RhcPredDelta
 from control_cluster_bridge.utilities.shared_data.rhc_data import RhcStatus
 from control_cluster_bridge.utilities.shared_data.rhc_data import RhcInternal
-from control_cluster_bridge.utilities.shared_data.cluster_profiling import RhcProfiling
+from control_cluster_bridge.utilities.shared_data.cluster_profiling import RhcProfiling, RhcTrace, RhcLatencyHist
 from control_cluster_bridge.utilities.remote_triggering import RemoteTriggererClnt
 
 from control_cluster_bridge.utilities.homing import RobotHomer
 
-from control_cluster_bridge.utilities.math_utils import world2base_frame
+from control_cluster_bridge.utilities.math_utils import world2base_frame, world2base_frame_multi
+from control_cluster_bridge.utilities.math_utils import rot_matrix, world2base_frame_R
 
 from EigenIPC.PyEigenIPC import VLevel
 from EigenIPC.PyEigenIPC import Journal, LogType
@@ -44,10 +45,13 @@ from typing import List
 
 import signal
 import os
+import sys
 import inspect
 
 class RHController(ABC):
 
+    _spawn_index = None # default controller index (set by the cluster client while generating controllers)
+
     def __init__(self, 
             srdf_path: str,
             n_nodes: int,
@@ -57,12 +61,24 @@ class RHController(ABC):
             verbose = False, 
             debug = False,
             timeout_ms: int = 60000,
-            allow_less_jnts: bool = True):
+            allow_less_jnts: bool = True,
+            pred_delta_every: int = 1,
+            attach: bool = True,
+            controller_index: int = None):
     
-        signal.signal(signal.SIGINT, self._handle_sigint)
+        # if attach is False, only the problem is built (no shared mem. is touched and
+        # no signal handler is installed): the controller can then be used as a prototype
+        # to be forked and later attached to the cluster with attach() (the child's
+        # _init_problem should not rely on shared data in this case)
+        self._attached = False
 
         self._allow_less_jnts = allow_less_jnts # whether to allow less joints in rhc controller than the ones on the robot
         # (e.g. some joints might not be desirable for control purposes)
+        
+        self._pred_delta_every = pred_delta_every # pred. deltas (RhcPredDelta) are computed every 
+        # pred_delta_every solves (<= 0 -> never, e.g. if nobody is consuming them)
+        self._n_solves_since_delta = pred_delta_every - 1 # so that the first solve computes them
+        self._pred_delta_bufs = None
 
         self.namespace = namespace
         self._dtype = dtype
@@ -79,6 +95,9 @@ class RHController(ABC):
         self._set_rhc_pred_idx() # prection is by default written on last node
         self._set_rhc_cmds_idx() # default to idx 2 (i.e. cmds to get to third node)
         self.controller_index = None # will be assigned upon registration to a cluster
+        self._controller_index_req = controller_index if controller_index is not None \
+            else RHController._spawn_index # if provided (e.g. spawn index), this slot is 
+        # claimed without any lock (otherwise the first free one is used)
         self.controller_index_np = None 
         self._robot_mass=1.0
 
@@ -104,6 +123,10 @@ class RHController(ABC):
         self.rhc_status = None
         self.rhc_internal = None
         self.cluster_stats = None
+        self.rhc_trace = None # per-phase tracing of solve cycles (only if enabled by the server)
+        self._trace_record = None
+        self.rhc_latency_hist = None # solve loop time histogram (only if enabled by the server)
+        self._io_stats = False # shared memory IO accounting (only if enabled by the server)
         self.robot_cmds = None
         self.robot_pred = None
         self.rhc_pred_delta = None
@@ -142,12 +165,13 @@ class RHController(ABC):
 
         self._class_name_base = f"{self.__class__.__name__}"
 
-        self._contact_force_base_loc_aux=np.zeros((1,3),dtype=self._dtype)
+        self._contact_forces_base_loc_aux=None # n_contacts x 3, allocated upon registration
         self._norm_grav_vector_w=np.zeros((1,3),dtype=self._dtype)
         self._norm_grav_vector_w[:, 2]=-1.0
         self._norm_grav_vector_base_loc=np.zeros((1,3),dtype=self._dtype)
+        self._rot_sol_aux=np.zeros((1,3,3),dtype=self._dtype) # base rotation at cmds node (reused across transforms)
 
-        self._init() # initialize controller
+        self._init(attach=attach) # initialize controller
 
         if not hasattr(self, '_rhc_fpaths'):
             self._rhc_fpaths = []
@@ -191,6 +215,9 @@ class RHController(ABC):
     def _close(self):
         if not self._closed:
             self._unregister_from_cluster()
+            if self._io_stats:
+                from control_cluster_bridge.utilities.io_stats import disable_io_stats
+                disable_io_stats() # publishes what is left
             if self.robot_cmds is not None:
                 self.robot_cmds.close()
             if self.robot_pred is not None:
@@ -205,6 +232,10 @@ class RHController(ABC):
                 self.rhc_internal.close()
             if self.cluster_stats is not None:
                 self.cluster_stats.close()
+            if self.rhc_trace is not None:
+                self.rhc_trace.close()
+            if self.rhc_latency_hist is not None:
+                self.rhc_latency_hist.close()
             if self._remote_triggerer is not None:
                 self._remote_triggerer.close()
             if self._remote_term is not None:
@@ -297,8 +328,10 @@ class RHController(ABC):
 
         self.robot_state.synch_from_shared_mem(robot_idx=self.controller_index, robot_idx_view=self.controller_index_np) # updates robot state with
         # latest data on shared mem
+        self._trace_stamp(RhcTrace.STATE_READ)
 
         self._compute_pred_delta()
+        self._trace_stamp(RhcTrace.PRED_DELTA)
 
         if not self.failed():
             # we can solve only if not in failure state
@@ -322,8 +355,10 @@ class RHController(ABC):
                             " Use the reset() method to continue solving!",
                         LogType.WARN)
             
+        self._trace_stamp(RhcTrace.SOLVE)
         self._write_cmds_from_sol() # we update update the views of the cmds
         # from the latest solution
+        self._trace_stamp(RhcTrace.CMDS_WRITE)
     
         # in debug, rhc internal state is streamed over 
         # shared mem.
@@ -341,8 +376,10 @@ class RHController(ABC):
 
         self.robot_state.synch_from_shared_mem(robot_idx=self.controller_index, robot_idx_view=self.controller_index_np) # updates robot state with
         # latest data on shared mem
+        self._trace_stamp(RhcTrace.STATE_READ)
 
         self._compute_pred_delta()
+        self._trace_stamp(RhcTrace.PRED_DELTA)
 
         if not self.failed():
             # we can solve only if not in failure state
@@ -366,8 +403,10 @@ class RHController(ABC):
                             " Use the reset() method to continue solving!",
                         LogType.WARN)
                     
+        self._trace_stamp(RhcTrace.SOLVE)
         self._write_cmds_from_sol() # we update the views of the cmds
         # from the latest solution even if failed
+        self._trace_stamp(RhcTrace.CMDS_WRITE)
         
     def solve(self):
         
@@ -375,37 +414,145 @@ class RHController(ABC):
         # using cond. variables (efficient)
         while not self._term_req_received:
             # we are always listening for a trigger signal 
-            if not self._remote_triggerer.wait(self._remote_triggerer_timeout):
-                Journal.log(self._class_name_base,
-                    "solve",
-                    "Didn't receive any remote trigger req within timeout!",
-                    LogType.EXCEP,
-                    throw_when_excep = False)
+            if not self.wait_for_trigger():
                 break
-            self._received_trigger = True
-            # signal received -> we process incoming requests
-            # perform reset, if required
-            if self.rhc_status.resets.read_retry(row_index=self.controller_index,
+            if self.park_requested():
+                RHController.park([self]) # blocks until unparked
+            self.process_requests()
+            self.flush_io_stats()
+        self.close() # is not stricly necessary
+
+    def wait_for_trigger(self):
+        
+        # blocks until a trigger signal is received from the server 
+        # (triggers are broadcasted to all controllers)
+        while not self._remote_triggerer.wait(self._remote_triggerer_timeout):
+            if self._remote_term.read_retry(row_index=0,
+                                col_index=0,
+                                row_index_view=0)[0]:
+                self._term_req_received = True
+                return False
+            if self.park_requested():
+                return True # parked controllers are not triggered -> timeouts are expected
+                # (the caller is supposed to park)
+            Journal.log(self._class_name_base,
+                "solve",
+                "Didn't receive any remote trigger req within timeout!",
+                LogType.EXCEP,
+                throw_when_excep = False)
+            return False
+        return True
+    
+    def flush_io_stats(self):
+
+        # IO accounting is published from here only (never while parked, see utilities/io_stats.py)
+        if self._io_stats:
+            from control_cluster_bridge.utilities.io_stats import maybe_flush_io_stats
+            maybe_flush_io_stats()
+    
+    def park_requested(self):
+
+        # lock-free (the park state view is not safe)
+        return self.rhc_status.park_state.read_retry(row_index=self.controller_index,
+                                col_index=0,
+                                row_index_view=0)[0] in [self.rhc_status.park_state.PARK_REQ,
+                                                    self.rhc_status.park_state.PARKED]
+    
+    @staticmethod
+    def park(controllers: List,
+            poll_dt: float = 0.01):
+        
+        # cooperative parking of all the controllers served by the calling thread (which 
+        # would otherwise be blocked by a single parked controller). Park requests are acked 
+        # (PARKED) and, from the last ack on, only the park flags and the termination flag are polled 
+        # without taking any lock, so that the client can safely stop (SIGSTOP) the process. Returns as 
+        # soon as any of the controllers is unparked or termination is requested
+        for controller in controllers:
+            controller._switch_park_state(from_states=[controller.rhc_status.park_state.PARK_REQ,
+                                                controller.rhc_status.park_state.PARKED],
+                                    to_state=controller.rhc_status.park_state.PARKED)
+        while True:
+            time.sleep(poll_dt)
+            if any(controller._term_req_received for controller in controllers) or \
+                controllers[0]._remote_term.read_retry(row_index=0,
+                                        col_index=0,
+                                        row_index_view=0)[0]:
+                return # SIGINT or remote termination
+            unparked = False
+            for controller in controllers:
+                if controller.rhc_status.park_state.read_retry(row_index=controller.controller_index,
                                     col_index=0,
-                                    row_index_view=0)[0]:
-                self.reset() # rhc is reset
-            # check if a trigger request was received
-            if self.rhc_status.trigger.read_retry(row_index=self.controller_index,
-                        col_index=0,
-                        row_index_view=0)[0]:
-                self._rhc() # run solution
-                self.rhc_status.trigger.write_retry(False, 
-                    row_index=self.controller_index,
+                                    row_index_view=0)[0] == controller.rhc_status.park_state.UNPARK_REQ:
+                    unparked = controller._switch_park_state(from_states=[controller.rhc_status.park_state.UNPARK_REQ],
+                                                    to_state=controller.rhc_status.park_state.RUNNING) or unparked
+            if unparked:
+                return
+    
+    def _switch_park_state(self,
+                    from_states: List[int],
+                    to_state: int):
+        
+        # park state transitions are done under the park state's semaphore (the client 
+        # only stops a process while holding it, i.e. never in the middle of a transition)
+        park_state = self.rhc_status.park_state
+        park_state.data_sem_acquire()
+        try:
+            switch = park_state.read_retry(row_index=self.controller_index,
+                                col_index=0,
+                                row_index_view=0)[0] in from_states
+            if switch:
+                park_state.write_retry(to_state, 
+                                row_index=self.controller_index,
+                                col_index=0,
+                                row_index_view=0)
+        finally:
+            park_state.data_sem_release()
+        return switch
+    
+    def process_requests(self):
+
+        # processes pending requests for this controller (reset and/or solution) after a trigger 
+        # signal was received. Returns False if termination was requested
+        self._received_trigger = True
+        self._trace_stamp(RhcTrace.WAKE)
+        # signal received -> we process incoming requests
+        processed = False
+        solved = False
+        # perform reset, if required
+        if self.rhc_status.resets.read_retry(row_index=self.controller_index,
+                                col_index=0,
+                                row_index_view=0)[0]:
+            self.reset() # rhc is reset
+            processed = True
+        # check if a trigger request was received
+        if self.rhc_status.trigger.read_retry(row_index=self.controller_index,
                     col_index=0,
-                    row_index_view=0) # allow next solution trigger 
-            
+                    row_index_view=0)[0]:
+            if self.rhc_latency_hist is not None:
+                start = time.perf_counter()
+                self._rhc() # run solution
+                self.rhc_latency_hist.record(time.perf_counter() - start)
+            else:
+                self._rhc() # run solution
+            solved = True
+            self.rhc_status.trigger.write_retry(False, 
+                row_index=self.controller_index,
+                col_index=0,
+                row_index_view=0) # allow next solution trigger 
+            processed = True
+        
+        if processed: # the server only waits for acks from controllers 
+            # which had something to process (i.e. were triggered or reset)
             self._remote_triggerer.ack() # send ack signal to server
-            self._received_trigger = False
-            
-            self._term_req_received = self._term_req_received or self._remote_term.read_retry(row_index=0,
-                                                            col_index=0,
-                                                            row_index_view=0)[0]
-        self.close() # is not stricly necessary
+        if solved and self.rhc_trace is not None:
+            self._trace_stamp(RhcTrace.ACK)
+            self.rhc_trace.write_record(self._trace_record)
+        self._received_trigger = False
+        
+        self._term_req_received = self._term_req_received or self._remote_term.read_retry(row_index=0,
+                                                        col_index=0,
+                                                        row_index_view=0)[0]
+        return not self._term_req_received
 
     def reset(self):
         
@@ -484,65 +631,26 @@ class RHController(ABC):
             )
         self.rhc_status.run() # rhc status (reg. flags, failure, tot cost, tot cnstrl viol, etc...)
 
-        # acquire semaphores since we have to perform non-atomic operations
-        # on the whole memory views
-        self.rhc_status.registration.data_sem_acquire()
-        self.rhc_status.controllers_counter.data_sem_acquire()
-        self.rhc_status.controllers_counter.synch_all(retry = True,
-                                                read = True)
-
-        available_spots = self.rhc_status.cluster_size
-        # from here on all pre registration ops can be done
-
-        # incrementing cluster controllers counter
-        controllers_counter = self.rhc_status.controllers_counter.get_numpy_mirror()
-        if controllers_counter[0, 0] + 1 > available_spots: # no space left -> return 
-            self.rhc_status.controllers_counter.data_sem_release()
-            self.rhc_status.registration.data_sem_release()
-            exception = "Cannot register to cluster. No space left " + \
-                f"({controllers_counter[0, 0]} controllers already registered)"
-            Journal.log(self._class_name_base,
-                    "_register_to_cluster",
-                    exception,
-                    LogType.EXCEP,
-                    throw_when_excep = True) 
-        
-        # now we can register 
-
-        # increment controllers counter
-        controllers_counter += 1 
-        self.controller_index = controllers_counter.item() -1 
-        
-        # actually register to cluster
-        self.rhc_status.controllers_counter.synch_all(retry = True,
-            read = False) # writes to shared mem (just one for all controllers (i.e n_rows = 1))
-        
-        # read current registration state
-        self.rhc_status.registration.synch_all(retry = True,
-                                        read = True,
-                                        row_index=self.controller_index,
-                                        row_index_view=0)
-        registrations = self.rhc_status.registration.get_numpy_mirror()
-        # self.controller_index = self._assign_cntrl_index(registrations)
-        
+        self._claim_slot() # gets this controller's index (short locked section at most)
+        self.rhc_status.pids.write_retry(os.getpid(), 
+                                row_index=self.controller_index,
+                                col_index=0,
+                                row_index_view=0) # allows cleaning up the slot if this process dies
+        self._switch_park_state(from_states=[self.rhc_status.park_state.UNPARK_REQ],
+                        to_state=self.rhc_status.park_state.RUNNING) # lazily spawned upon unparking
 
         self._class_name_base = self._class_name_base+str(self.controller_index)
         # self.controller_index_np = np.array(self.controller_index)
         self.controller_index_np = np.array(0) # given that we use optimize_mem, the shared mem copy has shape 1 x n_cols (we can write and read at [0, :])
-        
-        registrations[self.controller_index_np, 0] = True
-        self.rhc_status.registration.synch_all(retry = True,
-                                        read = False,
-                                        row_index=self.controller_index,
-                                        col_index=0,
-                                        row_index_view=0) 
 
-        # now all heavy stuff that would otherwise make the registration slow
+        # now all heavy stuff (runs concurrently with other controllers' registration)
         self._remote_term = SharedTWrapper(namespace=self.namespace,
             basename="RemoteTermination",
             is_server=False,
             verbose = self._verbose, 
             vlevel = VLevel.V2,
+            safe = False, # boolean operations are atomic on 64 bit systems (also, parked controllers
+            # poll it and should not take any lock)
             with_gpu_mirror=False,
             with_torch_view=False,
             dtype=dtype.Bool)
@@ -560,8 +668,43 @@ class RHController(ABC):
                                     ) # profiling data
         self.cluster_stats.run()
         self.cluster_stats.synch_info()
+        trace_len = self.cluster_stats.get_info(info_name="trace_len")
+        if trace_len is not None and trace_len > 0:
+            self.rhc_trace = RhcTrace(is_server=False,
+                                name=self.namespace,
+                                verbose=self._verbose,
+                                vlevel=VLevel.V2,
+                                optimize_mem=True,
+                                cluster_size=1) # we just need the row corresponding to this controller
+            self.rhc_trace.run()
+            self.rhc_trace.init_writer(controller_idx=self.controller_index)
+            self._trace_record = np.full((1, RhcTrace.N_COLS), fill_value=np.nan)
+        hist_n_octaves = self.cluster_stats.get_info(info_name="hist_n_octaves")
+        if hist_n_octaves is not None and hist_n_octaves > 0:
+            self.rhc_latency_hist = RhcLatencyHist(is_server=False,
+                                min_val=self.cluster_stats.get_info(info_name="hist_min_val"),
+                                n_octaves=int(hist_n_octaves),
+                                sub_buckets=int(self.cluster_stats.get_info(info_name="hist_sub_buckets")),
+                                name=self.namespace,
+                                verbose=self._verbose,
+                                vlevel=VLevel.V2,
+                                optimize_mem=True,
+                                cluster_size=1) # we just need the row corresponding to this controller
+            self.rhc_latency_hist.run()
+            self.rhc_latency_hist.init_writer(row=self.controller_index)
+        io_stats_dt = self.cluster_stats.get_info(info_name="io_stats_dt")
+        if io_stats_dt is not None and io_stats_dt > 0:
+            from control_cluster_bridge.utilities.io_stats import enable_io_stats
+            enable_io_stats(namespace=self.namespace,
+                publish_dt=io_stats_dt,
+                verbose=self._verbose,
+                vlevel=VLevel.V2)
+            self._io_stats = True
     
         self._create_jnt_maps()
+        self._init_pred_delta_bufs()
+        self._contact_forces_base_loc_aux=np.zeros((len(self.robot_state.contact_names()), 3),
+                                        dtype=self._dtype)
         self.init_rhc_task_cmds() # initializes rhc interface to external commands (defined by child class)
         self._consinstency_checks() # sanity checks
 
@@ -681,12 +824,73 @@ class RHController(ABC):
                     LogType.STAT,
                     throw_when_excep = True)
         
-        # we can now release everything so that other controllers can register
-        self.rhc_status.controllers_counter.data_sem_release()
-        self.rhc_status.registration.data_sem_release()
+        # we are ready -> actually register to cluster (own row -> no lock needed)
+        self.rhc_status.registration.write_retry(True, 
+                                row_index=self.controller_index,
+                                col_index=0,
+                                row_index_view=0)
+        self._update_controllers_counter(increment=1)
 
         self._registered = True
 
+    def _claim_slot(self):
+        
+        if self._controller_index_req is not None:
+            # index provided (e.g. from the spawn index) -> the slot is owned by this 
+            # controller and can be claimed without any lock
+            if self._controller_index_req < 0 or self._controller_index_req >= self.rhc_status.cluster_size:
+                Journal.log(self._class_name_base,
+                    "_claim_slot",
+                    f"Requested controller index {self._controller_index_req} is out of bounds " + \
+                        f"(cluster size {self.rhc_status.cluster_size})",
+                    LogType.EXCEP,
+                    throw_when_excep = True)
+            self.controller_index = self._controller_index_req
+            self.rhc_status.slot_claims.write_retry(True, 
+                                row_index=self.controller_index,
+                                col_index=0,
+                                row_index_view=0)
+            return
+        
+        # first free slot is claimed (claims are only held by this short section). The own
+        # status view only mirrors one row -> all claims are read in one go through a full view
+        claims_view = RhcStatus.SlotClaimFlagView(namespace=self.namespace,
+                                is_server=False,
+                                verbose=self._verbose,
+                                vlevel=VLevel.V2)
+        claims_view.run()
+        claims_view.data_sem_acquire()
+        claims_view.synch_all(read=True, retry=True)
+        claims = claims_view.get_numpy_mirror()
+        if claims.all(): # no space left
+            claims_view.data_sem_release()
+            claims_view.close()
+            exception = "Cannot register to cluster. No space left " + \
+                f"({self.rhc_status.cluster_size} slots already claimed)"
+            Journal.log(self._class_name_base,
+                    "_claim_slot",
+                    exception,
+                    LogType.EXCEP,
+                    throw_when_excep = True) 
+        self.controller_index = self._assign_cntrl_index(claims)
+        claims_view.write_retry(True, 
+                        row_index=self.controller_index,
+                        col_index=0)
+        claims_view.data_sem_release()
+        claims_view.close()
+
+    def _update_controllers_counter(self, increment: int):
+        
+        # the counter is shared by all controllers -> short locked read-modify-write
+        self.rhc_status.controllers_counter.data_sem_acquire()
+        self.rhc_status.controllers_counter.synch_all(retry = True,
+                                                read = True)
+        controllers_counter = self.rhc_status.controllers_counter.get_numpy_mirror()
+        controllers_counter += increment
+        self.rhc_status.controllers_counter.synch_all(retry = True,
+                                                read = False)
+        self.rhc_status.controllers_counter.data_sem_release()
+
     def _unregister_from_cluster(self):
         
         if self._received_trigger:
@@ -694,30 +898,26 @@ class RHController(ABC):
             # send ack signal to server anyway
             self._remote_triggerer.ack() 
         if self._registered:
-            # acquire semaphores since we have to perform operations
-            # on the whole memory views
-            self.rhc_status.registration.data_sem_acquire()
-            self.rhc_status.controllers_counter.data_sem_acquire()
+            # own rows -> no lock needed (apart from the shared counter)
             self.rhc_status.registration.write_retry(False, 
                                     row_index=self.controller_index,
                                     col_index=0,
                                     row_index_view=0)
             self._deactivate()
-            # decrementing controllers counter
-            self.rhc_status.controllers_counter.synch_all(retry = True,
-                                                    read = True)
-            controllers_counter = self.rhc_status.controllers_counter.get_numpy_mirror()
-            controllers_counter -= 1 
-            self.rhc_status.controllers_counter.synch_all(retry = True,
-                                                    read = False)
+            self._update_controllers_counter(increment=-1)
+            self.rhc_status.pids.write_retry(0, 
+                                    row_index=self.controller_index,
+                                    col_index=0,
+                                    row_index_view=0)
+            self.rhc_status.slot_claims.write_retry(False, 
+                                    row_index=self.controller_index,
+                                    col_index=0,
+                                    row_index_view=0) # slot can now be claimed by others
             Journal.log(self._class_name_base,
                     "_unregister_from_cluster",
                     "Done",
                     LogType.STAT,
                     throw_when_excep = True)
-            # we can now release everything
-            self.rhc_status.registration.data_sem_release()
-            self.rhc_status.controllers_counter.data_sem_release()
             self._registered = False
 
     def _get_quat_remap(self):
@@ -759,7 +959,7 @@ class RHController(ABC):
                         LogType.EXCEP,
                         throw_when_excep = True)
             
-    def _init(self):
+    def _init(self, attach: bool = True):
 
         stat = f"Trying to initialize RHC controller " + \
             f"with dt: {self._dt} s, t_horizon: {self._t_horizon} s, n_intervals: {self._n_intervals}"
@@ -769,19 +969,64 @@ class RHController(ABC):
                     LogType.STAT,
                     throw_when_excep = True)
         
-        self._init_states() # initializes shared mem. states 
+        if attach:
+            signal.signal(signal.SIGINT, self._handle_sigint)
+            self._init_states() # initializes shared mem. states 
 
         self._init_problem() # we call the child's initialization method for the actual problem
         self._post_problem_init()
 
-        self._register_to_cluster() # registers the controller to the cluster
+        if attach:
+            self._register_to_cluster() # registers the controller to the cluster
+            self._attached = True
+            if self._debug:
+                self._check_torch_import()
+            Journal.log(self._class_name_base,
+                        "_init",
+                        f"RHC controller initialized with cluster index {self.controller_index} on process {os.getpid()}",
+                        LogType.STAT,
+                        throw_when_excep = True)
+        else:
+            Journal.log(self._class_name_base,
+                        "_init",
+                        f"RHC controller problem initialized (not attached to cluster) on process {os.getpid()}",
+                        LogType.STAT,
+                        throw_when_excep = True)
 
+    def attach(self):
+        
+        # attaches a controller created with attach=False (e.g. a forked prototype)
+        # to the cluster: shared mem. states are initialized and the controller is registered
+        if self._attached:
+            return
+        signal.signal(signal.SIGINT, self._handle_sigint)
+        self._init_states()
+        self._register_to_cluster()
+        self._attached = True
+        if self._debug:
+            self._check_torch_import()
         Journal.log(self._class_name_base,
-                    "_init",
-                    f"RHC controller initialized with cluster index {self.controller_index} on process {os.getpid()}",
+                    "attach",
+                    f"RHC controller attached with cluster index {self.controller_index} on process {os.getpid()}",
                     LogType.STAT,
                     throw_when_excep = True)
 
+    def _trace_stamp(self, 
+                    phase: int):
+        if self._trace_record is not None:
+            self._trace_record[0, phase] = time.perf_counter()
+
+    def _check_torch_import(self):
+        # the controller side only uses numpy views: torch being loaded here 
+        # (e.g. inherited from a parent which imported it before forking or pulled in 
+        # by the child's imports) increases the per-controller memory footprint
+        if "torch" in sys.modules:
+            Journal.log(self._class_name_base,
+                        "_check_torch_import",
+                        f"torch is loaded in controller process {os.getpid()}, although not needed by the controller!",
+                        LogType.WARN,
+                        throw_when_excep = True)
+            
     def _deactivate(self):
         # signal controller deactivation over shared mem
         self.rhc_status.activation_state.write_retry(False, 
@@ -850,25 +1095,24 @@ class RHController(ABC):
         self.robot_cmds.root_state.set(data=self._get_root_full_q_from_sol(node_idx=self._rhc_cmds_node_idx), data_type="q_full", robot_idxs=self.controller_index_np)
         self.robot_cmds.root_state.set(data=self._get_root_twist_from_sol(node_idx=self._rhc_cmds_node_idx), data_type="twist", robot_idxs=self.controller_index_np)
         self.robot_cmds.root_state.set(data=self._get_root_a_from_sol(node_idx=self._rhc_cmds_node_idx-1), data_type="a_full", robot_idxs=self.controller_index_np)
-        self.robot_cmds.root_state.set(data=self._get_norm_grav_vector_from_sol(node_idx=self._rhc_cmds_node_idx-1), data_type="gn", robot_idxs=self.controller_index_np)
+        # base rotation at the node used for gravity and forces is computed only once
+        node_idx_f_estimate=self._rhc_cmds_node_idx-1 # we always write the force to reach the desired state (prev node) 
+        rot_matrix(q_b=self._get_root_full_q_from_sol(node_idx=node_idx_f_estimate)[:, 3:7],
+            R_out=self._rot_sol_aux,
+            is_q_wijk=False) # horizon q is ijkw
+        self.robot_cmds.root_state.set(data=self._get_norm_grav_vector_from_sol(node_idx=node_idx_f_estimate, R=self._rot_sol_aux), data_type="gn", robot_idxs=self.controller_index_np)
         f_contact = self._get_f_from_sol()
         if f_contact is not None:
-            contact_names = self.robot_state.contact_names()
-            node_idx_f_estimate=self._rhc_cmds_node_idx-1 # we always write the force to reach the desired state (prev node) 
-            rhc_q_estimate=self._get_root_full_q_from_sol(node_idx=node_idx_f_estimate)[:, 3:7]
-            for i in range(len(contact_names)):
-                contact = contact_names[i]
-                contact_idx = i*3
-                contact_force_rhc_world=f_contact[contact_idx:(contact_idx+3), node_idx_f_estimate:node_idx_f_estimate+1].T
-                world2base_frame(v_w=contact_force_rhc_world, 
-                    q_b=rhc_q_estimate, 
-                    v_out=self._contact_force_base_loc_aux,
-                    is_q_wijk=False # horizon q is ijkw
-                    )
-                self.robot_cmds.contact_wrenches.set(data=self._contact_force_base_loc_aux, 
-                    data_type="f", 
-                    robot_idxs=self.controller_index_np,
-                    contact_name=contact)
+            # all contacts (ordered as contact_names, 3 rows each in f_contact) are rotated at once
+            world2base_frame_multi(v_w=f_contact[:, node_idx_f_estimate].reshape(-1, 3), 
+                q_b=None, 
+                v_out=self._contact_forces_base_loc_aux,
+                R=self._rot_sol_aux[0, :, :]
+                )
+            self.robot_cmds.contact_wrenches.set(data=self._contact_forces_base_loc_aux.reshape(1, -1), 
+                data_type="f", 
+                robot_idxs=self.controller_index_np,
+                contact_name=None) # all contacts
         
         # prediction data from MPC horizon
         self.robot_pred.jnts_state.set(data=self._get_jnt_q_from_sol(node_idx=self._pred_node_idx), data_type="q", robot_idxs=self.controller_index_np)
@@ -880,90 +1124,72 @@ class RHController(ABC):
         self.robot_pred.root_state.set(data=self._get_root_a_from_sol(node_idx=self._pred_node_idx-1), data_type="a_full", robot_idxs=self.controller_index_np)
         self.robot_pred.root_state.set(data=self._get_norm_grav_vector_from_sol(node_idx=self._pred_node_idx-1), data_type="gn", robot_idxs=self.controller_index_np)
 
-        # write robot commands
-        self.robot_cmds.jnts_state.synch_retry(row_index=self.controller_index, col_index=0, 
-                                row_index_view=0,
-                                n_rows=1, n_cols=self.robot_cmds.jnts_state.n_cols,
-                                read=False) # jnt state
-        self.robot_cmds.root_state.synch_retry(row_index=self.controller_index, col_index=0, 
-                                row_index_view=0,
-                                n_rows=1, n_cols=self.robot_cmds.root_state.n_cols,
-                                read=False) # root state, in case it was written
-        self.robot_cmds.contact_wrenches.synch_retry(row_index=self.controller_index, col_index=0, 
-                                row_index_view=0,
-                                n_rows=1, n_cols=self.robot_cmds.contact_wrenches.n_cols,
-                                read=False) # contact state
+        # we also stage other data (cost, constr. violation, etc..)
+        self.rhc_status.set_sol_info(cost=self._get_rhc_cost(),
+                                constr_viol=self._get_rhc_constr_viol(),
+                                n_iter=self._get_rhc_niter_to_sol(),
+                                nodes_cost=self._get_rhc_nodes_cost(),
+                                nodes_constr_viol=self._get_rhc_nodes_constr_viol(),
+                                fail_idx=self._get_failure_index(),
+                                row_index_view=0)
         
-        # write robot pred
-        self.robot_pred.jnts_state.synch_retry(row_index=self.controller_index, col_index=0, 
-                                row_index_view=0,
-                                n_rows=1, n_cols=self.robot_cmds.jnts_state.n_cols,
-                                read=False)
-        self.robot_pred.root_state.synch_retry(row_index=self.controller_index, col_index=0, 
-                                row_index_view=0,
-                                n_rows=1, n_cols=self.robot_cmds.root_state.n_cols,
-                                read=False)
+        self._commit_sol() # everything is flushed to shared mem in one pass
+
+    def _commit_sol(self):
         
-        # we also fill other data (cost, constr. violation, etc..)
-        self.rhc_status.rhc_cost.write_retry(self._get_rhc_cost(), 
-                                    row_index=self.controller_index,
-                                    col_index=0,
-                                    row_index_view=0)
-        self.rhc_status.rhc_constr_viol.write_retry(self._get_rhc_constr_viol(), 
-                                    row_index=self.controller_index,
-                                    col_index=0,
-                                    row_index_view=0)
-        self.rhc_status.rhc_n_iter.write_retry(self._get_rhc_niter_to_sol(), 
-                                    row_index=self.controller_index,
-                                    col_index=0,
-                                    row_index_view=0)
-        self.rhc_status.rhc_nodes_cost.write_retry(data=self._get_rhc_nodes_cost(), 
-                                    row_index=self.controller_index, 
-                                    col_index=0,
-                                    row_index_view=0)
-        self.rhc_status.rhc_nodes_constr_viol.write_retry(data=self._get_rhc_nodes_constr_viol(), 
-                                    row_index=self.controller_index, 
-                                    col_index=0,
-                                    row_index_view=0)
-        self.rhc_status.rhc_fail_idx.write_retry(self._get_failure_index(), 
-                                    row_index=self.controller_index,
-                                    col_index=0,
-                                    row_index_view=0) # write idx  on shared mem
+        # writes all staged outputs of this controller to shared mem: cmds, pred 
+        # (if packed, see the server's packed_sol) and solution info are a single transaction each
+        self.robot_cmds.commit(robot_idx=self.controller_index, 
+                        robot_idx_view=0,
+                        sub_states=["root_state", "jnts_state", "contact_wrenches"])
+        self.robot_pred.commit(robot_idx=self.controller_index, 
+                        robot_idx_view=0,
+                        sub_states=["root_state", "jnts_state"])
+        self.rhc_status.synch_sol_info(row_index=self.controller_index,
+                        row_index_view=0,
+                        read=False)
+
+    def _init_pred_delta_bufs(self):
+        
+        # preallocated buffers for pred. deltas (computed in place)
+        self._pred_delta_bufs = {}
+        for data_type in ["q_full", "twist", "a_full", "gn"]:
+            self._pred_delta_bufs["root_" + data_type] = np.zeros_like(self.robot_state.root_state.get(data_type=data_type, 
+                                                                robot_idxs=self.controller_index_np), dtype=self._dtype)
+        for data_type in ["q", "v", "a", "eff"]:
+            self._pred_delta_bufs["jnts_" + data_type] = np.zeros_like(self.robot_state.jnts_state.get(data_type=data_type, 
+                                                                robot_idxs=self.controller_index_np), dtype=self._dtype)
 
     def _compute_pred_delta(self):
         
-        # measurements
-        q_full_root_meas = self.robot_state.root_state.get(data_type="q_full", robot_idxs=self.controller_index_np)
-        twist_root_meas = self.robot_state.root_state.get(data_type="twist", robot_idxs=self.controller_index_np)
-        a_root_meas = self.robot_state.root_state.get(data_type="a_full", robot_idxs=self.controller_index_np)
-        g_vec_root_meas = self.robot_state.root_state.get(data_type="gn", robot_idxs=self.controller_index_np)
-
-        q_jnts_meas = self.robot_state.jnts_state.get(data_type="q", robot_idxs=self.controller_index_np)
-        v_jnts_meas = self.robot_state.jnts_state.get(data_type="v", robot_idxs=self.controller_index_np)
-        a_jnts_meas = self.robot_state.jnts_state.get(data_type="a", robot_idxs=self.controller_index_np)
-        eff_jnts_meas = self.robot_state.jnts_state.get(data_type="eff", robot_idxs=self.controller_index_np)
-
-        # prediction from rhc 
-        delta_root_q_full=self._get_root_full_q_from_sol(node_idx=1)-q_full_root_meas
-        delta_root_twist=self._get_root_twist_from_sol(node_idx=1)-twist_root_meas
-        delta_root_a=self._get_root_a_from_sol(node_idx=0)-a_root_meas
-        delta_g_vec=self._get_norm_grav_vector_from_sol(node_idx=0)-g_vec_root_meas
-
-        delta_jnts_q=self._get_jnt_q_from_sol(node_idx=1)-q_jnts_meas
-        delta_jnts_v=self._get_jnt_v_from_sol(node_idx=1)-v_jnts_meas
-        delta_jnts_a=self._get_jnt_a_from_sol(node_idx=0)-a_jnts_meas
-        delta_jnts_eff=self._get_jnt_eff_from_sol(node_idx=0)-eff_jnts_meas
+        if self._pred_delta_every <= 0:
+            return # pred. deltas disabled
+        self._n_solves_since_delta += 1
+        if self._n_solves_since_delta < self._pred_delta_every:
+            return
+        self._n_solves_since_delta = 0
+
+        root_state = self.robot_state.root_state
+        jnts_state = self.robot_state.jnts_state
+        bufs = self._pred_delta_bufs
+        idxs = self.controller_index_np
+
+        # prediction from rhc - measurements
+        np.subtract(self._get_root_full_q_from_sol(node_idx=1), root_state.get(data_type="q_full", robot_idxs=idxs), out=bufs["root_q_full"])
+        np.subtract(self._get_root_twist_from_sol(node_idx=1), root_state.get(data_type="twist", robot_idxs=idxs), out=bufs["root_twist"])
+        np.subtract(self._get_root_a_from_sol(node_idx=0), root_state.get(data_type="a_full", robot_idxs=idxs), out=bufs["root_a_full"])
+        np.subtract(self._get_norm_grav_vector_from_sol(node_idx=0), root_state.get(data_type="gn", robot_idxs=idxs), out=bufs["root_gn"])
+
+        np.subtract(self._get_jnt_q_from_sol(node_idx=1), jnts_state.get(data_type="q", robot_idxs=idxs), out=bufs["jnts_q"])
+        np.subtract(self._get_jnt_v_from_sol(node_idx=1), jnts_state.get(data_type="v", robot_idxs=idxs), out=bufs["jnts_v"])
+        np.subtract(self._get_jnt_a_from_sol(node_idx=0), jnts_state.get(data_type="a", robot_idxs=idxs), out=bufs["jnts_a"])
+        np.subtract(self._get_jnt_eff_from_sol(node_idx=0), jnts_state.get(data_type="eff", robot_idxs=idxs), out=bufs["jnts_eff"])
 
         # writing pred. errors
-        self.rhc_pred_delta.root_state.set(data=delta_root_q_full, data_type="q_full", robot_idxs=self.controller_index_np)
-        self.rhc_pred_delta.root_state.set(data=delta_root_twist,data_type="twist", robot_idxs=self.controller_index_np)
-        self.rhc_pred_delta.root_state.set(data=delta_root_a,data_type="a_full", robot_idxs=self.controller_index_np)
-        self.rhc_pred_delta.root_state.set(data=delta_g_vec, data_type="gn", robot_idxs=self.controller_index_np)
-
-        self.rhc_pred_delta.jnts_state.set(data=delta_jnts_q,data_type="q", robot_idxs=self.controller_index_np)
-        self.rhc_pred_delta.jnts_state.set(data=delta_jnts_v,data_type="v", robot_idxs=self.controller_index_np)
-        self.rhc_pred_delta.jnts_state.set(data=delta_jnts_a,data_type="a", robot_idxs=self.controller_index_np)
-        self.rhc_pred_delta.jnts_state.set(data=delta_jnts_eff, data_type="eff", robot_idxs=self.controller_index_np)
+        for data_type in ["q_full", "twist", "a_full", "gn"]:
+            self.rhc_pred_delta.root_state.set(data=bufs["root_" + data_type], data_type=data_type, robot_idxs=idxs)
+        for data_type in ["q", "v", "a", "eff"]:
+            self.rhc_pred_delta.jnts_state.set(data=bufs["jnts_" + data_type], data_type=data_type, robot_idxs=idxs)
 
         # write on shared memory
         self.rhc_pred_delta.jnts_state.synch_retry(row_index=self.controller_index, 
@@ -1167,7 +1393,10 @@ class RHController(ABC):
     def _get_root_a_from_sol(self, node_idx=0) -> np.ndarray:
         pass
 
-    def _get_norm_grav_vector_from_sol(self, node_idx=1) -> np.ndarray:
+    def _get_norm_grav_vector_from_sol(self, node_idx=1, R: np.ndarray = None) -> np.ndarray:
+        if R is not None: # precomputed rotation for node_idx
+            world2base_frame_R(v_w=self._norm_grav_vector_w,R=R,v_out=self._norm_grav_vector_base_loc)
+            return self._norm_grav_vector_base_loc
         rhc_q=self._get_root_full_q_from_sol(node_idx=node_idx)[:, 3:7]
         world2base_frame(v_w=self._norm_grav_vector_w,q_b=rhc_q,v_out=self._norm_grav_vector_base_loc,
             is_q_wijk=False)
@@ -3,6 +3,7 @@ import re
 import psutil
 import tracemalloc
 import sys
+from typing import List
 
 def get_isolated_cores():
     # Read the kernel boot parameters
@@ -49,6 +50,103 @@ def get_system_memory(label="", prev=0.0, db_print:bool=True):
         print(f"{label} System Memory: Used = {used} GB, Available = {avail} GB,differece {used-prev}")
     return (used, avail)
 
+def parse_cpu_list(cpu_list: str):
+    # parses kernel cpu lists (e.g. "0-3,8,10-11")
+    cpus = []
+    for cpu_str in cpu_list.strip().split(','):
+        if cpu_str == "":
+            continue
+        if '-' in cpu_str:
+            start, end = map(int, cpu_str.split('-'))
+            cpus.extend(range(start, end + 1))
+        else:
+            cpus.append(int(cpu_str))
+    return cpus
+
+def get_cpu_topology(sys_cpu_path: str = "/sys/devices/system/cpu",
+        sys_node_path: str = "/sys/devices/system/node"):
+    """
+    Reads the cpu topology from sysfs. 
+    Returns a dict cpu id -> (package id, core id, numa node).
+    """
+    cpu_nodes = {}
+    if os.path.isdir(sys_node_path):
+        for entry in os.listdir(sys_node_path):
+            match = re.fullmatch(r'node([0-9]+)', entry)
+            if match:
+                with open(os.path.join(sys_node_path, entry, "cpulist"), 'r') as file:
+                    for cpu in parse_cpu_list(file.read()):
+                        cpu_nodes[cpu] = int(match.group(1))
+    
+    topology = {}
+    for entry in os.listdir(sys_cpu_path):
+        match = re.fullmatch(r'cpu([0-9]+)', entry)
+        if not match:
+            continue
+        cpu = int(match.group(1))
+        topology_path = os.path.join(sys_cpu_path, entry, "topology")
+        if not os.path.isdir(topology_path): # e.g. offline cpu
+            continue
+        with open(os.path.join(topology_path, "physical_package_id"), 'r') as file:
+            package_id = int(file.read())
+        with open(os.path.join(topology_path, "core_id"), 'r') as file:
+            core_id = int(file.read())
+        topology[cpu] = (package_id, core_id, cpu_nodes.get(cpu, 0))
+    return topology
+
+def get_numa_distances(sys_node_path: str = "/sys/devices/system/node"):
+    """
+    Returns a dict numa node -> list of distances to all nodes (empty if not available).
+    """
+    distances = {}
+    if os.path.isdir(sys_node_path):
+        for entry in os.listdir(sys_node_path):
+            match = re.fullmatch(r'node([0-9]+)', entry)
+            if match:
+                with open(os.path.join(sys_node_path, entry, "distance"), 'r') as file:
+                    distances[int(match.group(1))] = [int(d) for d in file.read().split()]
+    return distances
+
+def get_numa_node_of_process(pid: int):
+    """
+    Returns the numa node of the cpu on which process pid last ran.
+    """
+    cpu = psutil.Process(pid).cpu_num()
+    return get_cpu_topology()[cpu][2]
+
+def order_cores(cores: List[int], 
+        smt_last: bool = True,
+        numa_node: int = None):
+    """
+    Orders cores for placing processes (the i-th process goes to the i-th core, modulo the
+    number of cores): if smt_last, one thread per physical core is used first and SMT siblings last.
+    If numa_node is provided, within each of these groups cores are sorted by distance 
+    from that node (closest first).
+    """
+    topology = get_cpu_topology()
+    cores = [core for core in cores if core in topology]
+
+    node_rank = {}
+    if numa_node is not None:
+        distances = get_numa_distances()
+        if numa_node in distances:
+            node_rank = {node: distances[numa_node][node] for node in distances}
+    
+    # rank of each thread within its physical core (0 -> first thread)
+    thread_rank = {}
+    seen = {}
+    for core in sorted(cores):
+        package_id, core_id, _ = topology[core]
+        thread_rank[core] = seen.get((package_id, core_id), 0)
+        seen[(package_id, core_id)] = thread_rank[core] + 1
+
+    def sort_key(core):
+        node = topology[core][2]
+        smt_key = thread_rank[core] if smt_last else 0
+        return (smt_key, node_rank.get(node, 0), node, core)
+    
+    return sorted(cores, key=sort_key)
+
 def get_lib_usage_by_name():
     """
     Returns a dictionary with the memory usage of each imported library in GB.
@@ -0,0 +1,265 @@
+# Copyright (C) 2023  Andrea Patrizi (AndrePatri, andreapatrizi1b6e6@gmail.com)
+# 
+# This file is part of CoClusterBridge and distributed under the General Public License version 2 license.
+# 
+# CoClusterBridge is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 2 of the License, or
+# (at your option) any later version.
+# 
+# CoClusterBridge is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with CoClusterBridge.  If not, see <http://www.gnu.org/licenses/>.
+# 
+# opt-in shared memory IO accounting. enable_io_stats() wraps the transaction methods of
+# SharedTWrapper (for all shared views of the process) to count bytes, transactions, time spent 
+# inside each call and time spent waiting on data semaphores, per segment (namespace + basename). Counters 
+# are kept process-local (shared by all threads) and published to the cluster-wide IoStats segment by 
+# maybe_flush_io_stats(), which owners call at explicit points of their loops (at most every publish_dt seconds): 
+# wrapped transactions never publish, so they never take the IoStats semaphore (e.g. while a controller 
+# is parked, and so possibly stopped). Enabling is reference counted (e.g. several controllers in the same process). 
+# A dump of the cluster's rates can be obtained with e.g.:
+# python -m control_cluster_bridge.utilities.io_stats --ns kyon0 --interval 1.0
+from control_cluster_bridge.utilities.shared_data.cluster_profiling import IoStats
+
+from EigenIPC.PyEigenIPCExt.wrappers.shared_data_view import SharedTWrapper
+from EigenIPC.PyEigenIPC import VLevel
+
+import time
+import threading
+
+import numpy as np
+
+_io_stats = None
+_n_enabled = 0
+_publish_dt = 1.0
+_last_publish = 0.0
+_local = threading.local() # per thread publishing flag, so that the IO of the stats segment itself is not accounted
+_lock = threading.Lock() # guards _counters (threaded workers share them)
+_publish_lock = threading.Lock() # the IoStats view (and its mirror) is shared too
+_counters = {}
+_originals = {}
+
+def _publishing():
+    return getattr(_local, "publishing", False)
+
+def _account(view, 
+        n_bytes: int, 
+        io_time: float, 
+        sem_wait: float = 0.0):
+    
+    name = _segment_name(view)
+    with _lock:
+        counters = _counters.get(name)
+        if counters is None:
+            counters = [0.0, 0.0, 0.0, 0.0]
+            _counters[name] = counters
+        counters[IoStats.BYTES] += n_bytes
+        counters[IoStats.TRANSACTIONS] += 1
+        counters[IoStats.IO_TIME] += io_time
+        counters[IoStats.SEM_WAIT] += sem_wait
+
+def _segment_name(view):
+
+    # views created after enable_io_stats() record their namespace and basename upon
+    # construction (see _wrap_init), older ones are identified by their attributes
+    name = view.__dict__.get("_io_stats_name")
+    if name is None:
+        basename = getattr(view, "basename", None)
+        if basename is not None:
+            name = str(getattr(view, "namespace", "")) + str(basename)
+        else:
+            name = type(view).__name__
+        view._io_stats_name = name
+    return name
+
+def _wrap_init(method):
+
+    def wrapper(self, *args, **kwargs):
+        method(self, *args, **kwargs)
+        self._io_stats_name = str(kwargs.get("namespace", "")) + str(kwargs.get("basename", type(self).__name__))
+    
+    wrapper.__name__ = method.__name__
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+def _itemsize(view):
+    return view.get_numpy_mirror().itemsize
+
+def _synch_all_bytes(view, args, kwargs, result):
+    return view.get_numpy_mirror().nbytes # upper bound if only a block is synched
+
+def _synch_retry_bytes(view, args, kwargs, result):
+    # synch_retry(row_index, col_index, n_rows, n_cols, ...)
+    n_rows = args[2] if len(args) > 2 else kwargs.get("n_rows", 1)
+    n_cols = args[3] if len(args) > 3 else kwargs.get("n_cols", 1)
+    return _itemsize(view) * n_rows * n_cols
+
+def _write_retry_bytes(view, args, kwargs, result):
+    data = args[0] if len(args) > 0 else kwargs["data"]
+    return np.asarray(data).nbytes
+
+def _read_retry_bytes(view, args, kwargs, result):
+    return _itemsize(view)
+
+def _wrap(method, n_bytes_fn):
+
+    def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
+        result = method(self, *args, **kwargs)
+        io_time = time.perf_counter() - start
+        if not _publishing():
+            _account(self, n_bytes_fn(self, args, kwargs, result), io_time)
+        return result
+    
+    wrapper.__name__ = method.__name__
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+def _wrap_sem_acquire(method):
+
+    def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
+        result = method(self, *args, **kwargs)
+        if not _publishing():
+            _account(self, 0, 0.0, sem_wait=time.perf_counter() - start)
+        return result
+    
+    wrapper.__name__ = method.__name__
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+def enable_io_stats(namespace: str,
+        publish_dt: float = 1.0,
+        verbose: bool = False,
+        vlevel: VLevel = VLevel.V1):
+    
+    # the IoStats server is expected to be already running (see ControlClusterServer's io_stats)
+    global _io_stats, _n_enabled, _publish_dt, _last_publish
+    
+    _n_enabled += 1
+    if _io_stats is not None:
+        return
+    
+    _io_stats = IoStats(is_server=False, 
+                    name=namespace, 
+                    verbose=verbose, 
+                    vlevel=vlevel)
+    _io_stats.run() # not wrapped yet -> not accounted
+
+    _publish_dt = publish_dt
+    _last_publish = time.perf_counter()
+
+    wrappers = {"__init__": _wrap_init,
+            "synch_all": lambda method: _wrap(method, _synch_all_bytes),
+            "synch_retry": lambda method: _wrap(method, _synch_retry_bytes),
+            "write_retry": lambda method: _wrap(method, _write_retry_bytes),
+            "read_retry": lambda method: _wrap(method, _read_retry_bytes),
+            "data_sem_acquire": _wrap_sem_acquire}
+    for method_name, wrap in wrappers.items():
+        _originals[method_name] = getattr(SharedTWrapper, method_name)
+        setattr(SharedTWrapper, method_name, wrap(_originals[method_name]))
+
+def maybe_flush_io_stats():
+
+    # to be called at explicit points of the owner's loop (never from code which might 
+    # be stopped, e.g. while parked): publishes only if publish_dt elapsed since the last publish
+    global _last_publish
+
+    if _io_stats is None:
+        return
+    now = time.perf_counter()
+    if now - _last_publish > _publish_dt:
+        _last_publish = now
+        flush_io_stats()
+
+def flush_io_stats():
+
+    # publishes the counters accumulated since the last flush
+    global _counters
+
+    if _io_stats is None or _publishing():
+        return
+    with _lock: # swapped, so that other threads keep accounting while publishing
+        deltas = _counters
+        _counters = {}
+    if len(deltas) == 0:
+        return
+    _local.publishing = True
+    try:
+        with _publish_lock:
+            _io_stats.publish(deltas)
+    finally:
+        _local.publishing = False
+
+def disable_io_stats():
+
+    # accounting is actually disabled only once every enable_io_stats() was matched
+    global _io_stats, _n_enabled
+
+    if _io_stats is None:
+        return
+    flush_io_stats()
+    _n_enabled -= 1
+    if _n_enabled > 0:
+        return
+    for method_name, method in _originals.items():
+        setattr(SharedTWrapper, method_name, method)
+    _originals.clear()
+    _io_stats.close()
+    _io_stats = None
+
+def sample_io_rates(io_stats: IoStats,
+        interval: float = 1.0):
+    
+    # differentiates two snapshots taken interval seconds apart. Returns the names
+    # and, per name, [bytes/s, transactions/s, io time fraction, sem wait fraction]
+    names_start, counters_start = io_stats.read()
+    start = time.perf_counter()
+    time.sleep(interval)
+    names, counters = io_stats.read()
+    dt = time.perf_counter() - start
+    deltas = counters.copy()
+    for i in range(len(names_start)): # rows are never reassigned
+        deltas[names.index(names_start[i]), :] -= counters_start[i, :]
+    return names, deltas / dt
+
+def print_io_rates(names, rates):
+
+    print(f"{'segment':<32}{'MB/s':>12}{'tx/s':>12}{'io time [%]':>14}{'sem wait [%]':>14}")
+    order = np.argsort(-rates[:, IoStats.BYTES])
+    for i in order:
+        print(f"{names[i]:<32}" + \
+            f"{rates[i, IoStats.BYTES] / 1e6:>12.3f}" + \
+            f"{rates[i, IoStats.TRANSACTIONS]:>12.1f}" + \
+            f"{100.0 * rates[i, IoStats.IO_TIME]:>14.3f}" + \
+            f"{100.0 * rates[i, IoStats.SEM_WAIT]:>14.3f}")
+    total = np.sum(rates, axis=0)
+    print(f"{'total':<32}{total[IoStats.BYTES] / 1e6:>12.3f}{total[IoStats.TRANSACTIONS]:>12.1f}" + \
+        f"{100.0 * total[IoStats.IO_TIME]:>14.3f}{100.0 * total[IoStats.SEM_WAIT]:>14.3f}")
+
+if __name__ == "__main__":
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Dump the cluster's shared memory IO rates")
+    parser.add_argument("--ns", type=str, required=True, help="cluster namespace")
+    parser.add_argument("--interval", type=float, default=1.0, help="sampling interval [s]")
+    parser.add_argument("--n_samples", type=int, default=1, help="number of dumps (<= 0 for endless)")
+    args = parser.parse_args()
+
+    io_stats = IoStats(is_server=False, name=args.ns)
+    io_stats.run()
+    
+    i = 0
+    while args.n_samples <= 0 or i < args.n_samples:
+        names, rates = sample_io_rates(io_stats, interval=args.interval)
+        print_io_rates(names, rates)
+        print("")
+        i += 1
+    
+    io_stats.close()
@@ -176,6 +176,33 @@ def world2base_frame(v_w: np.ndarray, q_b: np.ndarray, v_out: np.ndarray,
     v_out[:, 1] = v_x * R_01 + v_y * R_11 + v_z * R_21
     v_out[:, 2] = v_x * R_02 + v_y * R_12 + v_z * R_22
 
+def world2base_frame_multi(v_w: np.ndarray, q_b: np.ndarray, v_out: np.ndarray,
+        is_q_wijk: bool = True,
+        R: np.ndarray = None):
+    """
+    Transforms a set of vectors (n_vecs x 3, e.g. the forces of all contacts) expressed 
+    in the WORLD frame to the base frame using a single quaternion (1 x 4) describing the orientation
+    of the base with respect to the world frame. The rotation matrix is built once and 
+    applied to all vectors with a single product. The result is written in v_out.
+    If R (3 x 3), e.g. from rot_matrix, is provided, q_b is ignored.
+    """
+    if R is not None:
+        np.matmul(v_w, R, out=v_out)
+        return
+    
+    q = q_b.reshape(-1)
+    if is_q_wijk:
+        q_w, q_i, q_j, q_k = q[0], q[1], q[2], q[3]
+    else:
+        q_w, q_i, q_j, q_k = q[3], q[0], q[1], q[2]
+
+    R = np.array([[1 - 2 * (q_j ** 2 + q_k ** 2), 2 * (q_i * q_j - q_k * q_w), 2 * (q_i * q_k + q_j * q_w)],
+        [2 * (q_i * q_j + q_k * q_w), 1 - 2 * (q_i ** 2 + q_k ** 2), 2 * (q_j * q_k - q_i * q_w)],
+        [2 * (q_i * q_k - q_j * q_w), 2 * (q_j * q_k + q_i * q_w), 1 - 2 * (q_i ** 2 + q_j ** 2)]])
+    
+    # v_b = R^T * v_w for each vector -> (v_w * R) row-wise
+    np.matmul(v_w, R, out=v_out)
+
 def world2base_frame_twist(t_w: np.ndarray, q_b: np.ndarray, t_out: np.ndarray,
         is_q_wijk: bool = True):
     """
@@ -208,8 +235,82 @@ def world2base_frame_twist(t_w: np.ndarray, q_b: np.ndarray, t_out: np.ndarray,
     t_out[:, 4] = t_w[:, 3] * R_01 + t_w[:, 4] * R_11 + t_w[:, 5] * R_21
     t_out[:, 5] = t_w[:, 3] * R_02 + t_w[:, 4] * R_12 + t_w[:, 5] * R_22
 
+# transforms based on precomputed rotation matrices: rot_matrix is called once per quaternion batch
+# and the result reused for all transforms associated with the same orientation (linear, angular, twist)
+
+def rot_matrix(q_b: np.ndarray, R_out: np.ndarray,
+        is_q_wijk: bool = True):
+    """
+    Builds the rotation matrices (n x 3 x 3) associated with the quaternions q_b (n x 4) 
+    describing the orientation of the base with respect to the world frame. 
+    The result is written in R_out.
+    """
+    if is_q_wijk:
+        q_w, q_i, q_j, q_k = q_b[:, 0], q_b[:, 1], q_b[:, 2], q_b[:, 3]
+    else:
+        q_w, q_i, q_j, q_k = q_b[:, 3], q_b[:, 0], q_b[:, 1], q_b[:, 2]
+
+    R_out[:, 0, 0] = 1 - 2 * (q_j ** 2 + q_k ** 2)
+    R_out[:, 0, 1] = 2 * (q_i * q_j - q_k * q_w)
+    R_out[:, 0, 2] = 2 * (q_i * q_k + q_j * q_w)
+    
+    R_out[:, 1, 0] = 2 * (q_i * q_j + q_k * q_w)
+    R_out[:, 1, 1] = 1 - 2 * (q_i ** 2 + q_k ** 2)
+    R_out[:, 1, 2] = 2 * (q_j * q_k - q_i * q_w)
+    
+    R_out[:, 2, 0] = 2 * (q_i * q_k - q_j * q_w)
+    R_out[:, 2, 1] = 2 * (q_j * q_k + q_i * q_w)
+    R_out[:, 2, 2] = 1 - 2 * (q_i ** 2 + q_j ** 2)
+
+    return R_out
+
+def base2world_frame_R(v_b: np.ndarray, R: np.ndarray, v_out: np.ndarray):
+    """
+    Same as base2world_frame, but using the rotation matrices R (n x 3 x 3) from rot_matrix.
+    """
+    np.einsum("nij,nj->ni", R, v_b, out=v_out, casting="same_kind")
+
+def world2base_frame_R(v_w: np.ndarray, R: np.ndarray, v_out: np.ndarray):
+    """
+    Same as world2base_frame, but using the rotation matrices R (n x 3 x 3) from rot_matrix.
+    """
+    np.einsum("nji,nj->ni", R, v_w, out=v_out, casting="same_kind") # R^T * v_w
+
+def world2base_frame_twist_R(t_w: np.ndarray, R: np.ndarray, t_out: np.ndarray):
+    """
+    Same as world2base_frame_twist, but using the rotation matrices R (n x 3 x 3) from rot_matrix.
+    """
+    np.einsum("nji,nj->ni", R, t_w[:, 0:3], out=t_out[:, 0:3], casting="same_kind") # linear
+    np.einsum("nji,nj->ni", R, t_w[:, 3:6], out=t_out[:, 3:6], casting="same_kind") # angular
+
+def w2hor_frame_R(v_w: np.ndarray, R: np.ndarray, v_out: np.ndarray):
+    """
+    Same as w2hor_frame, but using the rotation matrices R (n x 3 x 3) from rot_matrix.
+    """
+    norm = np.sqrt(R[:, 0, 0] ** 2 + R[:, 1, 0] ** 2)
+    x_proj_x = R[:, 0, 0] / norm
+    x_proj_y = R[:, 1, 0] / norm
+    
+    v_out[:, 0] = v_w[:, 0] * x_proj_x + v_w[:, 1] * x_proj_y
+    v_out[:, 1] = - v_w[:, 0] * x_proj_y + v_w[:, 1] * x_proj_x
+    v_out[:, 2] = v_w[:, 2]  # z-component remains the same
+
+def hor2w_frame_R(v_h: np.ndarray, R: np.ndarray, v_out: np.ndarray):
+    """
+    Same as hor2w_frame, but using the rotation matrices R (n x 3 x 3) from rot_matrix.
+    """
+    norm = np.sqrt(R[:, 0, 0] ** 2 + R[:, 1, 0] ** 2)
+    x_proj_x = R[:, 0, 0] / norm
+    x_proj_y = R[:, 1, 0] / norm
+    
+    v_out[:, 0] = v_h[:, 0] * x_proj_x - v_h[:, 1] * x_proj_y
+    v_out[:, 1] = v_h[:, 0] * x_proj_y + v_h[:, 1] * x_proj_x
+    v_out[:, 2] = v_h[:, 2]  # z-component remains the same
+
 if __name__ == "__main__":  
 
+    import time
+
     n_envs = 5000
     v_b = np.random.rand(n_envs, 3)
 
@@ -243,4 +344,57 @@ if __name__ == "__main__":
     hor2w_frame(v_b, q_b_norm, v_w)
     w2hor_frame(v_w, q_b_norm, v_h_recovered)
     assert np.allclose(v_b, v_h_recovered, atol=1e-6), "Test failed: v_h_recovered does not match v_b"
-    print("horizontal backward frame test passed:  matches ")
\ No newline at end of file
+    print("horizontal backward frame test passed:  matches ")
+
+    # test multi-vector transf. (single quaternion)
+    n_contacts = 4
+    f_w = np.random.rand(n_contacts, 3)
+    f_b = np.zeros_like(f_w)
+    f_b_ref = np.zeros_like(f_w)
+    world2base_frame_multi(f_w, q_b_norm[0:1, :], f_b)
+    world2base_frame(f_w, np.repeat(q_b_norm[0:1, :], n_contacts, axis=0), f_b_ref)
+    assert np.allclose(f_b, f_b_ref, atol=1e-6), "Test failed: f_b does not match f_b_ref"
+    print("multi-vector world to base frame test passed:  matches ")
+
+    # test transforms with precomputed rotation matrices
+    R = np.zeros((n_envs, 3, 3))
+    rot_matrix(q_b_norm, R)
+    v_out = np.zeros_like(v_b)
+    v_ref = np.zeros_like(v_b)
+    for fun, fun_R in [(base2world_frame, base2world_frame_R), 
+                    (world2base_frame, world2base_frame_R),
+                    (w2hor_frame, w2hor_frame_R), 
+                    (hor2w_frame, hor2w_frame_R)]:
+        fun(v_b, q_b_norm, v_ref)
+        fun_R(v_b, R, v_out)
+        assert np.allclose(v_out, v_ref, atol=1e-6), f"Test failed: {fun_R.__name__} does not match {fun.__name__}"
+    t_w = np.random.rand(n_envs, 6)
+    t_out = np.zeros_like(t_w)
+    t_ref = np.zeros_like(t_w)
+    world2base_frame_twist(t_w, q_b_norm, t_ref)
+    world2base_frame_twist_R(t_w, R, t_out)
+    assert np.allclose(t_out, t_ref, atol=1e-6), "Test failed: world2base_frame_twist_R does not match world2base_frame_twist"
+    print("precomputed rotation matrix test passed:  matches ")
+
+    # microbenchmark: same quaternion used for a linear, an angular and a twist transform 
+    # (typical within a single controller step)
+    n_trials = 1000
+    v_ang = np.random.rand(n_envs, 3)
+    v_ang_out = np.zeros_like(v_ang)
+
+    t_start = time.perf_counter()
+    for i in range(n_trials):
+        world2base_frame(v_b, q_b_norm, v_out)
+        world2base_frame(v_ang, q_b_norm, v_ang_out)
+        world2base_frame_twist(t_w, q_b_norm, t_out)
+    t_no_cache = (time.perf_counter() - t_start) / n_trials
+
+    t_start = time.perf_counter()
+    for i in range(n_trials):
+        rot_matrix(q_b_norm, R)
+        world2base_frame_R(v_b, R, v_out)
+        world2base_frame_R(v_ang, R, v_ang_out)
+        world2base_frame_twist_R(t_w, R, t_out)
+    t_cache = (time.perf_counter() - t_start) / n_trials
+
+    print(f"n_envs: {n_envs} -> per-call rotation: {t_no_cache*1e6:.1f} us, precomputed rotation: {t_cache*1e6:.1f} us")
@@ -1,5 +1,23 @@
 from abc import ABC, abstractmethod
 
+import numpy as np
+
+from EigenIPC.PyEigenIPC import Journal, LogType
+
+from typing import List, Union
+
+def row_runs(robot_idxs):
+    # groups row indexes into a list of contiguous (start, n_rows) blocks
+    if hasattr(robot_idxs, "cpu"): # torch tensor
+        robot_idxs = robot_idxs.cpu().numpy()
+    idxs = np.unique(np.asarray(robot_idxs).flatten()) # sorted
+    if idxs.size == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(idxs) != 1) + 1
+    starts = idxs[np.concatenate(([0], breaks))]
+    ends = idxs[np.concatenate((breaks - 1, [idxs.size - 1]))]
+    return list(zip(starts.tolist(), (ends - starts + 1).tolist()))
+
 class SharedDataBase(ABC):
 
     @abstractmethod
@@ -22,7 +40,37 @@ class SharedDataBase(ABC):
 
         pass
     
+    def _slots_data(self):
+
+        # (names registry, local (n x 1) values, shared tensor) backing get_slots/write_slots. 
+        # To be overridden by children holding named dynamic info
+        Journal.log(self.__class__.__name__,
+            "_slots_data",
+            "This shared data does not hold named dynamic info!",
+            LogType.EXCEP,
+            throw_when_excep = True)
+    
+    def get_slots(self,
+            dyn_info_name: List[str]):
+        
+        # pre-resolved slot handles for a set of dynamic info 
+        # (to be passed to write_slots, avoiding name lookups at each write)
+        names, _, _ = self._slots_data()
+        return np.array([names.get_idx(name) for name in dyn_info_name], dtype=np.int64)
+
+    def write_slots(self,
+            slots: np.ndarray,
+            val: Union[np.ndarray, List[float]]):
+        
+        # one transaction per contiguous run of slots (a single one if the slots are contiguous). 
+        # Slots in between are never written, since they might be owned by other writers
+        _, values, shared = self._slots_data()
+        values[slots, 0] = val
+        for start, n_slots in row_runs(slots):
+            shared.write_retry(data=values[start:(start + n_slots), :],
+                        row_index=start, col_index=0)
+    
 def is_shared_data_child(cls):
 
     return issubclass(cls,
-             SharedDataBase)
\ No newline at end of file
+             SharedDataBase)
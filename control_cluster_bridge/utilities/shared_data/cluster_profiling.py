@@ -9,6 +9,7 @@ from control_cluster_bridge.utilities.shared_data.abstractions import SharedData
 
 from typing import Dict, Union, List
 import numpy as np
+import math
 
 # Control cluster profiling data
 
@@ -173,6 +174,498 @@ class TaskRefUpdateDt(SharedTWrapper):
             force_reconnection=force_reconnection,
             optimize_mem=optimize_mem)
         
+class TraceRing(SharedTWrapper):
+                 
+    def __init__(self,
+        cluster_size: int, 
+        n_cols: int,
+        namespace = "",
+        is_server = False, 
+        verbose: bool = False, 
+        vlevel: VLevel = VLevel.V0,
+        force_reconnection: bool = False,
+        optimize_mem: bool = False):
+
+        basename = "TraceRing" 
+
+        super().__init__(namespace = namespace,
+            basename = basename,
+            is_server = is_server, 
+            n_rows = cluster_size, 
+            n_cols = n_cols, 
+            verbose = verbose, 
+            vlevel = vlevel,
+            dtype=eigenipc_dtype.Float,
+            fill_value=np.nan,
+            safe = False, # each row has a single writer
+            force_reconnection=force_reconnection,
+            optimize_mem=optimize_mem)
+
+class TraceHead(SharedTWrapper):
+                 
+    def __init__(self,
+        cluster_size: int, 
+        namespace = "",
+        is_server = False, 
+        verbose: bool = False, 
+        vlevel: VLevel = VLevel.V0,
+        force_reconnection: bool = False,
+        optimize_mem: bool = False):
+
+        basename = "TraceHead" 
+
+        super().__init__(namespace = namespace,
+            basename = basename,
+            is_server = is_server, 
+            n_rows = cluster_size, 
+            n_cols = 1, 
+            verbose = verbose, 
+            vlevel = vlevel,
+            dtype=eigenipc_dtype.Int,
+            fill_value=0,
+            safe = False, # each row has a single writer
+            force_reconnection=force_reconnection,
+            optimize_mem=optimize_mem)
+
+class RhcTrace(SharedDataBase):
+
+    # per-controller ring buffers holding the timestamps (time.perf_counter(), i.e. CLOCK_MONOTONIC, 
+    # which is shared by all processes) of each phase of the last trace_len solve cycles.
+    # Each record is [cycle, wake, state_read, pred_delta, solve, cmds_write, ack], where every
+    # phase is stamped upon its completion (wake is the start of the cycle). The head holds the
+    # n. of records written by each controller. Records are written before the head is updated, 
+    # so only the slot currently being overwritten might be torn
+
+    CYCLE = 0
+    WAKE = 1
+    STATE_READ = 2
+    PRED_DELTA = 3
+    SOLVE = 4
+    CMDS_WRITE = 5
+    ACK = 6
+    N_COLS = 7
+
+    PHASES = ["state_read", "pred_delta", "solve", "cmds_write", "ack"] # phase i spans cols [i+1, i+2]
+
+    def __init__(self, 
+                cluster_size: int = 1,
+                trace_len: int = 256,
+                is_server = False, 
+                name = "",
+                verbose: bool = False, 
+                vlevel: VLevel = VLevel.V2,
+                force_reconnection: bool = False,
+                optimize_mem: bool = False):
+        
+        self.cluster_size = cluster_size
+        self.trace_len = trace_len
+
+        self.is_server = is_server
+        self.namespace = name + "RhcTrace"
+
+        self._n_written = 0 # writer side
+        self._controller_idx = None
+
+        self.ring = TraceRing(cluster_size=cluster_size,
+                            n_cols=trace_len * self.N_COLS if is_server else None,
+                            namespace=self.namespace,
+                            is_server=is_server,
+                            verbose=verbose,
+                            vlevel=vlevel,
+                            force_reconnection=force_reconnection,
+                            optimize_mem=optimize_mem)
+        
+        self.head = TraceHead(cluster_size=cluster_size,
+                            namespace=self.namespace,
+                            is_server=is_server,
+                            verbose=verbose,
+                            vlevel=vlevel,
+                            force_reconnection=force_reconnection,
+                            optimize_mem=optimize_mem)
+
+        self._is_runnning = False
+    
+    def __del__(self):
+
+        self.close()
+    
+    def is_running(self):
+
+        return self._is_runnning
+    
+    def get_shared_mem(self):
+        return [self.ring.get_shared_mem(),
+            self.head.get_shared_mem()]
+    
+    def run(self):
+
+        self.ring.run()
+        self.head.run()
+        if not self.is_server:
+            self.trace_len = self.ring.n_cols // self.N_COLS
+        self._is_runnning = True
+
+    def init_writer(self, 
+            controller_idx: int):
+        
+        # to be called by the controller owning row controller_idx
+        # (records keep being appended after a respawn)
+        self._controller_idx = controller_idx
+        self._n_written = int(self.head.read_retry(row_index=controller_idx, 
+                                        col_index=0, 
+                                        row_index_view=0)[0])
+        
+    def write_record(self, 
+            record: np.ndarray):
+        
+        # record is a (1 x N_COLS) array (the cycle col is filled here)
+        record[0, self.CYCLE] = self._n_written
+        slot = self._n_written % self.trace_len
+        self.ring.get_numpy_mirror()[0:1, (slot * self.N_COLS):((slot + 1) * self.N_COLS)] = record
+        self.ring.synch_retry(row_index=self._controller_idx, 
+                        col_index=slot * self.N_COLS,
+                        row_index_view=0,
+                        n_rows=1, n_cols=self.N_COLS,
+                        read=False)
+        self._n_written += 1
+        self.head.write_retry(self._n_written, 
+                        row_index=self._controller_idx, 
+                        col_index=0,
+                        row_index_view=0)
+    
+    def read_records(self):
+
+        # returns, for each controller, the available records 
+        # (n_records x N_COLS), from the oldest to the newest
+        self.ring.synch_all(read=True, retry=True)
+        self.head.synch_all(read=True, retry=True)
+        ring = self.ring.get_numpy_mirror()
+        heads = self.head.get_numpy_mirror()
+        records = []
+        for i in range(ring.shape[0]):
+            n_written = int(heads[i, 0])
+            n_records = min(n_written, self.trace_len)
+            slots = [(n_written - n_records + j) % self.trace_len for j in range(n_records)]
+            cntrl_ring = ring[i, :].reshape(self.trace_len, self.N_COLS)
+            records.append(cntrl_ring[slots, :].copy())
+        return records
+
+    def close(self):
+        
+        self.ring.close()
+        self.head.close()
+
+class LatencyHistCounts(SharedTWrapper):
+                 
+    def __init__(self,
+        n_rows: int, 
+        n_buckets: int,
+        namespace = "",
+        is_server = False, 
+        verbose: bool = False, 
+        vlevel: VLevel = VLevel.V0,
+        force_reconnection: bool = False,
+        optimize_mem: bool = False):
+
+        basename = "LatencyHistCounts" 
+
+        super().__init__(namespace = namespace,
+            basename = basename,
+            is_server = is_server, 
+            n_rows = n_rows, 
+            n_cols = n_buckets, 
+            verbose = verbose, 
+            vlevel = vlevel,
+            dtype=eigenipc_dtype.Int,
+            fill_value=0,
+            safe = False, # each row has a single writer
+            force_reconnection=force_reconnection,
+            optimize_mem=optimize_mem)
+
+class RhcLatencyHist(SharedDataBase):
+
+    # streaming latency histograms with HDR-style log-linear buckets: each octave 
+    # [min_val * 2^k, min_val * 2^(k+1)) is split into sub_buckets linear buckets, so that
+    # the relative error of any percentile is at most 1/sub_buckets. Row i holds the solve loop 
+    # times of controller i, while the last row holds the cluster solution times (written by the server).
+    # Values below min_val end up in the first bucket, values above the last octave in the last one
+
+    def __init__(self, 
+                cluster_size: int = 1,
+                min_val: float = 1e-5,
+                n_octaves: int = 16,
+                sub_buckets: int = 8,
+                is_server = False, 
+                name = "",
+                verbose: bool = False, 
+                vlevel: VLevel = VLevel.V2,
+                force_reconnection: bool = False,
+                optimize_mem: bool = False):
+        
+        self.cluster_size = cluster_size
+        self.is_server = is_server
+        self.namespace = name + "RhcLatencyHist"
+
+        self.min_val = min_val # [s]
+        self.n_octaves = n_octaves
+        self.sub_buckets = sub_buckets
+        self.n_buckets = n_octaves * sub_buckets
+        
+        self._row = None # writer side
+        self._row_view = None
+
+        self.counts = LatencyHistCounts(n_rows=cluster_size + 1 if is_server else cluster_size,
+                            n_buckets=self.n_buckets if is_server else None,
+                            namespace=self.namespace,
+                            is_server=is_server,
+                            verbose=verbose,
+                            vlevel=vlevel,
+                            force_reconnection=force_reconnection,
+                            optimize_mem=optimize_mem)
+        
+        self._upper_edges = None
+        
+        self._is_runnning = False
+    
+    def __del__(self):
+
+        self.close()
+    
+    def is_running(self):
+
+        return self._is_runnning
+    
+    def get_shared_mem(self):
+        return [self.counts.get_shared_mem()]
+    
+    def run(self):
+
+        self.counts.run()
+        if not self.is_server:
+            self.cluster_size = self.counts.getNRows() - 1 # the last row is the server's
+        idxs = np.arange(self.n_buckets)
+        self._upper_edges = self.min_val * np.power(2.0, idxs // self.sub_buckets) * \
+            (1.0 + ((idxs % self.sub_buckets) + 1) / self.sub_buckets)
+        self._is_runnning = True
+    
+    def bucket(self, 
+            val: float):
+        
+        if not val > self.min_val: # also nan
+            return 0
+        mantissa, exponent = math.frexp(val / self.min_val) # val / min_val = mantissa * 2^exponent, mantissa in [0.5, 1)
+        idx = (exponent - 1) * self.sub_buckets + int((2.0 * mantissa - 1.0) * self.sub_buckets)
+        return min(idx, self.n_buckets - 1)
+
+    def init_writer(self, 
+            row: int):
+        
+        # row is the controller index (cluster_size for the server). Counts 
+        # already on shared memory (e.g. before a respawn) are kept
+        self._row = row
+        self._row_view = row if self.is_server else 0 # clients are expected to use optimize_mem
+        self.counts.synch_retry(row_index=row, col_index=0,
+                        row_index_view=self._row_view,
+                        n_rows=1, n_cols=self.n_buckets,
+                        read=True)
+    
+    def record(self, 
+            val: float):
+        
+        # O(1): a single counter is incremented and written
+        idx = self.bucket(val)
+        counts = self.counts.get_numpy_mirror()
+        counts[self._row_view, idx] += 1
+        self.counts.write_retry(counts[self._row_view, idx], 
+                        row_index=self._row, 
+                        col_index=idx,
+                        row_index_view=self._row_view)
+    
+    def get_percentiles(self, 
+            counts: np.ndarray,
+            percentiles: List[float] = [50, 95, 99]):
+        
+        # vectorized over the rows of counts (n_rows x n_buckets). Returns, for each
+        # percentile and for the max, the upper edge of the corresponding bucket (nan for empty rows)
+        cum_counts = np.cumsum(counts, axis=1)
+        totals = cum_counts[:, -1:]
+        empty = totals[:, 0] == 0
+        stats = {}
+        for percentile in percentiles:
+            idxs = np.argmax(cum_counts >= np.ceil(totals * percentile / 100.0), axis=1)
+            stats[f"p{percentile:g}"] = np.where(empty, np.nan, self._upper_edges[idxs])
+        max_idxs = self.n_buckets - 1 - np.argmax(counts[:, ::-1] > 0, axis=1)
+        stats["max"] = np.where(empty, np.nan, self._upper_edges[max_idxs])
+        stats["count"] = totals[:, 0]
+        return stats
+    
+    def get_stats(self, 
+            percentiles: List[float] = [50, 95, 99]):
+        
+        # reads all histograms and returns per-controller stats, stats of all controllers 
+        # pooled together and stats of the cluster solution time
+        self.counts.synch_all(read=True, retry=True)
+        counts = self.counts.get_numpy_mirror()
+        cluster_size = counts.shape[0] - 1
+        return {"controllers": self.get_percentiles(counts[:cluster_size, :], percentiles),
+            "pooled": self.get_percentiles(np.sum(counts[:cluster_size, :], axis=0, keepdims=True), percentiles),
+            "cluster_sol_time": self.get_percentiles(counts[cluster_size:, :], percentiles)}
+    
+    def close(self):
+        
+        self.counts.close()
+
+class IoStatsData(SharedTWrapper):
+                 
+    def __init__(self,
+        max_segments: int = -1, 
+        namespace = "",
+        is_server = False, 
+        verbose: bool = False, 
+        vlevel: VLevel = VLevel.V0,
+        force_reconnection: bool = False):
+
+        basename = "IoStatsData" 
+
+        super().__init__(namespace = namespace,
+            basename = basename,
+            is_server = is_server, 
+            n_rows = max_segments, 
+            n_cols = IoStats.N_COLS, 
+            verbose = verbose, 
+            vlevel = vlevel,
+            dtype=eigenipc_dtype.Float,
+            fill_value=0.0,
+            safe = False, # read-modify-write is done under the data semaphore
+            force_reconnection=force_reconnection)
+
+class IoStats(SharedDataBase):
+
+    # cumulative shared memory IO counters, one row per shared memory segment (keyed by
+    # its namespace + basename, see the IoStatsNames registry) and accumulated across all processes 
+    # of the cluster. Writers publish local deltas periodically (see utilities/io_stats.py); rates 
+    # are obtained by differentiating two snapshots
+
+    BYTES = 0
+    TRANSACTIONS = 1
+    IO_TIME = 2 # [s] time spent inside synch/read/write calls
+    SEM_WAIT = 3 # [s] time spent waiting on the data semaphores
+    N_COLS = 4
+
+    def __init__(self, 
+                max_segments: int = 128,
+                is_server = False, 
+                name = "",
+                verbose: bool = False, 
+                vlevel: VLevel = VLevel.V2,
+                force_reconnection: bool = False):
+        
+        self.max_segments = max_segments
+        self.is_server = is_server
+        self.namespace = name + "IoStats"
+
+        self.data = IoStatsData(max_segments=max_segments if is_server else None,
+                            namespace=self.namespace,
+                            is_server=is_server,
+                            verbose=verbose,
+                            vlevel=vlevel,
+                            force_reconnection=force_reconnection)
+        
+        if self.is_server:
+            self.names = StringTensorServer(length = max_segments, 
+                                        basename = "IoStatsNames", 
+                                        name_space = self.namespace,
+                                        verbose = verbose, 
+                                        vlevel = vlevel, 
+                                        force_reconnection = force_reconnection)
+        else:
+            self.names = StringTensorClient(
+                                        basename = "IoStatsNames", 
+                                        name_space = self.namespace,
+                                        verbose = verbose, 
+                                        vlevel = vlevel)
+        
+        self._rows = {} # local cache of the registry
+        self._names = None
+
+        self._is_runnning = False
+    
+    def __del__(self):
+
+        self.close()
+    
+    def is_running(self):
+
+        return self._is_runnning
+    
+    def get_shared_mem(self):
+        return [self.data.get_shared_mem(), 
+            self.names.get_shared_mem()]
+    
+    def run(self):
+
+        self.names.run()
+        self.data.run()
+        if not self.is_server:
+            self.max_segments = self.data.getNRows()
+        self._names = [""] * self.max_segments
+        self._is_runnning = True
+    
+    def _get_row(self, 
+            name: str):
+        
+        # to be called with the data semaphore held
+        if name in self._rows:
+            return self._rows[name]
+        self.names.read_vec(self._names, 0)
+        if name in self._names:
+            row = self._names.index(name)
+        elif "" in self._names:
+            row = self._names.index("")
+            self._names[row] = name
+            if not self.names.write_vec([name], row):
+                return None
+        else: # registry full
+            Journal.log(self.__class__.__name__,
+                "_get_row",
+                f"No free rows left for {name} (max_segments: {self.max_segments}). Its stats will be dropped.",
+                LogType.WARN,
+                throw_when_excep = True)
+            row = None
+        self._rows[name] = row
+        return row
+    
+    def publish(self, 
+            deltas: Dict[str, List[float]]):
+        
+        # accumulates deltas (name -> [bytes, transactions, io_time, sem_wait]) 
+        # in one locked read-modify-write of the whole table
+        self.data.data_sem_acquire()
+        try:
+            self.data.synch_all(read=True, retry=True)
+            table = self.data.get_numpy_mirror()
+            for name, delta in deltas.items():
+                row = self._get_row(name)
+                if row is not None:
+                    table[row, :] += delta
+            self.data.synch_all(read=False, retry=True)
+        finally:
+            self.data.data_sem_release()
+
+    def read(self):
+        
+        # returns a snapshot of the registered names and of their counters
+        self.data.synch_all(read=True, retry=True)
+        self.names.read_vec(self._names, 0)
+        rows = [i for i in range(len(self._names)) if self._names[i] != ""]
+        return [self._names[i] for i in rows], \
+            self.data.get_numpy_mirror()[rows, :].copy()
+    
+    def close(self):
+        
+        self.data.close()
+        self.names.close()
+
 class ClusterRuntimeInfoNames:
 
     def __init__(self):
@@ -416,12 +909,7 @@ class RhcProfiling(SharedDataBase):
                     LogType.EXCEP,
                     throw_when_excep = True)
 
-            for i in range(len(val)):
-                
-                idx = self.runtime_info.get_idx(dyn_info_name[i])
-                self.param_values[idx, 0] = val[i]
-                self.shared_data.write_retry(data=self.param_values[idx, 0],
-                                row_index=idx, col_index=0) 
+            self.write_slots(slots=self.get_slots(dyn_info_name), val=val) # one transaction per contiguous run
             
         elif isinstance(dyn_info_name, str):
             
@@ -430,6 +918,10 @@ class RhcProfiling(SharedDataBase):
             self.shared_data.write_retry(data=self.param_values[idx, 0],
                                 row_index=idx, col_index=0) 
     
+    def _slots_data(self):
+
+        return self.runtime_info, self.param_values, self.shared_data
+    
     def get_static_info_idx(self, name: str):
 
         return self.idx_dict[name]
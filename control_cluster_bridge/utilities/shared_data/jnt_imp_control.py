@@ -8,8 +8,6 @@ from control_cluster_bridge.utilities.shared_data.abstractions import SharedData
 
 from typing import List
 
-import torch
-
 # Joint impedance control debug data
 
 class JntImpCntrlData(SharedDataBase):
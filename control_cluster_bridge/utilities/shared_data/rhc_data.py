@@ -8,7 +8,7 @@ from EigenIPC.PyEigenIPC import Journal
 from EigenIPC.PyEigenIPC import StringTensorServer, StringTensorClient
 
 from control_cluster_bridge.utilities.shared_data.abstractions import SharedDataBase
-from control_cluster_bridge.utilities.shared_data.state_encoding import FullRobState
+from control_cluster_bridge.utilities.shared_data.state_encoding import FullRobState, ColumnBlockView
 
 import numpy as np
 
@@ -32,7 +32,9 @@ class RobotState(FullRobState):
             verbose: bool = False,
             vlevel: VLevel = VLevel.V1,
             fill_value = 0,
-            optimize_mem: bool = False):
+            optimize_mem: bool = False,
+            packed: bool = False,
+            double_buffered: bool = False):
 
         basename = "RobotState"
 
@@ -52,7 +54,9 @@ class RobotState(FullRobState):
             verbose=verbose,
             vlevel=vlevel,
             fill_value=fill_value,
-            optimize_mem=optimize_mem)
+            optimize_mem=optimize_mem,
+            packed=packed,
+            double_buffered=double_buffered)
 
 class RhcCmds(FullRobState):
 
@@ -72,7 +76,8 @@ class RhcCmds(FullRobState):
             verbose: bool = False,
             vlevel: VLevel = VLevel.V1,
             fill_value=0,
-            optimize_mem: bool = False):
+            optimize_mem: bool = False,
+            packed: bool = False):
 
         basename = "RhcCmds"
 
@@ -92,7 +97,8 @@ class RhcCmds(FullRobState):
             verbose=verbose,
             vlevel=vlevel,
             fill_value=fill_value,
-            optimize_mem=optimize_mem)
+            optimize_mem=optimize_mem,
+            packed=packed)
 
 class RhcPred(FullRobState):
 
@@ -112,7 +118,8 @@ class RhcPred(FullRobState):
             verbose: bool = False,
             vlevel: VLevel = VLevel.V1,
             fill_value=0,
-            optimize_mem: bool = False):
+            optimize_mem: bool = False,
+            packed: bool = False):
 
         basename = "RhcPredictions"
 
@@ -132,7 +139,8 @@ class RhcPred(FullRobState):
             verbose=verbose,
             vlevel=vlevel,
             fill_value=fill_value,
-            optimize_mem=optimize_mem)
+            optimize_mem=optimize_mem,
+            packed=packed)
 
 class RhcPredDelta(FullRobState):
 
@@ -152,7 +160,8 @@ class RhcPredDelta(FullRobState):
             verbose: bool = False,
             vlevel: VLevel = VLevel.V1,
             fill_value=0,
-            optimize_mem: bool = False):
+            optimize_mem: bool = False,
+            packed: bool = False):
 
         basename = "RhcPredictionDelta"
 
@@ -172,7 +181,8 @@ class RhcPredDelta(FullRobState):
             verbose=verbose,
             vlevel=vlevel,
             fill_value=fill_value,
-            optimize_mem=optimize_mem)
+            optimize_mem=optimize_mem,
+            packed=packed)
         
 class RhcRefs(SharedDataBase):
     
@@ -896,6 +906,39 @@ class RhcStatus(SharedDataBase):
                 fill_value = False,
                 optimize_mem=optimize_mem)
     
+    class StaleFlagView(SharedTWrapper):
+
+        # controllers which did not complete their solution 
+        # within the server's deadline (written by the server)
+
+        def __init__(self,
+                namespace = "",
+                is_server = False, 
+                cluster_size: int = -1, 
+                verbose: bool = False, 
+                vlevel: VLevel = VLevel.V0,
+                force_reconnection: bool = False,
+                with_gpu_mirror: bool = False,
+                with_torch_view: bool = False,
+                optimize_mem: bool = False):
+            
+            basename = "ClusterStaleFlag" # hardcoded
+
+            super().__init__(namespace = namespace,
+                basename = basename,
+                is_server = is_server, 
+                n_rows = cluster_size, 
+                n_cols = 1, 
+                verbose = verbose, 
+                vlevel = vlevel,
+                safe = False, # boolean operations are atomic on 64 bit systems
+                dtype=dtype.Bool,
+                force_reconnection=force_reconnection,
+                with_gpu_mirror=with_gpu_mirror,
+                with_torch_view=with_torch_view,
+                fill_value = False,
+                optimize_mem=optimize_mem)
+    
     class ActivationFlagView(SharedTWrapper):
 
         def __init__(self,
@@ -956,6 +999,113 @@ class RhcStatus(SharedDataBase):
                 fill_value = False,
                 optimize_mem=optimize_mem)
             
+    class SlotClaimFlagView(SharedTWrapper):
+
+        # cluster slots claimed by controllers (possibly still initializing, 
+        # i.e. not registered yet)
+
+        def __init__(self,
+                namespace = "",
+                is_server = False, 
+                cluster_size: int = -1, 
+                verbose: bool = False, 
+                vlevel: VLevel = VLevel.V0,
+                force_reconnection: bool = False,
+                with_gpu_mirror: bool = False,
+                with_torch_view: bool = False,
+                optimize_mem: bool = False):
+            
+            basename = "ClusterSlotClaimFlag" # hardcoded
+
+            super().__init__(namespace = namespace,
+                basename = basename,
+                is_server = is_server, 
+                n_rows = cluster_size, 
+                n_cols = 1, 
+                verbose = verbose, 
+                vlevel = vlevel,
+                safe = False, # boolean operations are atomic on 64 bit systems
+                dtype=dtype.Bool,
+                force_reconnection=force_reconnection,
+                with_gpu_mirror=with_gpu_mirror,
+                with_torch_view=with_torch_view,
+                fill_value = False,
+                optimize_mem=optimize_mem)
+            
+    class ControllerPidView(SharedTWrapper):
+
+        # pid of the process hosting the controller in each slot 
+        # (0 -> none). Used for cleaning up slots of dead processes
+
+        def __init__(self,
+                namespace = "",
+                is_server = False, 
+                cluster_size: int = -1, 
+                verbose: bool = False, 
+                vlevel: VLevel = VLevel.V0,
+                force_reconnection: bool = False,
+                with_gpu_mirror: bool = False,
+                with_torch_view: bool = False,
+                optimize_mem: bool = False):
+            
+            basename = "ClusterControllerPid" # hardcoded
+
+            super().__init__(namespace = namespace,
+                basename = basename,
+                is_server = is_server, 
+                n_rows = cluster_size, 
+                n_cols = 1, 
+                verbose = verbose, 
+                vlevel = vlevel,
+                safe = False, # each row is only written by its owner
+                dtype=dtype.Int,
+                force_reconnection=force_reconnection,
+                with_gpu_mirror=with_gpu_mirror,
+                with_torch_view=with_torch_view,
+                fill_value = 0,
+                optimize_mem=optimize_mem)
+            
+    class ParkStateView(SharedTWrapper):
+
+        # parking state of each slot (handshake between server and controllers):
+        # 0 -> running, 1 -> park requested (server), 2 -> parked (ack of the controller, 
+        # which then idles without taking any lock), 3 -> unpark requested (server). The 
+        # controller sets 0 again once it leaves its park. Transitions are done under the 
+        # data semaphore. Parked controllers are not triggered by the server
+
+        RUNNING = 0
+        PARK_REQ = 1
+        PARKED = 2
+        UNPARK_REQ = 3
+
+        def __init__(self,
+                namespace = "",
+                is_server = False, 
+                cluster_size: int = -1, 
+                verbose: bool = False, 
+                vlevel: VLevel = VLevel.V0,
+                force_reconnection: bool = False,
+                with_gpu_mirror: bool = False,
+                with_torch_view: bool = False,
+                optimize_mem: bool = False):
+            
+            basename = "ClusterParkState" # hardcoded
+
+            super().__init__(namespace = namespace,
+                basename = basename,
+                is_server = is_server, 
+                n_rows = cluster_size, 
+                n_cols = 1, 
+                verbose = verbose, 
+                vlevel = vlevel,
+                safe = False, # rows are written one at a time
+                dtype=dtype.Int,
+                force_reconnection=force_reconnection,
+                with_gpu_mirror=with_gpu_mirror,
+                with_torch_view=with_torch_view,
+                fill_value = 0,
+                optimize_mem=optimize_mem)
+            
     class ControllersCounterView(SharedTWrapper):
 
         def __init__(self,
@@ -1015,7 +1165,96 @@ class RhcStatus(SharedDataBase):
                 fill_value = 0,
                 optimize_mem=optimize_mem)
             
-    class RhcCostView(SharedTWrapper):
+    class LayoutView(SharedTWrapper):
+
+        # describes how the status is laid out on shared memory
+        # (so that clients can discover it)
+        
+        def __init__(self,
+                namespace = "",
+                is_server = False, 
+                verbose: bool = False, 
+                vlevel: VLevel = VLevel.V0,
+                force_reconnection: bool = False):
+            
+            basename = "RhcStatusLayout" # hardcoded
+
+            super().__init__(namespace = namespace,
+                basename = basename,
+                is_server = is_server, 
+                n_rows = 1, 
+                n_cols = 1, # packed sol info
+                verbose = verbose, 
+                vlevel = vlevel,
+                safe = True,
+                dtype=dtype.Int,
+                force_reconnection=force_reconnection,
+                with_gpu_mirror=False,
+                with_torch_view=False,
+                fill_value = 0)
+    
+    class SolInfoBlock(SharedTWrapper):
+
+        # (only with packed_sol_info) solution info of all controllers side by side on a 
+        # single (float) tensor, so that each controller flushes its own in one transaction. 
+        # The rhc_cost, rhc_constr_viol, rhc_n_iter, rhc_fail_idx, rhc_nodes_cost and 
+        # rhc_nodes_constr_viol views are blocks of its columns (in this order)
+
+        N_SCALARS = 4 # cost, constr. violation, n. iterations, fail index
+
+        def __init__(self,
+                namespace = "",
+                is_server = False, 
+                cluster_size: int = -1, 
+                n_nodes: int = -1,
+                verbose: bool = False, 
+                vlevel: VLevel = VLevel.V0,
+                force_reconnection: bool = False,
+                with_gpu_mirror: bool = False,
+                with_torch_view: bool = False,
+                optimize_mem: bool = False):
+            
+            basename = "RhcSolInfo" # hardcoded
+
+            n_cols = None
+            if is_server:
+                n_cols = self.N_SCALARS + 2 * n_nodes
+            super().__init__(namespace = namespace,
+                basename = basename,
+                is_server = is_server, 
+                n_rows = cluster_size, 
+                n_cols = n_cols, 
+                verbose = verbose, 
+                vlevel = vlevel,
+                safe = False, # each row has a single writer
+                dtype=dtype.Float,
+                force_reconnection=force_reconnection,
+                with_gpu_mirror=with_gpu_mirror,
+                with_torch_view=with_torch_view,
+                fill_value = 0,
+                optimize_mem=optimize_mem)
+        
+        def n_nodes(self):
+            return (self.n_cols - self.N_SCALARS) // 2
+        
+        def n_logical_rows(self):
+            return self.getNRows()
+        
+        def n_view_rows(self):
+            # rows of the mirror (1 with optimize_mem)
+            return min(self.get_numpy_mirror().shape[0], self.getNRows())
+        
+        def attach_views(self, 
+                views: List):
+            
+            # views are given in column order (see above)
+            col_offset = 0
+            for view in views:
+                n_cols = 1 if col_offset < self.N_SCALARS else self.n_nodes()
+                view.attach_to_block(block=self, col_offset=col_offset, n_cols=n_cols)
+                col_offset += n_cols
+        
+    class RhcCostView(ColumnBlockView, SharedTWrapper):
 
         def __init__(self,
                 namespace = "",
@@ -1045,7 +1284,7 @@ class RhcStatus(SharedDataBase):
                 fill_value = np.nan,
                 optimize_mem=optimize_mem)
     
-    class RhcCnstrViolationView(SharedTWrapper):
+    class RhcCnstrViolationView(ColumnBlockView, SharedTWrapper):
 
         def __init__(self,
                 namespace = "",
@@ -1075,7 +1314,7 @@ class RhcStatus(SharedDataBase):
                 fill_value = np.nan,
                 optimize_mem=optimize_mem)
     
-    class RhcNodesCostView(SharedTWrapper):
+    class RhcNodesCostView(ColumnBlockView, SharedTWrapper):
 
         def __init__(self,
                 namespace = "",
@@ -1106,7 +1345,7 @@ class RhcStatus(SharedDataBase):
                 fill_value = 0,
                 optimize_mem=optimize_mem)
     
-    class RhcNodesCnstrViolationView(SharedTWrapper):
+    class RhcNodesCnstrViolationView(ColumnBlockView, SharedTWrapper):
 
         def __init__(self,
                 namespace = "",
@@ -1137,7 +1376,7 @@ class RhcStatus(SharedDataBase):
                 fill_value = 0,
                 optimize_mem=optimize_mem)
     
-    class RhcNIterationsView(SharedTWrapper):
+    class RhcNIterationsView(ColumnBlockView, SharedTWrapper):
 
         def __init__(self,
                 namespace = "",
@@ -1205,7 +1444,7 @@ class RhcStatus(SharedDataBase):
         def tot_dim(self):
             return self.n_cols
     
-    class RhcFailIndex(SharedTWrapper): 
+    class RhcFailIndex(ColumnBlockView, SharedTWrapper): 
 
         def __init__(self,
                 namespace = "",
@@ -1388,12 +1627,17 @@ class RhcStatus(SharedDataBase):
             force_reconnection: bool = False,
             with_gpu_mirror: bool = False,
             with_torch_view: bool = False,
-            optimize_mem: bool = False):
+            optimize_mem: bool = False,
+            packed_sol_info: bool = False):
 
         self._optimize_mem=optimize_mem
         
         self.is_server = is_server
 
+        self._packed_sol_info = packed_sol_info # server only (clients discover it): if True, the 
+        # solution info views are blocks of a single segment (see SolInfoBlock), otherwise each 
+        # has its own segment (legacy layout)
+
         self.cluster_size = cluster_size
         self.n_nodes = n_nodes
         self.n_contacts = n_contacts
@@ -1411,8 +1655,12 @@ class RhcStatus(SharedDataBase):
         self.fails =None
         self.resets=None
         self.trigger=None
+        self.stale=None
         self.activation_state=None
         self.registration=None
+        self.slot_claims=None
+        self.pids=None
+        self.park_state=None
         self.controllers_counter=None
         self.controllers_fail_counter=None
         self.rhc_cost=None
@@ -1422,6 +1670,11 @@ class RhcStatus(SharedDataBase):
         self.rhc_n_iter=None
         self.rhc_fcn=None
         self.rhc_fail_idx=None
+        self.sol_info=None # if packed, backs rhc_cost, rhc_constr_viol, rhc_n_iter, rhc_fail_idx,
+        # rhc_nodes_cost and rhc_nodes_constr_viol
+        self._layout=None
+
+        self._n_staged_nodes = 0 # n. of nodes staged with set_sol_info()
 
         self._is_runnning = False
 
@@ -1437,22 +1690,33 @@ class RhcStatus(SharedDataBase):
     
         return self._is_runnning
     
+    def packed_sol_info(self):
+        return self._packed_sol_info
+    
     def get_shared_mem(self):
-        return [self.fails.get_shared_mem(),
+        if self._packed_sol_info:
+            sol_info = [self.sol_info.get_shared_mem()]
+        else:
+            sol_info = [self.rhc_cost.get_shared_mem(),
+                self.rhc_constr_viol.get_shared_mem(),
+                self.rhc_n_iter.get_shared_mem(),
+                self.rhc_nodes_cost.get_shared_mem(),
+                self.rhc_nodes_constr_viol.get_shared_mem(),
+                self.rhc_fail_idx.get_shared_mem()]
+        return [self._layout.get_shared_mem(),
+            self.fails.get_shared_mem(),
             self.resets.get_shared_mem(),
             self.trigger.get_shared_mem(),
+            self.stale.get_shared_mem(),
             self.activation_state.get_shared_mem(),
             self.registration.get_shared_mem(),
+            self.slot_claims.get_shared_mem(),
+            self.pids.get_shared_mem(),
+            self.park_state.get_shared_mem(),
             self.controllers_counter.get_shared_mem(),
             self.controllers_fail_counter.get_shared_mem(),
-            self.rhc_cost.get_shared_mem(),
-            self.rhc_constr_viol.get_shared_mem(),
-            self.rhc_n_iter.get_shared_mem(),
-            self.rhc_nodes_cost.get_shared_mem(),
-            self.rhc_nodes_constr_viol.get_shared_mem(),
             self.rhc_fcn.get_shared_mem(),
-            self.rhc_fail_idx.get_shared_mem(),
-            self.rhc_static_info.get_shared_mem()]
+            self.rhc_static_info.get_shared_mem()] + sol_info
     
     def _init_shared_memory(self):
 
@@ -1469,6 +1733,12 @@ class RhcStatus(SharedDataBase):
                     "n_nodes<=0!",
                     LogType.EXCEP,
                     throw_when_excep = True)
+        self._layout = self.LayoutView(namespace=self.namespace,
+                                is_server=self.is_server,
+                                verbose=self.verbose,
+                                vlevel=self.vlevel,
+                                force_reconnection=self.force_reconnection)
+        
         self.rhc_static_info = self.RhcStaticInfo(namespace=self.namespace, 
                                 is_server=self.is_server, 
                                 cluster_size=self.cluster_size, 
@@ -1509,6 +1779,16 @@ class RhcStatus(SharedDataBase):
                                 with_torch_view=self.with_torch_view,
                                 optimize_mem=self._optimize_mem)
         
+        self.stale = self.StaleFlagView(namespace=self.namespace, 
+                                is_server=self.is_server, 
+                                cluster_size=self.cluster_size, 
+                                verbose=self.verbose, 
+                                vlevel=self.vlevel,
+                                force_reconnection=self.force_reconnection,
+                                with_gpu_mirror=self.with_gpu_mirror,
+                                with_torch_view=self.with_torch_view,
+                                optimize_mem=self._optimize_mem)
+        
         self.activation_state = self.ActivationFlagView(namespace=self.namespace, 
                                 is_server=self.is_server, 
                                 cluster_size=self.cluster_size, 
@@ -1529,6 +1809,36 @@ class RhcStatus(SharedDataBase):
                                 with_torch_view=self.with_torch_view,
                                 optimize_mem=self._optimize_mem)
 
+        self.slot_claims = self.SlotClaimFlagView(namespace=self.namespace, 
+                                is_server=self.is_server, 
+                                cluster_size=self.cluster_size, 
+                                verbose=self.verbose, 
+                                vlevel=self.vlevel,
+                                force_reconnection=self.force_reconnection,
+                                with_gpu_mirror=self.with_gpu_mirror,
+                                with_torch_view=self.with_torch_view,
+                                optimize_mem=self._optimize_mem)
+
+        self.pids = self.ControllerPidView(namespace=self.namespace, 
+                                is_server=self.is_server, 
+                                cluster_size=self.cluster_size, 
+                                verbose=self.verbose, 
+                                vlevel=self.vlevel,
+                                force_reconnection=self.force_reconnection,
+                                with_gpu_mirror=self.with_gpu_mirror,
+                                with_torch_view=self.with_torch_view,
+                                optimize_mem=self._optimize_mem)
+
+        self.park_state = self.ParkStateView(namespace=self.namespace, 
+                                is_server=self.is_server, 
+                                cluster_size=self.cluster_size, 
+                                verbose=self.verbose, 
+                                vlevel=self.vlevel,
+                                force_reconnection=self.force_reconnection,
+                                with_gpu_mirror=self.with_gpu_mirror,
+                                with_torch_view=self.with_torch_view,
+                                optimize_mem=self._optimize_mem)
+
         self.controllers_counter = self.ControllersCounterView(namespace=self.namespace, 
                                 is_server=self.is_server, 
                                 verbose=self.verbose, 
@@ -1622,16 +1932,55 @@ class RhcStatus(SharedDataBase):
                                 with_torch_view=self.with_torch_view,
                                 optimize_mem=self._optimize_mem)
 
+    def _run_layout(self):
+
+        self._layout.run()
+        layout = self._layout.get_numpy_mirror()
+        if self.is_server:
+            layout[0, 0] = int(self._packed_sol_info)
+            self._layout.synch_all(read=False, retry=True)
+        else:
+            self._layout.synch_all(read=True, retry=True)
+            self._packed_sol_info = bool(layout[0, 0])
+    
+    def _run_sol_info_block(self):
+
+        # created only once the layout is known (clients)
+        self.sol_info = self.SolInfoBlock(namespace=self.namespace, 
+                                is_server=self.is_server, 
+                                cluster_size=self.cluster_size, 
+                                n_nodes=self.n_nodes,
+                                verbose=self.verbose, 
+                                vlevel=self.vlevel,
+                                force_reconnection=self.force_reconnection,
+                                with_gpu_mirror=self.with_gpu_mirror,
+                                with_torch_view=self.with_torch_view,
+                                optimize_mem=self._optimize_mem)
+        self.sol_info.run()
+        self.sol_info.attach_views([self.rhc_cost, 
+                            self.rhc_constr_viol, 
+                            self.rhc_n_iter, 
+                            self.rhc_fail_idx,
+                            self.rhc_nodes_cost, 
+                            self.rhc_nodes_constr_viol]) # no shared mem. of their own
+    
     def run(self):
                 
+        self._run_layout()
         self.rhc_static_info.run()
         self.resets.run()
         self.trigger.run()
+        self.stale.run()
         self.fails.run()
         self.activation_state.run()
         self.registration.run()
+        self.slot_claims.run()
+        self.pids.run()
+        self.park_state.run()
         self.controllers_counter.run()
         self.controllers_fail_counter.run()
+        if self._packed_sol_info:
+            self._run_sol_info_block()
         self.rhc_cost.run()
         self.rhc_constr_viol.run()
         self.rhc_nodes_cost.run()
@@ -1639,6 +1988,11 @@ class RhcStatus(SharedDataBase):
         self.rhc_n_iter.run()
         self.rhc_fcn.run()
         self.rhc_fail_idx.run()
+        if self.is_server and self._packed_sol_info:
+            # fill values of the views
+            self.sol_info.get_numpy_mirror()[:, 0:self.sol_info.N_SCALARS] = np.nan
+            self.sol_info.get_numpy_mirror()[:, self.rhc_fail_idx._block_cols()] = 0
+            self.sol_info.synch_all(read=False, retry=True)
 
         if not self.is_server:
             self.cluster_size = self.trigger.getNRows()
@@ -1647,15 +2001,67 @@ class RhcStatus(SharedDataBase):
 
         self._is_runnning = True
     
+    def set_sol_info(self,
+            cost,
+            constr_viol,
+            n_iter,
+            nodes_cost,
+            nodes_constr_viol,
+            fail_idx,
+            row_index_view: int = 0):
+        
+        # stages solution info of a controller on the local mirrors
+        # (written to shared mem with synch_sol_info)
+        nodes_cost = np.asarray(nodes_cost).reshape(-1)
+        nodes_constr_viol = np.asarray(nodes_constr_viol).reshape(-1)
+        self._n_staged_nodes = nodes_cost.shape[0] # might be < n_nodes
+        self.rhc_cost.get_numpy_mirror()[row_index_view, 0:1] = cost
+        self.rhc_constr_viol.get_numpy_mirror()[row_index_view, 0:1] = constr_viol
+        self.rhc_n_iter.get_numpy_mirror()[row_index_view, 0:1] = n_iter
+        self.rhc_nodes_cost.get_numpy_mirror()[row_index_view, 0:self._n_staged_nodes] = nodes_cost
+        self.rhc_nodes_constr_viol.get_numpy_mirror()[row_index_view, 0:self._n_staged_nodes] = nodes_constr_viol
+        self.rhc_fail_idx.get_numpy_mirror()[row_index_view, 0:1] = fail_idx
+    
+    def synch_sol_info(self,
+            row_index: int,
+            row_index_view: int = 0,
+            read: bool = False):
+
+        # flushes (or reads) all the solution info of a controller in one pass 
+        # (a single transaction if packed). All these views are lock-free (safe=False)
+        if self._packed_sol_info:
+            self.sol_info.synch_retry(row_index=row_index, col_index=0,
+                        row_index_view=row_index_view,
+                        n_rows=1, n_cols=self.sol_info.n_cols,
+                        read=read)
+            return
+        n_nodes = self.n_nodes
+        if not read:
+            n_nodes = self._n_staged_nodes
+        for view, n_cols in [(self.rhc_cost, 1),
+                    (self.rhc_constr_viol, 1),
+                    (self.rhc_n_iter, 1),
+                    (self.rhc_nodes_cost, n_nodes),
+                    (self.rhc_nodes_constr_viol, n_nodes),
+                    (self.rhc_fail_idx, 1)]:
+            view.synch_retry(row_index=row_index, col_index=0,
+                    row_index_view=row_index_view,
+                    n_rows=1, n_cols=n_cols,
+                    read=read)
+            
     def close(self):
         
         if self.is_running():
             
             self.resets.close()
             self.trigger.close()
+            self.stale.close()
             self.fails.close()    
             self.activation_state.close()
             self.registration.close()
+            self.slot_claims.close()
+            self.pids.close()
+            self.park_state.close()
             self.controllers_counter.close()
             self.controllers_fail_counter.close()
             self.rhc_n_iter.close()
@@ -1665,7 +2071,10 @@ class RhcStatus(SharedDataBase):
             self.rhc_nodes_constr_viol.close()
             self.rhc_fcn.close()
             self.rhc_fail_idx.close()
+            if self.sol_info is not None:
+                self.sol_info.close()
             self.rhc_static_info.close()
+            self._layout.close()
             
             self._is_runnning = False
 
@@ -249,14 +249,7 @@ class SharedEnvInfo(SharedDataBase):
                     LogType.EXCEP,
                     throw_when_excep = True)
                 
-            for i in range(len(val)):
-                
-                idx = self.dynamic_info.get_idx(dyn_info_name[i])
-                
-                self.param_values[idx, 0] = val[i]
-                
-                self.shared_sim_data.write_retry(data=self.param_values[idx, 0],
-                                row_index=idx, col_index=0) 
+            self.write_slots(slots=self.get_slots(dyn_info_name), val=val) # one transaction per contiguous run
             
         elif isinstance(dyn_info_name, str):
             
@@ -267,6 +260,10 @@ class SharedEnvInfo(SharedDataBase):
             self.shared_sim_data.write_retry(data=self.param_values[idx, 0],
                                 row_index=idx, col_index=0) 
     
+    def _slots_data(self):
+
+        return self.dynamic_info, self.param_values, self.shared_sim_data
+    
     def synch(self):
 
         self.shared_sim_data.synch_all(read=True, retry = True)
@@ -5,7 +5,7 @@ from EigenIPC.PyEigenIPC import LogType
 from EigenIPC.PyEigenIPC import dtype as eigenipc_dtype 
 from EigenIPC.PyEigenIPC import Journal
 
-from control_cluster_bridge.utilities.shared_data.abstractions import SharedDataBase
+from control_cluster_bridge.utilities.shared_data.abstractions import SharedDataBase, row_runs
 import numpy as np
 
 from typing import List
@@ -13,7 +13,201 @@ from typing import List
 # robot data abstractions describing a robot state
 # (for both robot state and rhc cmds)
 
-class JntsState(SharedTWrapper):
+class ColumnBlockView:
+
+    # mixin allowing a SharedTWrapper to be backed by a block of columns
+    # of another (packed) SharedTWrapper instead of its own shared memory segment.
+    # All the synch calls are forwarded to the packed tensor with the proper column offset,
+    # so that the child's views and set/get methods work unchanged
+
+    def attach_to_block(self,
+            block: SharedTWrapper,
+            col_offset: int,
+            n_cols: int):
+        
+        # to be called before run()
+        self._block = block
+        self._block_col_offset = col_offset
+        self._block_n_cols = n_cols
+
+    def is_block_view(self):
+        return getattr(self, "_block", None) is not None
+    
+    def _block_cols(self):
+        return slice(self._block_col_offset, self._block_col_offset + self._block_n_cols)
+    
+    def run(self, *args, **kwargs):
+        if not self.is_block_view():
+            return super().run(*args, **kwargs)
+        # no shared memory is allocated
+        self.n_rows = self._block.n_logical_rows()
+        self.n_cols = self._block_n_cols
+        if self._block.gpu_mirror_exists():
+            self._gpu_mirror = self._block.get_torch_mirror(gpu=True)[:self._block.n_view_rows(), self._block_cols()]
+            
+    def is_running(self):
+        if not self.is_block_view():
+            return super().is_running()
+        return self._block.is_running()
+    
+    def getNRows(self):
+        if not self.is_block_view():
+            return super().getNRows()
+        return self._block.n_logical_rows()
+    
+    def gpu_mirror_exists(self):
+        if not self.is_block_view():
+            return super().gpu_mirror_exists()
+        return self._block.gpu_mirror_exists()
+    
+    def get_numpy_mirror(self):
+        if not self.is_block_view():
+            return super().get_numpy_mirror()
+        return self._block.get_numpy_mirror()[:self._block.n_view_rows(), self._block_cols()]
+    
+    def get_torch_mirror(self, gpu: bool = False):
+        if not self.is_block_view():
+            return super().get_torch_mirror(gpu=gpu)
+        return self._block.get_torch_mirror(gpu=gpu)[:self._block.n_view_rows(), self._block_cols()]
+
+    def get_shared_mem(self):
+        if not self.is_block_view():
+            return super().get_shared_mem()
+        return self._block.get_shared_mem()
+    
+    def synch_mirror(self, from_gpu: bool, non_blocking: bool = False):
+        if not self.is_block_view():
+            return super().synch_mirror(from_gpu=from_gpu, non_blocking=non_blocking)
+        if self.gpu_mirror_exists():
+            if from_gpu:
+                self.get_torch_mirror().copy_(self._gpu_mirror, non_blocking=non_blocking)
+            else:
+                self._gpu_mirror.copy_(self.get_torch_mirror(), non_blocking=non_blocking)
+
+    def synch_all(self, read: bool = True, retry: bool = True, 
+            row_index: int = 0, col_index: int = 0, row_index_view: int = 0):
+        if not self.is_block_view():
+            return super().synch_all(read=read, retry=retry, 
+                    row_index=row_index, col_index=col_index, 
+                    row_index_view=row_index_view)
+        n_rows = self._block.n_view_rows() - row_index_view
+        return self._block.synch_retry(row_index=row_index, 
+                    col_index=self._block_col_offset + col_index,
+                    row_index_view=row_index_view,
+                    n_rows=n_rows, n_cols=self._block_n_cols - col_index,
+                    read=read)
+    
+    def synch_retry(self, row_index: int, col_index: int, 
+            n_rows: int, n_cols: int, 
+            row_index_view: int = 0, read: bool = True):
+        if not self.is_block_view():
+            return super().synch_retry(row_index=row_index, col_index=col_index,
+                    row_index_view=row_index_view,
+                    n_rows=n_rows, n_cols=n_cols,
+                    read=read)
+        return self._block.synch_retry(row_index=row_index, 
+                    col_index=self._block_col_offset + col_index,
+                    row_index_view=row_index_view,
+                    n_rows=n_rows, n_cols=n_cols,
+                    read=read)
+    
+    def close(self):
+        if not self.is_block_view():
+            return super().close()
+        # the packed block is closed by its owner
+
+class MirrorStager:
+
+    # stages device -> host copies of a set of tensors through a single host buffer 
+    # (pinned if on GPU). Sources are first packed side by side on their device, so that
+    # a single copy is issued, on a dedicated stream. Destinations are updated by unstage(), 
+    # once the event returned by stage() completed. Without GPU the same packing runs on CPU 
+    # (with an always completed event), so that it can be exercised without CUDA
+
+    class CpuEvent:
+
+        def record(self, stream = None):
+            pass
+
+        def query(self):
+            return True
+        
+        def synchronize(self):
+            pass
+
+    def __init__(self,
+            srcs: List,
+            dsts: List,
+            use_gpu: bool = False):
+        
+        import torch
+
+        self._srcs = srcs
+        self._dsts = dsts
+        self._use_gpu = use_gpu
+
+        n_rows = srcs[0].shape[0]
+        self._col_slices = []
+        n_cols = 0
+        for src in srcs:
+            self._col_slices.append(slice(n_cols, n_cols + src.shape[1]))
+            n_cols += src.shape[1]
+        
+        if len(srcs) == 1:
+            self._packed_src = srcs[0] # already a single tensor
+        else:
+            self._packed_src = torch.empty((n_rows, n_cols), dtype=srcs[0].dtype, device=srcs[0].device)
+        self._staging = torch.empty((n_rows, n_cols), dtype=srcs[0].dtype, device="cpu",
+                                pin_memory=self._use_gpu) # pinned -> truly async copies
+        # column views, computed once (packing and unstaging are then plain copies)
+        self._packed_views = [self._packed_src[:, cols] for cols in self._col_slices]
+        self._staging_views = [self._staging[:, cols] for cols in self._col_slices]
+
+        if self._use_gpu:
+            self._stream = torch.cuda.Stream()
+            self._event = torch.cuda.Event()
+        else:
+            self._stream = None
+            self._event = self.CpuEvent()
+        
+        self._pending = False
+
+    def pending(self):
+        return self._pending
+    
+    def stage(self):
+
+        import torch
+        if self._use_gpu:
+            self._stream.wait_stream(torch.cuda.current_stream()) # sources are written on the current stream
+            with torch.cuda.stream(self._stream):
+                self._pack()
+                self._staging.copy_(self._packed_src, non_blocking=True)
+                self._event.record(self._stream)
+        else:
+            self._pack()
+            self._staging.copy_(self._packed_src)
+            self._event.record()
+        self._pending = True
+        return self._event
+    
+    def unstage(self):
+        
+        # blocks until the staged copy is completed
+        if not self._pending:
+            return False
+        self._event.synchronize()
+        for dst, staged in zip(self._dsts, self._staging_views):
+            dst.copy_(staged)
+        self._pending = False
+        return True
+    
+    def _pack(self):
+        if len(self._srcs) > 1:
+            for packed, src in zip(self._packed_views, self._srcs):
+                packed.copy_(src)
+
+class JntsState(ColumnBlockView, SharedTWrapper):
 
     def __init__(self,
             namespace = "",
@@ -264,7 +458,7 @@ class JntsState(SharedTWrapper):
             else:
                 return internal_data[robot_idxs, self._jnts_remapping]
          
-class RootState(SharedTWrapper):
+class RootState(ColumnBlockView, SharedTWrapper):
 
     def __init__(self,
             namespace = "",
@@ -519,7 +713,7 @@ class RootState(SharedTWrapper):
             else:
                 return internal_data[robot_idxs, remapping]
             
-class ContactWrenches(SharedTWrapper):
+class ContactWrenches(ColumnBlockView, SharedTWrapper):
 
     def __init__(self,
             namespace = "",
@@ -676,16 +870,20 @@ class ContactWrenches(SharedTWrapper):
     def set(self,
             data,
             data_type: str,
-            contact_name: str,
+            contact_name: str = None,
             robot_idxs = None,
             gpu: bool = False):
 
+        # if contact_name is None, data for all contacts is set at once 
+        # (data should then be ordered as contact_names)
         internal_data = self._retrieve_data(name=data_type,
                     gpu=gpu)
         data_length=int(internal_data.shape[1]/self.n_contacts)
         contact_idx=None
         
-        if not contact_name in self.contact_names:
+        if contact_name is None:
+            pass
+        elif not contact_name in self.contact_names:
             contact_list = "\t".join(self.contact_names)
             exception = f"Contact name {contact_name} not in contact list [{contact_list}]"
             Journal.log(self.__class__.__name__,
@@ -736,7 +934,7 @@ class ContactWrenches(SharedTWrapper):
             else:
                 return internal_data[robot_idxs, :]
 
-class ContactPos(SharedTWrapper):
+class ContactPos(ColumnBlockView, SharedTWrapper):
 
     def __init__(self,
             namespace = "",
@@ -958,7 +1156,7 @@ class ContactPos(SharedTWrapper):
             else:
                 return internal_data[robot_idxs, :]
 
-class ContactVel(SharedTWrapper):
+class ContactVel(ColumnBlockView, SharedTWrapper):
 
     def __init__(self,
             namespace = "",
@@ -1182,6 +1380,218 @@ class ContactVel(SharedTWrapper):
                         
 class FullRobState(SharedDataBase):
 
+    class LayoutView(SharedTWrapper):
+
+        # describes how the state is laid out on shared memory
+        # (so that clients can discover it)
+        
+        def __init__(self,
+                namespace = "",
+                is_server = False, 
+                verbose: bool = False, 
+                vlevel: VLevel = VLevel.V0,
+                force_reconnection: bool = False):
+            
+            basename = "Layout" # hardcoded
+
+            super().__init__(namespace = namespace,
+                basename = basename,
+                is_server = is_server, 
+                n_rows = 1, 
+                n_cols = 4, # packed, n_jnts, n_contacts, double_buffered
+                verbose = verbose, 
+                vlevel = vlevel,
+                safe = True,
+                dtype=eigenipc_dtype.Int,
+                force_reconnection=force_reconnection,
+                with_gpu_mirror=False,
+                with_torch_view=False,
+                fill_value = 0)
+    
+    class SeqView(SharedTWrapper):
+
+        # [version, pending] counters used by a double buffered PackedBlock:
+        # version -> last fully written state (lives in bank version % 2)
+        # pending -> state currently being written (bank pending % 2)
+        
+        def __init__(self,
+                namespace = "",
+                is_server = False, 
+                verbose: bool = False, 
+                vlevel: VLevel = VLevel.V0,
+                force_reconnection: bool = False):
+            
+            basename = "PackedStateSeq" # hardcoded
+
+            super().__init__(namespace = namespace,
+                basename = basename,
+                is_server = is_server, 
+                n_rows = 1, 
+                n_cols = 2,
+                verbose = verbose, 
+                vlevel = vlevel,
+                safe = False, # never blocks
+                dtype=eigenipc_dtype.Int,
+                force_reconnection=force_reconnection,
+                with_gpu_mirror=False,
+                with_torch_view=False,
+                fill_value = 0)
+    
+    class PackedBlock(SharedTWrapper):
+
+        # single shared tensor holding root, jnts, contact wrenches, 
+        # contact pos and contact vel side by side (in this order).
+        # If double_buffered, the shared tensor holds two banks of n_robots rows
+        # each and is synched seqlock-style: the (single) writer always publishes a full 
+        # snapshot on the bank not being exposed, readers never take the semaphore 
+        # and retry only if the bank they read was overwritten in the meantime. 
+        # The mirror keeps the usual layout (the first n_robots rows are the state). 
+        # optimize_mem clients only mirror n_robots rows and read them from one bank.
+
+        def __init__(self,
+                namespace = "",
+                is_server = False, 
+                n_robots: int = None, 
+                n_cols: int = None,
+                verbose: bool = False, 
+                vlevel: VLevel = VLevel.V0,
+                safe: bool = True,
+                force_reconnection: bool = False,
+                with_gpu_mirror: bool = False,
+                with_torch_view: bool = False,
+                fill_value = 0,
+                optimize_mem: bool = False,
+                double_buffered: bool = False,
+                max_read_tries: int = 100):
+            
+            basename = "PackedState" # hardcoded
+
+            self.n_banks = 2 if double_buffered else 1
+            self._max_read_tries = max_read_tries
+            self._version = 0 # last published version (writer side)
+            self._seq = None
+            if double_buffered:
+                self._seq = FullRobState.SeqView(namespace=namespace,
+                                is_server=is_server,
+                                verbose=verbose,
+                                vlevel=vlevel,
+                                force_reconnection=force_reconnection)
+            
+            n_rows = n_robots
+            if n_robots is not None and (is_server or not optimize_mem):
+                n_rows = n_robots * self.n_banks # the mirror spans the whole shared tensor
+            
+            super().__init__(namespace = namespace,
+                basename = basename,
+                is_server = is_server, 
+                n_rows = n_rows, 
+                n_cols = n_cols, 
+                dtype = eigenipc_dtype.Float,
+                verbose = verbose, 
+                vlevel = vlevel,
+                fill_value = fill_value, 
+                safe = safe and not double_buffered,
+                force_reconnection=force_reconnection,
+                with_gpu_mirror=with_gpu_mirror,
+                with_torch_view=with_torch_view,
+                optimize_mem=optimize_mem)
+        
+        def run(self):
+            super().run()
+            if self._seq is not None:
+                self._seq.run()
+                self._seq.synch_all(read=True, retry=True)
+                self._version = int(self._seq.get_numpy_mirror()[0, 0])
+        
+        def n_logical_rows(self):
+            return self.getNRows() // self.n_banks
+        
+        def n_view_rows(self):
+            # rows of the mirror actually holding the state
+            return min(self.get_numpy_mirror().shape[0], self.n_logical_rows())
+
+        def synch_all(self, read: bool = True, retry: bool = True, 
+                row_index: int = 0, col_index: int = 0, row_index_view: int = 0):
+            if self._seq is None:
+                return super().synch_all(read=read, retry=retry, 
+                        row_index=row_index, col_index=col_index, 
+                        row_index_view=row_index_view)
+            return self.synch_retry(row_index=row_index, col_index=col_index,
+                        row_index_view=row_index_view,
+                        n_rows=self.n_view_rows() - row_index_view, 
+                        n_cols=self.n_cols - col_index,
+                        read=read)
+
+        def synch_retry(self, row_index: int, col_index: int, 
+                n_rows: int, n_cols: int, 
+                row_index_view: int = 0, read: bool = True):
+            if self._seq is None:
+                return super().synch_retry(row_index=row_index, col_index=col_index,
+                        row_index_view=row_index_view,
+                        n_rows=n_rows, n_cols=n_cols,
+                        read=read)
+            if read:
+                return self._seqlock_read(row_index=row_index, col_index=col_index,
+                        row_index_view=row_index_view,
+                        n_rows=n_rows, n_cols=n_cols)
+            # writes always publish a full snapshot (partial writes would leave 
+            # the new bank with stale rows)
+            return self._seqlock_publish()
+        
+        def _seqlock_read(self, row_index: int, col_index: int, 
+                n_rows: int, n_cols: int, 
+                row_index_view: int = 0):
+            seq = self._seq.get_numpy_mirror()
+            n = self.n_logical_rows()
+            if row_index < 0 or row_index + n_rows > n:
+                Journal.log(self.__class__.__name__,
+                    "_seqlock_read",
+                    f"Rows [{row_index}, {row_index + n_rows}) are out of bounds for a bank of {n} rows!",
+                    LogType.EXCEP,
+                    throw_when_excep = True)
+            for i in range(self._max_read_tries):
+                self._seq.synch_all(read=True, retry=False)
+                version = int(seq[0, 0])
+                super().synch_retry(row_index=(version % 2) * n + row_index, col_index=col_index,
+                        row_index_view=row_index_view,
+                        n_rows=n_rows, n_cols=n_cols,
+                        read=True)
+                self._seq.synch_all(read=True, retry=False)
+                if int(seq[0, 1]) < version + 2: # bank was not touched while reading
+                    return True
+            Journal.log(self.__class__.__name__,
+                "_seqlock_read",
+                f"Could not get a consistent snapshot after {self._max_read_tries} tries!",
+                LogType.WARN,
+                throw_when_excep = True)
+            return False
+        
+        def _seqlock_publish(self):
+            if not self.n_view_rows() == self.n_logical_rows():
+                Journal.log(self.__class__.__name__,
+                    "_seqlock_publish",
+                    "The writer of a double buffered state needs a full mirror (optimize_mem not supported)!",
+                    LogType.EXCEP,
+                    throw_when_excep = True)
+            seq = self._seq.get_numpy_mirror()
+            new_version = self._version + 1
+            seq[0, 0] = self._version
+            seq[0, 1] = new_version # marks the bank as being written
+            self._seq.synch_all(read=False, retry=False)
+            super().synch_retry(row_index=(new_version % 2) * self.n_logical_rows(), col_index=0,
+                        row_index_view=0,
+                        n_rows=self.n_logical_rows(), n_cols=self.n_cols,
+                        read=False)
+            seq[0, 0] = new_version # publish
+            self._seq.synch_all(read=False, retry=False)
+            self._version = new_version
+            return True
+        
+        def close(self):
+            if self._seq is not None:
+                self._seq.close()
+            super().close()
+        
     def __init__(self,
             namespace: str,
             basename: str,
@@ -1199,11 +1609,24 @@ class FullRobState(SharedDataBase):
             verbose: bool = False,
             vlevel: VLevel = VLevel.V1,
             fill_value = 0,
-            optimize_mem: bool = False):
+            optimize_mem: bool = False,
+            packed: bool = False,
+            double_buffered: bool = False):
 
         self._namespace = namespace
         self._basename = basename
 
+        self._packed = packed # if True, all sub-states live on a single shared 
+        # tensor and are synched in one go (clients read this from the server)
+        self._double_buffered = double_buffered # if True (implies packed), the packed tensor is double buffered
+        # and readers never block on the writer (clients read this from the server)
+        if self._double_buffered:
+            self._packed = True
+        self._fill_value = fill_value
+        self._optimize_mem = optimize_mem
+        self._block = None
+        self._stager = None
+
         self._is_server = is_server
         
         self._verbose = verbose
@@ -1292,7 +1715,13 @@ class FullRobState(SharedDataBase):
                             with_torch_view=with_torch_view,
                             fill_value=fill_value,
                             optimize_mem=optimize_mem)
-
+        
+        self._layout = self.LayoutView(namespace=self._namespace + self._basename,
+                            is_server=self._is_server,
+                            verbose=self._verbose,
+                            vlevel=self._vlevel,
+                            force_reconnection=self._force_reconnection)
+        
         self._is_running = False
     
     def __del__(self):
@@ -1300,11 +1729,20 @@ class FullRobState(SharedDataBase):
         self.close()
     
     def get_shared_mem(self):
-        return [self.root_state.get_shared_mem(),
-            self.jnts_state.get_shared_mem(),
-            self.contact_wrenches.get_shared_mem(),
-            self.contact_pos.get_shared_mem(),
-            self.contact_vel.get_shared_mem()]
+        return [segment.get_shared_mem() for segment in self._segments()]
+    
+    def packed(self):
+        return self._packed
+    
+    def double_buffered(self):
+        return self._double_buffered
+    
+    def block_tensor(self, gpu: bool = False):
+        # (n_robots x n_cols) torch view over the mirror of the packed tensor 
+        # (the sub-states' mirrors are column slices of it). None if not packed
+        if self._block is None:
+            return None
+        return self._block.get_torch_mirror(gpu=gpu)[:self._block.n_view_rows(), :]
     
     def n_robots(self):
         return self.root_state.getNRows()
@@ -1342,6 +1780,10 @@ class FullRobState(SharedDataBase):
     def run(self,
         jnts_remapping: List[int] = None):
 
+        self._run_layout()
+        if self._packed:
+            self._attach_to_block()
+
         self.root_state.run()
 
         self.jnts_state.run()
@@ -1365,12 +1807,69 @@ class FullRobState(SharedDataBase):
         self.set_jnts_remapping(jnts_remapping)
 
         self._is_running = True
+    
+    def _run_layout(self):
+
+        self._layout.run()
+        layout = self._layout.get_numpy_mirror()
+        if self._is_server:
+            layout[0, 0] = int(self._packed)
+            layout[0, 1] = self._n_jnts
+            layout[0, 2] = self._n_contacts
+            layout[0, 3] = int(self._double_buffered)
+            self._layout.synch_all(read=False, retry=True)
+        else:
+            self._layout.synch_all(read=True, retry=True)
+            self._packed = bool(layout[0, 0])
+            self._double_buffered = bool(layout[0, 3])
+            if self._packed:
+                self._n_jnts = int(layout[0, 1])
+                self._n_contacts = int(layout[0, 2])
+    
+    def _attach_to_block(self):
+        
+        # column layout of the packed tensor
+        n_cols_root = 22
+        n_cols_jnts = 4 * self._n_jnts
+        n_cols_wrenches = 6 * self._n_contacts
+        n_cols_contact_kin = 3 * self._n_contacts
+
+        self._block = self.PackedBlock(namespace=self._namespace + self._basename,
+                            is_server=self._is_server,
+                            n_robots=self._n_robots,
+                            n_cols=n_cols_root + n_cols_jnts + n_cols_wrenches + 2 * n_cols_contact_kin,
+                            verbose=self._verbose,
+                            vlevel=self._vlevel,
+                            safe=self._safe,
+                            force_reconnection=self._force_reconnection,
+                            with_gpu_mirror=self._with_gpu_mirror,
+                            with_torch_view=self._with_torch_view,
+                            fill_value=self._fill_value,
+                            optimize_mem=self._optimize_mem,
+                            double_buffered=self._double_buffered)
+        self._block.run()
+
+        offset = 0
+        for sub_state, n_cols in zip(self._sub_states(), 
+                    [n_cols_root, n_cols_jnts, n_cols_wrenches, n_cols_contact_kin, n_cols_contact_kin]):
+            sub_state.attach_to_block(block=self._block, 
+                    col_offset=offset, 
+                    n_cols=n_cols)
+            offset += n_cols
         
     def synch_mirror(self,
                 from_gpu: bool,
                 non_blocking: bool = False):
 
-        if self._with_gpu_mirror:
+        if self._with_gpu_mirror and self._packed:
+            # just one copy for the whole state
+            if from_gpu:
+                self._block.synch_mirror(from_gpu=True, non_blocking=non_blocking)
+                self.synch_to_shared_mem()
+            else:
+                self.synch_from_shared_mem()
+                self._block.synch_mirror(from_gpu=False, non_blocking=non_blocking)
+        elif self._with_gpu_mirror:
             if from_gpu:
                 # synchs root_state and jnt_state (which will normally live on GPU)
                 # with the shared state data using the aggregate view (normally on CPU)
@@ -1392,23 +1891,127 @@ class FullRobState(SharedDataBase):
             #torch.cuda.synchronize() # this way we ensure that after this the state on GPU
             # is fully updated
     
+    def stage_mirror(self):
+
+        # issues the (GPU -> CPU) copy of the whole state asynchronously, through 
+        # a pinned staging buffer and a single copy. Returns an event the caller can wait on; 
+        # publish_staged() completes the synch. Without GPU mirror, CPU mirrors are staged instead
+        if self._stager is None:
+            segments = self._segments()
+            self._stager = MirrorStager(srcs=[self._segment_tensor(segment, gpu=self._with_gpu_mirror) for segment in segments],
+                                dsts=[self._segment_tensor(segment, gpu=False) for segment in segments],
+                                use_gpu=self._with_gpu_mirror)
+        return self._stager.stage()
+    
+    def staged(self):
+        return self._stager is not None and self._stager.pending()
+    
+    def publish_staged(self):
+
+        # waits for the staged copy (if any), updates the CPU mirrors and writes to shared mem
+        if self._stager is not None:
+            self._stager.unstage()
+        self.synch_to_shared_mem()
+    
+    def _segment_tensor(self, segment, gpu: bool):
+        if segment is self._block:
+            return self._block.get_torch_mirror(gpu=gpu)[:self._block.n_view_rows(), :]
+        return segment.get_torch_mirror(gpu=gpu)
+
+    def synch_rows_from_shared_mem(self, 
+            robot_idxs, 
+            max_runs: int = 4):
+
+        # reads from shared mem only the rows in robot_idxs (mirror rows are assumed 
+        # to map 1:1 to shared mem rows, i.e. optimize_mem is not used).
+        # Contiguous rows are read in a single transaction; if the indexes are too scattered
+        # (more than max_runs contiguous blocks), the whole block is read with a single transaction 
+        # instead (and, in synch_mirror_rows, only the rows in robot_idxs are still copied to GPU)
+        runs = self._row_runs(robot_idxs)
+        if len(runs) > max_runs:
+            self.synch_from_shared_mem()
+            return runs
+        for start, n_rows in runs:
+            for segment in self._segments():
+                segment.synch_retry(row_index=start, col_index=0,
+                                row_index_view=start,
+                                n_rows=n_rows, n_cols=segment.n_cols,
+                                read=True)
+        return runs
+
+    def synch_mirror_rows(self,
+                robot_idxs,
+                non_blocking: bool = False,
+                max_runs: int = 4):
+        
+        # reads the rows in robot_idxs from shared mem and copies 
+        # only those to the GPU mirror (CPU -> GPU)
+        runs = self.synch_rows_from_shared_mem(robot_idxs=robot_idxs,
+                                max_runs=max_runs)
+        if self._with_gpu_mirror and len(runs) > 0:
+            if len(runs) == 1: # contiguous -> slice copy
+                start, n_rows = runs[0]
+                for segment in self._segments():
+                    segment._gpu_mirror[start:(start+n_rows), :].copy_(
+                        segment.get_torch_mirror()[start:(start+n_rows), :], non_blocking=non_blocking)
+            else: # scattered -> gather
+                import torch
+                rows = torch.cat([torch.arange(start, start+n_rows) for start, n_rows in runs])
+                rows_gpu = rows.to(self.jnts_state._gpu_mirror.device)
+                for segment in self._segments():
+                    segment._gpu_mirror[rows_gpu, :] = segment.get_torch_mirror()[rows, :].to(
+                        segment._gpu_mirror.device, non_blocking=non_blocking)
+    
+    def _sub_states(self):
+        return [self.root_state, self.jnts_state, self.contact_wrenches,
+            self.contact_pos, self.contact_vel]
+    
+    def _segments(self):
+        # actual shared memory segments backing the state
+        if self._packed:
+            return [self._block]
+        return self._sub_states()
+    
+    def _row_runs(self, robot_idxs):
+        return row_runs(robot_idxs)
+
+    def commit(self, 
+            robot_idx: int, 
+            robot_idx_view: int = 0,
+            sub_states: List[str] = None):
+
+        # writes a single robot row of the selected sub-states (all by default) 
+        # to shared mem. If packed, the columns of all the requested sub-states 
+        # are written in a single transaction
+        if sub_states is None:
+            selected = self._sub_states()
+        else:
+            selected = [getattr(self, name) for name in sub_states]
+        if self._packed:
+            col_start = min([sub_state._block_col_offset for sub_state in selected])
+            col_end = max([sub_state._block_col_offset + sub_state._block_n_cols for sub_state in selected])
+            self._block.synch_retry(row_index=robot_idx, col_index=col_start,
+                        row_index_view=robot_idx_view,
+                        n_rows=1, n_cols=col_end - col_start,
+                        read=False)
+        else:
+            for sub_state in selected:
+                sub_state.synch_retry(row_index=robot_idx, col_index=0,
+                        row_index_view=robot_idx_view,
+                        n_rows=1, n_cols=sub_state.n_cols,
+                        read=False)
+    
     def synch_from_shared_mem(self, robot_idx: int = 0, robot_idx_view: int = 0):
 
-        # reads from shared mem
-        self.root_state.synch_all(read = True, retry = True, row_index=robot_idx, row_index_view=robot_idx_view)
-        self.jnts_state.synch_all(read = True, retry = True, row_index=robot_idx, row_index_view=robot_idx_view)
-        self.contact_wrenches.synch_all(read = True, retry = True, row_index=robot_idx, row_index_view=robot_idx_view)
-        self.contact_pos.synch_all(read = True, retry = True, row_index=robot_idx, row_index_view=robot_idx_view)
-        self.contact_vel.synch_all(read = True, retry = True, row_index=robot_idx, row_index_view=robot_idx_view)
+        # reads from shared mem (a single transaction if packed)
+        for segment in self._segments():
+            segment.synch_all(read = True, retry = True, row_index=robot_idx, row_index_view=robot_idx_view)
 
     def synch_to_shared_mem(self, robot_idx: int = 0, robot_idx_view: int = 0):
 
-        # write to shared mem
-        self.root_state.synch_all(read = False, retry = True, row_index=robot_idx, row_index_view=robot_idx_view)
-        self.jnts_state.synch_all(read = False, retry = True, row_index=robot_idx, row_index_view=robot_idx_view)
-        self.contact_wrenches.synch_all(read = False, retry = True, row_index=robot_idx, row_index_view=robot_idx_view)
-        self.contact_pos.synch_all(read = False, retry = True, row_index=robot_idx, row_index_view=robot_idx_view)
-        self.contact_vel.synch_all(read = False, retry = True, row_index=robot_idx, row_index_view=robot_idx_view)
+        # write to shared mem (a single transaction if packed)
+        for segment in self._segments():
+            segment.synch_all(read = False, retry = True, row_index=robot_idx, row_index_view=robot_idx_view)
         
     def close(self):
 
@@ -1417,3 +2020,6 @@ class FullRobState(SharedDataBase):
         self.contact_wrenches.close()
         self.contact_pos.close()
         self.contact_vel.close()
+        if self._block is not None:
+            self._block.close()
+        self._layout.close()
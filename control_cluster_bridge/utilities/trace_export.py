@@ -0,0 +1,92 @@
+# Copyright (C) 2023  Andrea Patrizi (AndrePatri, andreapatrizi1b6e6@gmail.com)
+# 
+# This file is part of CoClusterBridge and distributed under the General Public License version 2 license.
+# 
+# CoClusterBridge is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 2 of the License, or
+# (at your option) any later version.
+# 
+# CoClusterBridge is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with CoClusterBridge.  If not, see <http://www.gnu.org/licenses/>.
+# 
+# exports the per-controller solve-cycle traces (see RhcTrace) to the 
+# Chrome trace event format (viewable with chrome://tracing or https://ui.perfetto.dev), e.g.:
+# python -m control_cluster_bridge.utilities.trace_export --ns kyon0 --out cluster_trace.json
+from control_cluster_bridge.utilities.shared_data.cluster_profiling import RhcTrace
+
+from EigenIPC.PyEigenIPC import VLevel
+
+import json
+
+import numpy as np
+
+from typing import List
+
+def records_to_chrome_trace(records: List[np.ndarray],
+        process_name: str = "ControlCluster"):
+    
+    # records: for each controller, a (n_records x RhcTrace.N_COLS) array.
+    # Each controller is a thread of a single process; each phase of 
+    # a cycle is a complete ("X") event
+    events = [{"name": "process_name", "ph": "M", "pid": 0, "tid": 0, 
+            "args": {"name": process_name}}]
+    
+    valid = [cntrl_records[:, RhcTrace.WAKE] for cntrl_records in records if cntrl_records.shape[0] > 0]
+    if len(valid) == 0:
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+    t0 = np.nanmin(np.concatenate(valid)) # timestamps are made relative to the earliest one
+
+    for cntrl_idx in range(len(records)):
+        events.append({"name": "thread_name", "ph": "M", "pid": 0, "tid": cntrl_idx, 
+            "args": {"name": f"controller {cntrl_idx}"}})
+        for record in records[cntrl_idx]:
+            for i in range(len(RhcTrace.PHASES)):
+                start = record[RhcTrace.WAKE + i]
+                end = record[RhcTrace.WAKE + i + 1]
+                if np.isnan(start) or np.isnan(end):
+                    continue
+                events.append({"name": RhcTrace.PHASES[i],
+                    "ph": "X",
+                    "pid": 0,
+                    "tid": cntrl_idx,
+                    "ts": (start - t0) * 1e6, # [us]
+                    "dur": (end - start) * 1e6,
+                    "args": {"cycle": int(record[RhcTrace.CYCLE])}})
+    
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+def export_chrome_trace(namespace: str,
+        out_path: str,
+        verbose: bool = False):
+    
+    rhc_trace = RhcTrace(is_server=False,
+                    name=namespace,
+                    verbose=verbose,
+                    vlevel=VLevel.V2)
+    rhc_trace.run()
+    records = rhc_trace.read_records()
+    rhc_trace.close()
+
+    with open(out_path, "w") as file:
+        json.dump(records_to_chrome_trace(records, process_name=namespace), file)
+    
+    return records
+
+if __name__ == "__main__":  
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export controllers' traces to Chrome trace JSON")
+    parser.add_argument("--ns", type=str, required=True, help="cluster namespace")
+    parser.add_argument("--out", type=str, default="cluster_trace.json")
+    args = parser.parse_args()
+
+    records = export_chrome_trace(namespace=args.ns, out_path=args.out)
+    print(f"Exported {sum([cntrl_records.shape[0] for cntrl_records in records])} cycles " + \
+        f"of {len(records)} controllers to {args.out}")
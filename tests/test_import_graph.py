@@ -0,0 +1,23 @@
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("EigenIPC")
+
+def _loads_torch(module: str):
+
+    # fresh interpreter, so that nothing imported by the test session leaks in
+    code = f"import sys; import {module}; print('torch' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code],
+                    check=True,
+                    capture_output=True,
+                    text=True)
+    return out.stdout.strip().splitlines()[-1] == "True"
+
+@pytest.mark.parametrize("module", ["control_cluster_bridge.controllers.rhc",
+                    "control_cluster_bridge.utilities.shared_data.jnt_imp_control"])
+def test_controller_side_does_not_import_torch(module):
+
+    assert not _loads_torch(module)
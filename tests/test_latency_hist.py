@@ -0,0 +1,82 @@
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("EigenIPC")
+
+from EigenIPC.PyEigenIPC import VLevel
+
+from control_cluster_bridge.utilities.shared_data.cluster_profiling import RhcLatencyHist
+
+MIN_VAL = 2.0 ** -16 # power of 2 -> bucket edges are exact
+N_OCTAVES = 4
+SUB_BUCKETS = 8
+
+@pytest.fixture
+def hist():
+
+    hist = RhcLatencyHist(cluster_size=1,
+                min_val=MIN_VAL,
+                n_octaves=N_OCTAVES,
+                sub_buckets=SUB_BUCKETS,
+                is_server=True,
+                name=f"TestLatencyHist{os.getpid()}",
+                vlevel=VLevel.V0,
+                force_reconnection=True)
+    hist.run()
+    yield hist
+    hist.close()
+
+def _lower_edge(idx: int):
+    return MIN_VAL * 2.0 ** (idx // SUB_BUCKETS) * (1.0 + (idx % SUB_BUCKETS) / SUB_BUCKETS)
+
+def test_bucket_edges(hist):
+
+    for idx in range(1, hist.n_buckets):
+        assert hist.bucket(_lower_edge(idx)) == idx # buckets are [lower, upper)
+        assert hist.bucket(np.nextafter(hist._upper_edges[idx], 0.0)) == idx
+    assert hist.bucket(np.nextafter(hist._upper_edges[0], 0.0)) == 0
+
+@pytest.mark.parametrize("val", [MIN_VAL, MIN_VAL / 2.0, 0.0, -1.0, float("nan")])
+def test_bucket_at_or_below_min_val(hist, val):
+
+    assert hist.bucket(val) == 0
+
+def test_bucket_above_last_octave(hist):
+
+    assert hist.bucket(MIN_VAL * 2.0 ** (N_OCTAVES + 3)) == hist.n_buckets - 1
+
+def test_percentiles_one_sample_per_bucket(hist):
+
+    counts = np.ones((1, hist.n_buckets), dtype=np.int64)
+    stats = hist.get_percentiles(counts, percentiles=[50, 100])
+    assert stats["p50"][0] == hist._upper_edges[hist.n_buckets // 2 - 1]
+    assert stats["p100"][0] == hist._upper_edges[-1]
+    assert stats["max"][0] == hist._upper_edges[-1]
+    assert stats["count"][0] == hist.n_buckets
+
+def test_percentiles_relative_error(hist):
+
+    # geometric samples spanning all the octaves: each percentile is the upper edge of
+    # the bucket of the true value, i.e. within a 1/sub_buckets relative error
+    samples = MIN_VAL * np.power(1.03, np.arange(1, 150))
+    samples = samples[samples < MIN_VAL * 2.0 ** N_OCTAVES]
+    counts = np.zeros((1, hist.n_buckets), dtype=np.int64)
+    for sample in samples:
+        counts[0, hist.bucket(sample)] += 1
+    percentiles = [50, 90, 99]
+    stats = hist.get_percentiles(counts, percentiles=percentiles)
+    for percentile in percentiles:
+        true_val = np.percentile(samples, percentile, method="inverted_cdf")
+        assert true_val < stats[f"p{percentile}"][0] <= true_val * (1.0 + 1.0 / SUB_BUCKETS)
+    assert samples[-1] < stats["max"][0] <= samples[-1] * (1.0 + 1.0 / SUB_BUCKETS)
+
+def test_percentiles_empty_rows(hist):
+
+    counts = np.zeros((2, hist.n_buckets), dtype=np.int64)
+    counts[1, 3] = 5
+    stats = hist.get_percentiles(counts, percentiles=[50])
+    assert np.isnan(stats["p50"][0]) and np.isnan(stats["max"][0])
+    assert stats["p50"][1] == hist._upper_edges[3]
+    assert stats["count"][0] == 0 and stats["count"][1] == 5
@@ -0,0 +1,60 @@
+import pytest
+
+pytest.importorskip("multiprocess")
+pytest.importorskip("EigenIPC")
+
+from control_cluster_bridge.cluster_client.control_cluster_client import ControlClusterClient
+
+class _Client(ControlClusterClient):
+
+    def _generate_controller(self, idx: int):
+        return None
+
+class _Process:
+
+    # stands in for a child process (nothing is actually started)
+    def __init__(self, target, name, args):
+        self.name = name
+        self.started = False
+
+    def start(self):
+        self.started = True
+
+class _Ctx:
+    Process = _Process
+
+def _client(cluster_size: int, controllers_per_process: int):
+    # bypasses __init__ (no shared memory is needed for spawn bookkeeping)
+    client = _Client.__new__(_Client)
+    client.cluster_size = cluster_size
+    client._controllers_per_process = controllers_per_process
+    client._processes = []
+    client._child_alive = []
+    client._n_respawns = []
+    client._stopped = []
+    client._ctx = _Ctx()
+    n_processes = -(-cluster_size // controllers_per_process)
+    client._process_specs = [(None, f"Worker{i}", ()) for i in range(n_processes)]
+    return client
+
+def test_unparking_non_prefix_slots_spawns_their_workers():
+
+    client = _client(cluster_size=8, controllers_per_process=2)
+    client._start_process(0) # initial process (slots 0, 1)
+
+    # slots 5 and 6 are unparked: they are hosted by workers 2 and 3 (not 1)
+    to_spawn = client._processes_to_spawn([5, 6])
+    assert to_spawn == [2, 3]
+    for i in to_spawn:
+        client._start_process(i)
+    assert [p is not None for p in client._processes] == [True, False, True, True]
+    assert client._processes[2].name == "Worker2" and client._processes[2].started
+    assert client._child_alive == [True, False, True, True]
+
+    # already spawned workers are not spawned again
+    assert client._processes_to_spawn([0, 4, 5]) == [1]
+
+def test_unparking_with_one_controller_per_process():
+
+    client = _client(cluster_size=4, controllers_per_process=1)
+    assert client._processes_to_spawn([3, 1]) == [1, 3]
@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("EigenIPC")
+
+from EigenIPC.PyEigenIPC import VLevel
+
+from control_cluster_bridge.utilities.shared_data.state_encoding import MirrorStager
+from control_cluster_bridge.utilities.shared_data.rhc_data import RobotState
+
+N_ROBOTS = 3
+N_JNTS = 2
+N_CONTACTS = 1
+
+def test_stage_unstage_roundtrip_cpu():
+
+    srcs = [torch.rand(N_ROBOTS, 4), torch.rand(N_ROBOTS, 1), torch.rand(N_ROBOTS, 3)]
+    dsts = [torch.zeros_like(src) for src in srcs]
+    stager = MirrorStager(srcs=srcs, dsts=dsts, use_gpu=False)
+    for _ in range(2): # packing views are reused across stages
+        for src in srcs:
+            src.copy_(torch.rand_like(src))
+        assert stager.stage().query()
+        assert stager.pending()
+        assert stager.unstage()
+        assert not stager.pending()
+        for src, dst in zip(srcs, dsts):
+            assert torch.equal(src, dst)
+    assert not stager.unstage() # nothing staged
+
+@pytest.mark.parametrize("packed", [False, True])
+def test_publish_staged_cpu(packed):
+
+    namespace = f"TestMirrorStager{os.getpid()}{int(packed)}"
+    server = RobotState(namespace=namespace,
+                is_server=True,
+                n_robots=N_ROBOTS,
+                n_jnts=N_JNTS,
+                n_contacts=N_CONTACTS,
+                jnt_names=[f"jnt_{i}" for i in range(N_JNTS)],
+                contact_names=[f"contact_{i}" for i in range(N_CONTACTS)],
+                with_torch_view=True,
+                force_reconnection=True,
+                vlevel=VLevel.V0,
+                packed=packed)
+    server.run()
+    client = RobotState(namespace=namespace,
+                is_server=False,
+                with_torch_view=True,
+                vlevel=VLevel.V0)
+    client.run()
+    try:
+        q = torch.rand(N_ROBOTS, N_JNTS)
+        server.jnts_state.set(data=q, data_type="q")
+        server.stage_mirror()
+        assert server.staged()
+        server.publish_staged()
+        client.synch_from_shared_mem()
+        assert torch.allclose(client.jnts_state.get(data_type="q"), q)
+    finally:
+        client.close()
+        server.close()
@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("EigenIPC")
+
+from EigenIPC.PyEigenIPC import VLevel
+
+from control_cluster_bridge.utilities.shared_data.state_encoding import FullRobState
+
+N_ROBOTS = 4
+N_COLS = 3
+
+def _namespace(name: str):
+    return f"{name}{os.getpid()}"
+
+@pytest.fixture
+def double_buffered_block():
+
+    namespace = _namespace("TestDoubleBuffered")
+    server = FullRobState.PackedBlock(namespace=namespace,
+                    is_server=True,
+                    n_robots=N_ROBOTS,
+                    n_cols=N_COLS,
+                    vlevel=VLevel.V0,
+                    force_reconnection=True,
+                    fill_value=np.nan,
+                    double_buffered=True)
+    server.run()
+    client = FullRobState.PackedBlock(namespace=namespace,
+                    is_server=False,
+                    n_robots=1, # controllers only mirror their own row
+                    vlevel=VLevel.V0,
+                    optimize_mem=True,
+                    double_buffered=True)
+    client.run()
+    yield server, client
+    client.close()
+    server.close()
+
+def _publish(server, offset: float):
+
+    # row i holds offset + i
+    server.get_numpy_mirror()[:N_ROBOTS, :] = offset + np.arange(N_ROBOTS).reshape(-1, 1)
+    server.synch_all(read=False, retry=True)
+
+def test_optimize_mem_client_mirrors_one_row(double_buffered_block):
+
+    server, client = double_buffered_block
+    assert server.get_numpy_mirror().shape[0] == 2 * N_ROBOTS
+    assert client.get_numpy_mirror().shape[0] == 1
+    assert client.n_logical_rows() == N_ROBOTS
+    assert client.n_view_rows() == 1
+
+@pytest.mark.parametrize("robot_idx", [0, N_ROBOTS - 1])
+def test_optimize_mem_client_reads_own_row_from_both_banks(double_buffered_block, robot_idx):
+
+    server, client = double_buffered_block
+    for i, offset in enumerate([10.0, 20.0]): # two publishes -> one per bank
+        _publish(server, offset)
+        assert client.synch_retry(row_index=robot_idx, col_index=0,
+                    row_index_view=0,
+                    n_rows=1, n_cols=N_COLS,
+                    read=True)
+        assert np.all(client.get_numpy_mirror()[0, :] == offset + robot_idx)
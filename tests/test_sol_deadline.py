@@ -0,0 +1,51 @@
+import os
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("EigenIPC")
+
+from EigenIPC.PyEigenIPC import VLevel
+
+from control_cluster_bridge.cluster_server.control_cluster_server import ControlClusterServer
+from control_cluster_bridge.utilities.shared_data.rhc_data import RhcStatus
+
+CLUSTER_SIZE = 2
+
+def test_stale_flags_are_published_after_missed_deadline():
+
+    namespace = f"TestSolDeadline{os.getpid()}"
+    server = ControlClusterServer(namespace=namespace,
+                    cluster_size=CLUSTER_SIZE,
+                    control_dt=0.01,
+                    cluster_dt=0.01,
+                    jnt_names=["jnt_0"],
+                    n_contacts=1,
+                    contact_linknames=["contact_0"],
+                    vlevel=VLevel.V0,
+                    force_reconnection=True,
+                    sol_deadline_ms=5.0)
+    server.run()
+    # stands in for the controllers: they register, but only controller 1 completes
+    status = RhcStatus(is_server=False,
+                namespace=namespace,
+                vlevel=VLevel.V0,
+                with_torch_view=True)
+    status.run()
+    try:
+        status.registration.get_torch_mirror()[:, :] = True
+        status.registration.synch_all(read=False, retry=True)
+
+        server.pre_trigger()
+        server.write_robot_state()
+        server.trigger_solution()
+        status.trigger.write_retry(False, row_index=1, col_index=0, row_index_view=1)
+        server.wait_for_solution()
+
+        status.stale.synch_all(read=True, retry=True)
+        stale = status.stale.get_torch_mirror()
+        assert bool(stale[0, 0]) and not bool(stale[1, 0])
+        assert server.get_stale_controllers().tolist() == [0]
+    finally:
+        status.close()
+        server.close()
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("EigenIPC")
+
+from control_cluster_bridge.utilities.shared_data.cluster_profiling import RhcTrace
+from control_cluster_bridge.utilities.trace_export import records_to_chrome_trace
+
+def _record(cycle: int, wake: float, dt: float = 1e-3):
+    # each phase lasts dt
+    record = np.full(RhcTrace.N_COLS, np.nan)
+    record[RhcTrace.CYCLE] = cycle
+    record[RhcTrace.WAKE:] = wake + dt * np.arange(RhcTrace.N_COLS - RhcTrace.WAKE)
+    return record
+
+def test_chrome_trace_structure():
+
+    records = [np.stack([_record(0, 10.0), _record(1, 10.1)]),
+        np.stack([_record(0, 10.05)])]
+    records[1][0, RhcTrace.SOLVE] = np.nan # missing stamp -> solve and cmds_write are dropped
+    trace = records_to_chrome_trace(records, process_name="TestCluster")
+    json.dumps(trace) # must be serializable as is
+
+    assert trace["displayTimeUnit"] == "ms"
+    events = trace["traceEvents"]
+    meta = [event for event in events if event["ph"] == "M"]
+    assert meta[0]["name"] == "process_name" and meta[0]["args"]["name"] == "TestCluster"
+    assert [event["tid"] for event in meta if event["name"] == "thread_name"] == [0, 1]
+
+    complete = [event for event in events if event["ph"] == "X"]
+    assert all(event["pid"] == 0 for event in complete)
+    tid0 = [event for event in complete if event["tid"] == 0]
+    tid1 = [event for event in complete if event["tid"] == 1]
+    assert [event["name"] for event in tid0] == 2 * RhcTrace.PHASES
+    assert [event["name"] for event in tid1] == ["state_read", "pred_delta", "ack"]
+    assert [event["args"]["cycle"] for event in tid0] == [0] * 5 + [1] * 5
+
+    # timestamps are relative to the earliest wake up, in us
+    assert tid0[0]["ts"] == pytest.approx(0.0)
+    assert tid0[5]["ts"] == pytest.approx(0.1 * 1e6)
+    assert tid1[0]["ts"] == pytest.approx(0.05 * 1e6)
+    assert all(event["dur"] == pytest.approx(1e3) for event in complete)
+
+def test_chrome_trace_without_records():
+
+    trace = records_to_chrome_trace([np.zeros((0, RhcTrace.N_COLS))])
+    assert [event["ph"] for event in trace["traceEvents"]] == ["M"]